@@ -0,0 +1,115 @@
+# ============================================================
+#  BOT PROTECT - accounting.py
+#  Coût par guild : CPU des handlers, événements, appels REST, actions
+#  (compteurs de taille fixe, décroissance exponentielle périodique)
+# ============================================================
+
+import time
+import heapq
+import functools
+from array import array
+
+FIELDS = ("cpu", "events", "rest", "actions")
+CPU, EVENTS, REST, ACTIONS = range(len(FIELDS))
+# Pondération du coût : 1 ms de CPU = 1 point ; un appel REST consomme
+# du budget rate-limit partagé par tout le bot, il pèse bien plus lourd
+WEIGHTS = (1000.0, 0.02, 5.0, 1.0)   # cpu (par seconde), events, rest, actions
+# En dessous, une ligne décrue est supprimée (guild inactive)
+FLOOR = 0.01
+
+
+class ResourceUsage:
+    # gid -> array('d') de len(FIELDS) valeurs : mémoire fixe par guild, bornée
+    # à max_guilds lignes (les moins coûteuses sont évincées à la décroissance).
+    def __init__(self, half_life: float = 3600, max_guilds: int = 50000):
+        self.half_life = half_life
+        self.max_guilds = max_guilds
+        self._rows = {}
+        self.since = time.time()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, gid, field: int, amount: float = 1.0):
+        if gid is None:
+            return
+        row = self._rows.get(gid)
+        if row is None:
+            row = self._rows[gid] = array("d", bytes(8 * len(FIELDS)))
+        row[field] += amount
+
+    @staticmethod
+    def cost(row):
+        return sum(v * w for v, w in zip(row, WEIGHTS))
+
+    def decay(self, elapsed: float):
+        # appelée périodiquement : les valeurs deviennent des moyennes glissantes
+        f = 0.5 ** (elapsed / self.half_life)
+        dead = []
+        for gid, row in self._rows.items():
+            for i in range(len(row)):
+                row[i] *= f
+            if self.cost(row) < FLOOR:
+                dead.append(gid)
+        for gid in dead:
+            del self._rows[gid]
+        if len(self._rows) > self.max_guilds:
+            keep = heapq.nlargest(self.max_guilds, self._rows.items(), key=lambda kv: self.cost(kv[1]))
+            self._rows = dict(keep)
+
+    def top(self, n: int = 10):
+        # [(gid, coût, {champ: valeur})] par coût décroissant
+        best = heapq.nlargest(n, self._rows.items(), key=lambda kv: self.cost(kv[1]))
+        return [(gid, self.cost(row), dict(zip(FIELDS, row))) for gid, row in best]
+
+    def export(self):
+        return {
+            "since": self.since, "at": time.time(), "half_life": self.half_life, "weights": dict(zip(FIELDS, WEIGHTS)),
+            "guilds": [{"id": gid, "cost": round(c, 3), **{k: round(v, 6) for k, v in vals.items()}}
+                       for gid, c, vals in self.top(len(self._rows))],
+        }
+
+
+class Meter:
+    # Pilote une coroutine pas à pas et ne compte que le CPU de ses propres pas :
+    # le temps passé suspendu (réseau, autres handlers) n'est pas attribué.
+    __slots__ = ("coro", "cpu")
+
+    def __init__(self, coro):
+        self.coro = coro
+        self.cpu = 0.0
+
+    def __await__(self):
+        it = self.coro.__await__()
+        value, exc = None, None
+        while True:
+            t = time.thread_time()
+            try:
+                y = it.throw(exc) if exc is not None else it.send(value)
+            except StopIteration as e:
+                self.cpu += time.thread_time() - t
+                return e.value
+            except BaseException:
+                self.cpu += time.thread_time() - t
+                raise
+            self.cpu += time.thread_time() - t
+            try:
+                value, exc = (yield y), None
+            except BaseException as e:
+                value, exc = None, e
+
+
+def metered(usage: ResourceUsage, guild_of):
+    # décorateur d'event handler : 1 événement + CPU du handler pour la guild
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            m = Meter(fn(*args, **kwargs))
+            try:
+                return await m
+            finally:
+                gid = guild_of(args[0]) if args else None
+                usage.add(gid, EVENTS)
+                usage.add(gid, CPU, m.cpu)
+        return wrapper
+    return deco
@@ -0,0 +1,118 @@
+# ============================================================
+#  BOT PROTECT - antinuke.py
+#  Anti-nuke : compteurs par acteur corrélés aux audit logs
+# ============================================================
+
+import time
+import asyncio
+from collections import deque, defaultdict
+
+import discord
+
+# Actions audit-log surveillées → clé de seuil dans protect.antinuke
+KINDS = {
+    discord.AuditLogAction.channel_delete: "channel_delete",
+    discord.AuditLogAction.role_delete: "role_delete",
+    discord.AuditLogAction.ban: "ban",
+    discord.AuditLogAction.kick: "kick",
+    discord.AuditLogAction.webhook_create: "webhook_create",
+}
+# Entrées plus vieilles ignorées au premier fetch d'une guild
+MAX_ENTRY_AGE = 60
+
+
+class AuditLogResolver:
+    # Une seule source d'entrées audit-log par guild, sans doublon :
+    # - gateway (on_audit_log_entry_create) → feed(), 0 appel REST
+    # - événements destructeurs → poke() : UN fetch groupé après `delay`,
+    #   annulé si la gateway a livré des entrées entre-temps
+    def __init__(self, on_entry, delay: float = 0.5, limit: int = 50):
+        self.on_entry = on_entry
+        self.delay = delay
+        self.limit = limit
+        self._last_id = {}        # guild_id -> id de la dernière entrée vue
+        self._last_feed = {}      # guild_id -> monotonic() du dernier feed gateway
+        self._scheduled = {}      # guild_id -> monotonic() du poke en attente
+        self.fetches = 0
+
+    def feed(self, entry: discord.AuditLogEntry, from_gateway: bool = True):
+        gid = entry.guild.id
+        if entry.id <= self._last_id.get(gid, 0):
+            return
+        self._last_id[gid] = entry.id
+        if from_gateway:
+            self._last_feed[gid] = time.monotonic()
+        self.on_entry(entry)
+
+    def poke(self, guild: discord.Guild):
+        if guild.id in self._scheduled:
+            return
+        self._scheduled[guild.id] = time.monotonic()
+        asyncio.get_running_loop().call_later(self.delay, lambda: asyncio.ensure_future(self._fetch(guild)))
+
+    async def _fetch(self, guild: discord.Guild):
+        poked_at = self._scheduled.get(guild.id, 0)
+        try:
+            if self._last_feed.get(guild.id, 0) >= poked_at:
+                return  # la gateway a déjà livré les entrées
+            after = self._last_id.get(guild.id)
+            self.fetches += 1
+            entries = []
+            kw = {"limit": self.limit}
+            if after:
+                kw["after"] = discord.Object(after)
+            async for e in guild.audit_logs(**kw):
+                entries.append(e)
+            now = discord.utils.utcnow()
+            for e in sorted(entries, key=lambda x: x.id):
+                if not after and (now - e.created_at).total_seconds() > MAX_ENTRY_AGE:
+                    self._last_id[guild.id] = max(self._last_id.get(guild.id, 0), e.id)
+                    continue
+                self.feed(e, from_gateway=False)
+        except (discord.Forbidden, discord.HTTPException):
+            pass
+        finally:
+            self._scheduled.pop(guild.id, None)
+
+
+class AntiNuke:
+    # conf_for(guild_id) -> dict protect.antinuke
+    # is_exempt(guild, user_id) -> bool (whitelist / owner suprême / bot)
+    # punish(guild, user_id, kind, count) -> None (enqueue côté bot)
+    def __init__(self, conf_for, is_exempt, punish):
+        self.conf_for = conf_for
+        self.is_exempt = is_exempt
+        self.punish = punish
+        self._hits = defaultdict(lambda: deque(maxlen=64))  # (gid, uid, kind) -> [ts]
+        self._punished = {}                                 # (gid, uid) -> ts
+
+    def on_entry(self, entry: discord.AuditLogEntry):
+        kind = KINDS.get(entry.action)
+        uid = entry.user_id
+        if not kind or not uid:
+            return
+        guild = entry.guild
+        conf = self.conf_for(guild.id)
+        if not conf or not conf.get("enabled") or self.is_exempt(guild, uid):
+            return
+        # horodatage de l'entrée (et non de réception) : un fetch groupé tardif compte juste
+        now = entry.created_at.timestamp()
+        dq = self._hits[(guild.id, uid, kind)]
+        dq.append(now)
+        while dq and now - dq[0] > conf["window_sec"]:
+            dq.popleft()
+        limit = conf.get(f"max_{kind}")
+        if not limit or len(dq) < limit:
+            return
+        # une seule sanction par fenêtre pour un même acteur
+        if now - self._punished.get((guild.id, uid), -1e9) < conf["window_sec"]:
+            return
+        self._punished[(guild.id, uid)] = now
+        self.punish(guild, uid, kind, len(dq))
+        if len(self._hits) > 10000:
+            self._prune(time.time(), 300)
+
+    def _prune(self, now, window):
+        for k in [k for k, dq in self._hits.items() if not dq or now - dq[-1] > window]:
+            del self._hits[k]
+        self._punished = {k: t for k, t in self._punished.items() if now - t < window}
@@ -0,0 +1,269 @@
+# ============================================================
+#  BOT PROTECT - apibench.py
+#  Budget d'appels API : rejoue des scénarios (lockdown, rôle mute, nuke,
+#  raid, raid en quarantaine, vague de spam, import de blacklist,
+#  restauration de snapshot, client HTTP contre le faux web) contre mockdiscord.py et échoue si un scénario
+#  dépasse son budget d'appels REST ou de temps.
+#
+#    python apibench.py                 # tous les scénarios
+#    python apibench.py raid spam       # seulement ceux-là
+#
+#  Code de sortie 1 si un budget est dépassé : à lancer avant chaque merge.
+# ============================================================
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from types import SimpleNamespace
+
+import discord
+
+import mockdiscord as mock
+from snapshot import GuildRestorer, DiscordRest, serialize_guild
+from httpclient import HttpClient, ResponseTooLarge, CHUNK
+from links import Unshortener
+
+CHANNELS = 50    # salons textuels par guild de test
+JOINERS = 30     # comptes du raid
+RAID_JOINS = 8   # max_joins de l'anti-raid dans les scénarios raid
+SPAMMERS = 20    # comptes de la vague de spam
+SPAM_MSGS = 10   # messages par compte
+RESTORE_LOST = 5 # salons supprimés avant la restauration
+SHORT_HOPS = 3   # redirections d'un lien court du faux web
+CLICKS = 50      # résolutions concurrentes du même lien court
+BL_IDS = 600     # ids d'une blacklist partagée importée (bulk-ban : 1 appel / 10s / guild)
+
+# scénario -> (appels REST max, secondes max). Mesuré puis arrondi au-dessus :
+# un changement qui coûte plus d'appels ou plus de temps fait échouer le bench.
+BUDGETS = {
+    # 1 overwrite par salon (+ un 429 global possible)
+    "lockdown": (CHANNELS + 2, 3.0),
+    # création du rôle + 1 overwrite par salon
+    "mute_role": (1 + CHANNELS + 2, 3.0),
+    # clone + position + delete + message
+    "nuke": (4, 2.0),
+    # autorole par arrivant + lockdown + logs batchés ; le temps est dominé par le bucket rôles de la guild
+    "raid": (JOINERS + CHANNELS + JOINERS // 3 + 2, 35.0),
+    # 1 appel par arrivant (autorole ou quarantaine), + la requarantaine des arrivants
+    # de la fenêtre de détection, + logs batchés ; aucun appel par salon. Temps : bucket membres de la guild
+    "raid_quarantine": (JOINERS + RAID_JOINS - 1 + JOINERS // 3 + 2, 35.0),
+    # 1 timeout par spammeur + bulk-delete par salon + logs batchés (10 embeds/message)
+    "spam": (SPAMMERS + 2 + SPAMMERS + 2, 25.0),
+    # bans d'avance par bulk-ban de 200 ids (10 000 ids = 50 appels), puis les arrivants
+    # blacklistés (1 bulk-ban groupé) + logs batchés. Temps : bucket bulk-ban de la guild
+    "blacklist": (-(-BL_IDS // 200) + 1 + 2, 45.0),
+    # rôle staff recréé + repositionné, salons recréés (overwrites inclus à la création),
+    # puis 1 overwrite par salon existant pour le rôle recréé. Temps : bucket création de salons
+    "restore": (1 + 1 + RESTORE_LOST + CHANNELS - RESTORE_LOST, 15.0),
+    # lien court résolu UNE fois pour tous (1 appel par saut) + 1 téléchargement + 1 refusé au-delà du plafond
+    "http": (SHORT_HOPS + 2, 2.0),
+}
+
+
+class Bench:
+    def __init__(self, server, start):
+        self.server = server
+        self.start = start
+        self.rt = start.runtime
+        self.bot = start.bot
+        self.state = start.bot._connection
+
+    def ext(self, name):
+        # module d'extension chargé par setup_hook (relu à chaque accès : rechargeable)
+        return self.bot.extensions[f"cogs.{name}"]
+
+    # ---- Fabrication d'objets discord.py alimentés par le mock ----
+    def guild(self, channels: int = CHANNELS, roles=(), overwrites=()):
+        gid = mock.snowflake()
+        admin = mock.snowflake()
+        roles = [mock.role_payload(gid, "@everyone", 0, 0x400 | 0x800),
+                 mock.role_payload(admin, "admin", 1, 0x8), *roles]
+        chans = [mock.channel_payload(mock.snowflake(), gid, f"salon-{i}", i, overwrites=overwrites)
+                 for i in range(channels)]
+        owner = mock.snowflake()
+        members = [mock.member_payload(owner, "owner", [admin]),
+                   mock.member_payload(int(self.server.bot_user["id"]), "ProtectBot", [admin], bot=True)]
+        g = discord.Guild(data=mock.guild_payload(gid, owner, chans, roles, members), state=self.state)
+        self.state._add_guild(g)
+        self.rt.ensure_guild_conf(gid)
+        conf = self.rt.config[str(gid)]
+        conf["log_channel"] = g.text_channels[0].id
+        return g
+
+    def member(self, guild, name=None):
+        m = discord.Member(data=mock.member_payload(mock.snowflake(), name), guild=guild, state=self.state)
+        guild._add_member(m)
+        return m
+
+    def message(self, guild, channel, member, content):
+        author = mock.member_payload(member.id, member.name)
+        data = mock.message_payload(mock.snowflake(), channel.id, guild.id, author, content)
+        return discord.Message(state=self.state, channel=channel, data=data)
+
+    async def drain(self, timeout: float = 120.0):
+        # attend que le dispatcher ait tout exécuté (y compris les flush batchés)
+        end = time.monotonic() + timeout
+        await asyncio.sleep(0)
+        while not self.rt.actions.idle() and time.monotonic() < end:
+            await asyncio.sleep(0.05)
+
+    # ---- Scénarios ----
+    async def sc_lockdown(self):
+        g = self.guild()
+        await self.ext("protection").lockdown(g, True)
+
+    async def sc_mute_role(self):
+        g = self.guild()
+        await self.ext("moderation").ensure_mute_role(g)
+
+    async def sc_nuke(self):
+        g = self.guild()
+        ctx = SimpleNamespace(guild=g, channel=g.text_channels[1], author=g.owner)
+        await self.ext("protection").nuke_cmd.callback(ctx)
+
+    async def sc_raid(self):
+        g = self.guild()
+        conf = self.rt.config[str(g.id)]
+        conf["protect"]["antiraid"].update(enabled=True, max_joins=RAID_JOINS, window_sec=60, action="lockdown")
+        conf["autorole"] = g.roles[1].id
+        joiners = [self.member(g) for _ in range(JOINERS)]
+        await asyncio.gather(*(self.ext("protection").on_member_join(m) for m in joiners))
+        await self.drain()
+
+    async def sc_raid_quarantine(self):
+        g = self.guild()
+        # rôle provisionné avant le raid (quarantine setup), hors budget
+        qrole = discord.Role(guild=g, state=self.state, data=mock.role_payload(mock.snowflake(), "Quarantaine", 1))
+        g._add_role(qrole)
+        conf = self.rt.config[str(g.id)]
+        conf["protect"]["antiraid"].update(enabled=True, max_joins=RAID_JOINS, window_sec=60, action="quarantine")
+        conf["autorole"] = g.roles[1].id
+        conf["quarantine_role"] = qrole.id
+        joiners = [self.member(g) for _ in range(JOINERS)]
+        await asyncio.gather(*(self.ext("protection").on_member_join(m) for m in joiners))
+        await self.drain()
+
+    async def sc_spam(self):
+        g = self.guild()
+        conf = self.rt.config[str(g.id)]
+        conf["protect"]["antilink"] = True
+        conf["protect"]["antispam"].update(enabled=True, threshold=3, window_sec=10)
+        spammers = [self.member(g) for _ in range(SPAMMERS)]
+        chans = g.text_channels[1:3]
+        # un message sur deux avec lien (anti-link → delete), les autres (anti-spam → timeout)
+        msgs = [self.message(g, chans[i % 2], m, f"free nitro https://spam{i}.example/x" if i % 2 else "free nitro")
+                for i in range(SPAM_MSGS) for m in spammers]
+        for msg in msgs:
+            await self.start.on_message(msg)
+        await self.drain()
+
+    async def sc_blacklist(self):
+        g = self.guild()
+        # liste partagée : surtout des comptes absents de la guild, quelques membres présents
+        joiners = [self.member(g) for _ in range(5)]
+        ids = [m.id for m in joiners] + [mock.snowflake() for _ in range(BL_IDS - len(joiners))]
+
+        async def send(*args, **kwargs):
+            pass
+        ctx = SimpleNamespace(guild=g, author=g.owner, prefix="+", send=send,
+                              message=SimpleNamespace(attachments=[]))
+        await self.ext("protection").blacklist_cmd.callback(ctx, "import", arg="\n".join(map(str, ids)))
+        await self.drain()
+        # comptes blacklistés qui (re)joignent : bannis dès l'arrivée, groupés par le dispatcher
+        await asyncio.gather(*(self.ext("protection").on_member_join(m) for m in joiners))
+        await self.drain()
+    async def sc_restore(self):
+        staff = mock.snowflake()
+        g = self.guild(roles=[mock.role_payload(staff, "staff", 2, 0x2000)],
+                       overwrites=[{"id": str(staff), "type": 0, "allow": "1024", "deny": "0"}])
+        snap = serialize_guild(g)
+        # nuke : rôle staff (et ses overwrites) et quelques salons supprimés
+        g._remove_role(staff)
+        for ch in g.text_channels[-RESTORE_LOST:]:
+            g._remove_channel(ch)
+        current = serialize_guild(g)
+        for c in current["channels"].values():
+            c["ow"] = [o for o in c["ow"] if o[0] != staff]
+        report = await GuildRestorer(DiscordRest(g), concurrency=3).restore(snap, current)
+        expected = {"roles": 1, "categories": 0, "channels": RESTORE_LOST, "overwrites": CHANNELS - RESTORE_LOST,
+                    "failed": 0}
+        if report != expected:
+            raise AssertionError(f"restore: {report} (attendu {expected})")
+
+    async def sc_http(self):
+        base = f"http://{self.server.host}:{self.server.port}"
+        client = HttpClient()
+        try:
+            un = Unshortener(client.redirect_target, hosts={self.server.host})
+            urls = await asyncio.gather(*(un.resolve(f"{base}/r/{SHORT_HOPS}") for _ in range(CLICKS)))
+            if set(urls) != {f"http://localhost:{self.server.port}/land"}:
+                raise AssertionError(f"http: liens courts résolus en {set(urls)}")
+            status, data = await client.fetch_bytes(f"{base}/blob/1000")
+            if (status, len(data)) != (200, 1000):
+                raise AssertionError(f"http: téléchargement {status} {len(data)}o")
+            try:
+                await client.fetch_bytes(f"{base}/blob/{2 * CHUNK}", max_bytes=CHUNK)
+                raise AssertionError("http: plafond de téléchargement ignoré")
+            except ResponseTooLarge:
+                pass
+        finally:
+            await client.close()
+
+
+async def run(names):
+    server = await mock.MockDiscord().start()
+    discord.http.Route.BASE = server.base
+    os.environ.setdefault("DISCORD_TOKEN", "mock")
+    os.environ.pop("PROTECT_RECORD", None)
+    os.environ.pop("PROTECT_REPLAY", None)
+    import start
+    bot = start.bot
+    await bot._async_setup_hook()
+    data = await bot.http.static_login("mock")
+    bot._connection.user = discord.ClientUser(state=bot._connection, data=data)
+    await bot.setup_hook()   # extensions (cogs/), normalement chargées par login()
+    start.runtime.actions.start()
+    bench = Bench(server, start)
+
+    failed = 0
+    print(f"{'scénario':<16} {'appels':>7} {'budget':>7} {'429':>5} {'temps':>8} {'budget':>8}")
+    for name in names:
+        max_calls, max_secs = BUDGETS[name]
+        server.reset()
+        t0 = time.perf_counter()
+        await getattr(bench, f"sc_{name}")()
+        elapsed = time.perf_counter() - t0
+        calls = server.total()
+        ok = calls <= max_calls and elapsed <= max_secs
+        failed += not ok
+        print(f"{name:<16} {calls:>7} {max_calls:>7} {sum(server.limited.values()):>5} "
+              f"{elapsed:>7.2f}s {max_secs:>7.1f}s {'OK' if ok else 'DÉPASSÉ'}")
+        if not ok:
+            for route, n in server.calls.most_common():
+                print(f"    {n:>5}  {route}")
+
+    await start.runtime.actions.stop()
+    await bot.http.close()
+    await server.stop()
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Budget d'appels API du bot contre un faux Discord")
+    ap.add_argument("scenarios", nargs="*", help=f"parmi: {', '.join(BUDGETS)} (défaut: tous)")
+    args = ap.parse_args(argv)
+    unknown = [n for n in args.scenarios if n not in BUDGETS]
+    if unknown:
+        ap.error(f"scénario inconnu: {', '.join(unknown)}")
+    # le bot écrit config.db / journal / snapshots dans le dossier courant
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    os.chdir(tempfile.mkdtemp(prefix="apibench-"))
+    return asyncio.run(run(args.scenarios or list(BUDGETS)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
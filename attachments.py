@@ -0,0 +1,150 @@
+# ============================================================
+#  BOT PROTECT - attachments.py
+#  Anti-média : hash SHA-256 des pièces jointes (flux plafonné, hors event loop)
+#  comparé à une liste bot-wide + une liste par guild
+# ============================================================
+
+import os
+import re
+import time
+import asyncio
+import hashlib
+
+from links import CoalescingCache
+
+HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+# hashlib libère le GIL sur les gros blocs : on hache par paquets de cette taille
+HASH_BLOCK = 1024 * 1024
+
+
+def parse_hash_entry(entry: str):
+    # "sha256" ou "sha256:taille" → (hash, taille|None) ; None si invalide
+    h, _, size = entry.strip().lower().partition(":")
+    if not HASH_RE.match(h):
+        return None
+    if size:
+        if not size.isdigit():
+            return None
+        return h, int(size)
+    return h, None
+
+
+class BadHashes:
+    # hash → taille connue (ou None). La taille permet de ne télécharger que les
+    # pièces jointes dont `attachment.size` correspond à un hash listé.
+    def __init__(self, entries=()):
+        self.hashes = {}
+        self.sizes = set()
+        self.any_size = False   # au moins un hash sans taille : tout doit être haché
+        for e in entries:
+            p = parse_hash_entry(e) if isinstance(e, str) else e
+            if p:
+                self.add(*p)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def add(self, h, size=None):
+        self.hashes[h] = size
+        if size is None:
+            self.any_size = True
+        else:
+            self.sizes.add(size)
+
+    def candidate(self, size):
+        return self.any_size or size in self.sizes
+
+    def __contains__(self, h):
+        return h in self.hashes
+
+
+class BadHashFile:
+    # liste bot-wide, un hash par ligne ("sha256 [taille]", commentaires #), rechargée à chaud.
+    # reload() construit un BadHashes neuf dans son thread puis le publie d'une seule affectation :
+    # un scan voit l'ancienne liste ou la nouvelle, jamais un mélange des deux
+    def __init__(self, path: str):
+        self.path = path
+        self.current = BadHashes()
+        self.mtime = None
+        self.loaded_at = None
+
+    def __len__(self):
+        return len(self.current)
+
+    def candidate(self, size):
+        return self.current.candidate(size)
+
+    def __contains__(self, h):
+        return h in self.current
+
+    def reload(self, force: bool = False):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if not force and mtime == self.mtime:
+            return False
+        new = BadHashes()
+        with open(self.path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                p = parse_hash_entry(":".join(line.split()[:2])) if line else None
+                if p:
+                    new.add(*p)
+        self.current = new
+        self.mtime = mtime
+        self.loaded_at = time.time()
+        return True
+
+
+def attachment_key(url: str):
+    # les URLs du CDN Discord sont signées (?ex=&is=&hm=) : on garde le chemin,
+    # qui contient l'id du salon et de la pièce jointe
+    return url.split("?", 1)[0]
+
+
+class AttachmentScanner(CoalescingCache):
+    # url → sha256 hex (None si trop gros / illisible), en cache LRU/TTL :
+    # un même fichier reposté (même URL CDN) n'est jamais retéléchargé.
+    # Les téléchargements sont limités à `concurrency` en parallèle.
+    def __init__(self, http, max_bytes: int = 8 * 1024 * 1024, concurrency: int = 4,
+                 ttl: float = 86400, err_ttl: float = 300, maxsize: int = 20000):
+        super().__init__(maxsize)
+        self.http = http
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.err_ttl = err_ttl
+        self._sem = asyncio.Semaphore(concurrency)
+        self.downloaded = 0
+
+    async def _hash(self, url):
+        h = hashlib.sha256()
+        buf = bytearray()
+        async with self._sem:
+            async for chunk in self.http.iter_chunks(url, self.max_bytes):
+                buf += chunk
+                self.downloaded += len(chunk)
+                if len(buf) >= HASH_BLOCK:
+                    await asyncio.to_thread(h.update, bytes(buf))
+                    buf.clear()
+        if buf:
+            await asyncio.to_thread(h.update, bytes(buf))
+        return h.hexdigest()
+
+    async def digest(self, attachment):
+        if attachment.size > self.max_bytes:
+            return None
+        key = attachment_key(attachment.url)
+        return await self._get(key, lambda _: self._hash(attachment.url), lambda _: self.ttl,
+                               None, self.err_ttl)
+
+    async def scan(self, attachments, *lists):
+        # renvoie le 1er hash listé parmi les pièces jointes, sinon None.
+        # Seules les tailles candidates (cf. BadHashes.candidate) sont téléchargées.
+        todo = [a for a in attachments if any(l.candidate(a.size) for l in lists if len(l))]
+        if not todo:
+            return None
+        for h in await asyncio.gather(*(self.digest(a) for a in todo)):
+            if h and any(h in l for l in lists):
+                return h
+        return None
@@ -0,0 +1,5 @@
+# ============================================================
+#  BOT PROTECT - cogs/
+#  Extensions discord.py rechargeables à chaud (commande reload) :
+#  tout l'état partagé vit dans runtime.py, jamais rechargé
+# ============================================================
@@ -0,0 +1,345 @@
+# ============================================================
+#  BOT PROTECT - cogs/moderation.py
+#  Extension rechargeable : commandes de modération (ban, mute, warn, modlog…)
+#  et fin des sanctions temporaires qu'elles programment (unmute / unban)
+# ============================================================
+
+import re
+import time
+import asyncio
+import datetime
+from runtime import (
+    Extension, config, ensure_guild_conf, save_config, now_utc, send_log, parse_duration, base_embed,
+    expiry_handlers, slowmode_ctl, journal, sanctions, warnings_db, warn_ids,
+)
+
+import discord
+from discord.ext import commands
+
+ext = Extension()
+
+# ============================================================
+#  [UTILS] Rôle mute
+# ============================================================
+async def ensure_mute_role(guild: discord.Guild):
+    ensure_guild_conf(guild.id)
+    mrole_id = config[str(guild.id)].get("mute_role")
+    mrole = None
+    if mrole_id:
+        mrole = guild.get_role(mrole_id)
+    if not mrole:
+        # create if not exists
+        try:
+            mrole = await guild.create_role(name="Muted", reason="Role pour mute")
+            for ch in guild.channels:
+                try:
+                    await ch.set_permissions(mrole, send_messages=False, speak=False, add_reactions=False)
+                except:
+                    pass
+            config[str(guild.id)]["mute_role"] = mrole.id
+            await save_config(guild.id)
+        except:
+            pass
+    return mrole
+
+# ---- Fin des sanctions temporaires (échéances persistées dans runtime.sanctions) ----
+async def _expire_unmute(guild: discord.Guild, e):
+    member = guild.get_member(e.target)
+    role = guild.get_role(e.data.get("role") or 0)
+    if member is None or role is None or role not in member.roles:
+        return False
+    try:
+        await member.remove_roles(role, reason="Fin du mute")
+    except discord.NotFound:
+        return False
+    await send_log(guild, base_embed("🔈 Fin du mute", f"{member.mention} n'est plus mute."))
+    return True
+
+async def _expire_unban(guild: discord.Guild, e):
+    try:
+        await guild.unban(discord.Object(e.target), reason="Fin du bannissement temporaire")
+    except discord.NotFound:
+        return False
+    await send_log(guild, base_embed("✅ Fin du ban", f"<@{e.target}> débanni (ban temporaire)."))
+    return True
+
+# ============================================================
+#  [MODÉRATION] ban / unban / kick / mute / unmute / timeout / untimeout / clear / slowmode / warn system / nick / role / move
+# ============================================================
+@ext.command(name="ban")
+@commands.has_permissions(ban_members=True)
+async def ban_cmd(ctx, member: discord.Member, *, reason: str = "No reason"):
+    try:
+        await member.ban(reason=f"{reason} | by {ctx.author}")
+        journal.record(ctx.guild.id, "ban", member.id, ctx.author.id, reason)
+        await ctx.send(embed=base_embed("✅ Ban", f"{member} banni. Raison: {reason}", discord.Color.red()))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+@ext.command(name="tempban")
+@commands.has_permissions(ban_members=True)
+async def tempban_cmd(ctx, member: discord.Member, duration: str, *, reason: str = "No reason"):
+    try:
+        seconds = parse_duration(duration)
+    except ValueError as e:
+        return await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+    try:
+        await member.ban(reason=f"{reason} | {duration} | by {ctx.author}")
+        sanctions.schedule(ctx.guild.id, "unban", member.id, time.time() + seconds)
+        journal.record(ctx.guild.id, "tempban", member.id, ctx.author.id, reason, seconds=seconds)
+        await ctx.send(embed=base_embed("✅ Ban temporaire", f"{member} banni pour {duration}. Raison: {reason}", discord.Color.red()))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+@ext.command(name="unban")
+@commands.has_permissions(ban_members=True)
+async def unban_cmd(ctx, *, query: str):
+    # query peut être ID ou name#discrim
+    banned = await ctx.guild.bans()
+    target = None
+    for e in banned:
+        user = e.user
+        if str(user.id) == query or f"{user.name}#{user.discriminator}" == query:
+            target = user; break
+    if not target:
+        return await ctx.send(embed=base_embed("❓ Introuvable", query))
+    try:
+        await ctx.guild.unban(target, reason=f"by {ctx.author}")
+        sanctions.cancel(ctx.guild.id, "unban", target.id)
+        journal.record(ctx.guild.id, "unban", target.id, ctx.author.id)
+        await ctx.send(embed=base_embed("✅ Unban", f"{target} débanni."))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+@ext.command(name="kick")
+@commands.has_permissions(kick_members=True)
+async def kick_cmd(ctx, member: discord.Member, *, reason: str = "No reason"):
+    try:
+        await member.kick(reason=f"{reason} | by {ctx.author}")
+        journal.record(ctx.guild.id, "kick", member.id, ctx.author.id, reason)
+        await ctx.send(embed=base_embed("✅ Kick", f"{member} expulsé. Raison: {reason}"))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+# ---- Mute via rôle (fallback si timeout indispo) ----
+@ext.command(name="mute")
+@commands.has_permissions(moderate_members=True, manage_roles=True)
+async def mute_cmd(ctx, member: discord.Member, duration: str = None):
+    # essayer timeout si possible (28 jours max côté Discord)
+    try:
+        seconds = parse_duration(duration) if duration else 600
+    except ValueError as e:
+        return await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+    try:
+        until = now_utc() + datetime.timedelta(seconds=seconds)
+        await member.edit(timed_out_until=until, reason=f"Mute by {ctx.author}")
+        journal.record(ctx.guild.id, "mute", member.id, ctx.author.id, seconds=seconds)
+        return await ctx.send(embed=base_embed("🔇 Timeout", f"{member.mention} réduit au silence {seconds}s"))
+    except:
+        # fallback role Mute
+        mrole = await ensure_mute_role(ctx.guild)
+        if not mrole:
+            return await ctx.send(embed=base_embed("⚠️ Erreur", "Impossible de créer/trouver le rôle Muted", discord.Color.red()))
+        try:
+            await member.add_roles(mrole, reason=f"Mute by {ctx.author}")
+            sanctions.schedule(ctx.guild.id, "unmute", member.id, time.time() + seconds, role=mrole.id)
+            journal.record(ctx.guild.id, "mute", member.id, ctx.author.id, role=mrole.id, seconds=seconds)
+            await ctx.send(embed=base_embed("🔇 Mute", f"{member.mention} mute via rôle pour {seconds}s"))
+        except Exception as e:
+            await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+@ext.command(name="unmute")
+@commands.has_permissions(moderate_members=True, manage_roles=True)
+async def unmute_cmd(ctx, member: discord.Member):
+    # lever timeout
+    try:
+        await member.edit(timed_out_until=None, reason=f"Unmute by {ctx.author}")
+    except: pass
+    # retirer role muted
+    mrole_id = config[str(ctx.guild.id)].get("mute_role")
+    if mrole_id:
+        role = ctx.guild.get_role(mrole_id)
+        if role and role in member.roles:
+            try: await member.remove_roles(role, reason=f"Unmute by {ctx.author}")
+            except: pass
+    sanctions.cancel(ctx.guild.id, "unmute", member.id)
+    journal.record(ctx.guild.id, "unmute", member.id, ctx.author.id)
+    await ctx.send(embed=base_embed("🔈 Unmute", f"{member.mention} est de nouveau libre."))
+
+@ext.command(name="timeout")
+@commands.has_permissions(moderate_members=True)
+async def timeout_cmd(ctx, member: discord.Member, duration: str):
+    try:
+        seconds = parse_duration(duration)
+    except ValueError as e:
+        return await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+    until = now_utc() + datetime.timedelta(seconds=seconds)
+    try:
+        await member.edit(timed_out_until=until, reason=f"Timeout by {ctx.author}")
+        journal.record(ctx.guild.id, "timeout", member.id, ctx.author.id, seconds=seconds)
+        await ctx.send(embed=base_embed("⏳ Timeout", f"{member.mention} → {seconds}s"))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+@ext.command(name="untimeout")
+@commands.has_permissions(moderate_members=True)
+async def untimeout_cmd(ctx, member: discord.Member):
+    try:
+        await member.edit(timed_out_until=None, reason=f"untimeout by {ctx.author}")
+        journal.record(ctx.guild.id, "untimeout", member.id, ctx.author.id)
+        await ctx.send(embed=base_embed("✅ Un-timeout", f"{member.mention}"))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+@ext.command(name="clear")
+@commands.has_permissions(manage_messages=True)
+async def clear_cmd(ctx, amount: int):
+    try:
+        deleted = await ctx.channel.purge(limit=amount+1)
+        journal.record(ctx.guild.id, "clear", None, ctx.author.id, channel=ctx.channel.id, count=len(deleted) - 1)
+        await ctx.send(embed=base_embed("🧹 Clear", f"{len(deleted)-1} messages supprimés."), delete_after=4)
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+@ext.command(name="slowmode")
+@commands.has_permissions(manage_channels=True)
+async def slowmode_cmd(ctx, seconds: int):
+    try:
+        await ctx.channel.edit(slowmode_delay=max(0, seconds))
+        slowmode_ctl.forget(ctx.channel.id)
+        await ctx.send(embed=base_embed("🐢 Slowmode", f"{seconds}s"))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+@ext.command(name="autoslowmode")
+@commands.has_permissions(manage_channels=True)
+async def autoslowmode_cmd(ctx, mode: str, target_per_min: int = None, min_authors: int = None, max_delay: int = None):
+    ensure_guild_conf(ctx.guild.id)
+    asm = config[str(ctx.guild.id)]["protect"]["autoslowmode"]
+    asm["enabled"] = (mode.lower() == "on")
+    if target_per_min is not None:
+        asm["target_per_min"] = max(10, target_per_min)
+    if min_authors is not None:
+        asm["min_authors"] = max(2, min_authors)
+    if max_delay is not None:
+        asm["max_delay"] = max(2, min(21600, max_delay))
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("🐢 Slowmode adaptatif", f"enabled={asm['enabled']} target={asm['target_per_min']}/min authors={asm['min_authors']} max={asm['max_delay']}s"))
+
+# ---- Warn system (simple en mémoire + logs, warnings_db dans runtime) ----
+@ext.command(name="warn")
+@commands.has_permissions(moderate_members=True)
+async def warn_cmd(ctx, member: discord.Member, *, reason: str = "No reason"):
+    rec = {"id": next(warn_ids), "reason": reason, "by": ctx.author.id, "date": now_utc().isoformat()}
+    warnings_db[ctx.guild.id][member.id].append(rec)
+    journal.record(ctx.guild.id, "warn", member.id, ctx.author.id, reason, warn_id=rec["id"])
+    await ctx.send(embed=base_embed("⚠️ Warn", f"{member.mention} — {reason} (id={rec['id']})", discord.Color.orange()))
+    await send_log(ctx.guild, base_embed("⚠️ Warn", f"{member} — {reason} (by {ctx.author})", discord.Color.orange()))
+
+@ext.command(name="warnings")
+async def warnings_cmd(ctx, member: discord.Member = None):
+    member = member or ctx.author
+    lst = warnings_db[ctx.guild.id][member.id]
+    if not lst:
+        return await ctx.send(embed=base_embed("🗒️ Warnings", "Aucun avertissement."))
+    lines = [f"**#{r['id']}** — {r['reason']} (par <@{r['by']}>, {r['date']})" for r in lst]
+    await ctx.send(embed=base_embed(f"🗒️ Warnings — {member}", "\n".join(lines)))
+
+@ext.command(name="unwarn")
+@commands.has_permissions(moderate_members=True)
+async def unwarn_cmd(ctx, member: discord.Member, warn_id: int):
+    lst = warnings_db[ctx.guild.id][member.id]
+    before = len(lst)
+    lst[:] = [r for r in lst if r["id"] != warn_id]
+    after = len(lst)
+    if before != after:
+        journal.record(ctx.guild.id, "unwarn", member.id, ctx.author.id, warn_id=warn_id)
+    await ctx.send(embed=base_embed("🗑️ Unwarn", f"Retiré: {before - after}"))
+
+# ---- Journal de modération (local, indexé) ----
+@ext.command(name="modlog")
+@commands.has_permissions(moderate_members=True)
+async def modlog_cmd(ctx, *args: str):
+    # modlog [@user|id] [jours] [action] — ex: modlog @x 30 / modlog ban 7
+    user_id, days, action = None, 30, None
+    for a in args:
+        m = re.fullmatch(r"<@!?(\d+)>|(\d{15,21})", a)
+        if m:
+            user_id = int(m.group(1) or m.group(2))
+        elif a.isdigit():
+            days = max(1, min(int(a), 3650))
+        else:
+            action = a.lower()
+    # même horloge que journal.record (time.time) : now_utc() est naïf, .timestamp() le lirait en heure locale
+    since = time.time() - days * 86400
+    recs = await asyncio.to_thread(journal.query, ctx.guild.id, user_id, action, since, 20)
+    lines = []
+    for r in recs:
+        who = f"<@{r['u']}>" if r.get("u") else "—"
+        by = f"<@{r['by']}>" if r.get("by") else "auto"
+        lines.append(f"<t:{int(r['t'])}:d> **{r['a']}** {who} par {by}" + (f" — {r['r'][:80]}" if r.get("r") else ""))
+    title = f"📜 Modlog — {days}j" + (f" — {action}" if action else "")
+    await ctx.send(embed=base_embed(title, "\n".join(lines) if lines else "Aucune entrée."))
+
+# ---- Nick ----
+@ext.command(name="nick")
+@commands.has_permissions(manage_nicknames=True)
+async def nick_cmd(ctx, member: discord.Member, *, newnick: str):
+    try:
+        await member.edit(nick=newnick, reason=f"by {ctx.author}")
+        await ctx.send(embed=base_embed("✏️ Nick", f"{member.mention} → **{newnick}**"))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+@ext.command(name="nickreset")
+@commands.has_permissions(manage_nicknames=True)
+async def nickreset_cmd(ctx, member: discord.Member):
+    try:
+        await member.edit(nick=None, reason=f"by {ctx.author}")
+        await ctx.send(embed=base_embed("♻️ Nick reset", f"{member.mention}"))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+# ---- Role add/remove ----
+@ext.command(name="role")
+@commands.has_permissions(manage_roles=True)
+async def role_cmd(ctx, sub: str, member: discord.Member, role: discord.Role):
+    if sub == "add":
+        try:
+            await member.add_roles(role, reason=f"by {ctx.author}")
+            await ctx.send(embed=base_embed("✅ Role", f"{role.mention} ajouté à {member.mention}"))
+        except Exception as e:
+            await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+    elif sub == "remove":
+        try:
+            await member.remove_roles(role, reason=f"by {ctx.author}")
+            await ctx.send(embed=base_embed("🗑️ Role", f"{role.mention} retiré de {member.mention}"))
+        except Exception as e:
+            await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+    else:
+        await ctx.send(embed=base_embed("ℹ️ Role", "Utilise: `role add @user @role` ou `role remove @user @role`"))
+
+# ---- Move voice ----
+@ext.command(name="move")
+@commands.has_permissions(move_members=True)
+async def move_cmd(ctx, member: discord.Member, channel: discord.VoiceChannel):
+    try:
+        await member.move_to(channel, reason=f"by {ctx.author}")
+        await ctx.send(embed=base_embed("🔊 Move", f"{member.mention} → {channel.mention}"))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+# alias confort
+ext.alias(clear_cmd, "purge")
+
+# ============================================================
+#  [EXTENSION] Branchement sur l'état de runtime (rechargeable à chaud)
+# ============================================================
+async def setup(bot):
+    expiry_handlers.update(unmute=_expire_unmute, unban=_expire_unban)
+    await ext.setup(bot)
+
+async def teardown(bot):
+    await ext.teardown(bot)
+    for kind in ("unmute", "unban"):
+        expiry_handlers.pop(kind, None)
@@ -0,0 +1,1114 @@
+# ============================================================
+#  BOT PROTECT - cogs/protection.py
+#  Extension rechargeable : anti-link / phishing / média / spam / mention / emoji,
+#  anti-raid + quarantaine, anti-usurpation, filtre de mots, anti-nuke, lock, owner
+# ============================================================
+
+import io
+import re
+import json
+import time
+import asyncio
+import datetime
+from wordfilter import parse_term, MAX_TERMS, REGEX_PREFIX
+from attachments import parse_hash_entry
+from links import extract_urls, extract_invites, url_host, domain_allowed, INVITE_RE, INVITE_ERROR
+from mentions import mention_cost, sanction_for
+from runtime import (
+    Extension, bot, config, ensure_guild_conf, save_config, now_utc, human_tdelta, is_whitelisted, is_blacklisted,
+    send_log, parse_duration, base_embed, track, message_filters, expiry_handlers, recent_msgs, recent_joins,
+    mention_budget, antiraid_cooldown_until, quarantine_until, actions, slowmode_ctl, recorder, usage, journal,
+    impersonation, sanctions, blocklist, BLOCKLIST_PATH, unshortener, bad_hashes, BADHASH_PATH, scanner, scan_tasks,
+    invites, antinuke, antinuke_conf, audit_resolver, OWNER_SUPREME_ID, OWNER_ROLE_NAME, owner_only, is_staff,
+)
+
+import discord
+from discord.ext import commands, tasks
+
+ext = Extension()
+
+# ============================================================
+#  [UTILS] Quarantaine / Lockdown / Emojis
+# ============================================================
+def get_quarantine_role(guild: discord.Guild):
+    rid = config[str(guild.id)].get("quarantine_role")
+    return guild.get_role(rid) if rid else None
+
+async def ensure_quarantine_role(guild: discord.Guild):
+    # provisionné à l'avance (commande) : 1 overwrite par salon, une seule fois,
+    # jamais pendant un raid où chaque arrivant ne coûte plus qu'un appel
+    ensure_guild_conf(guild.id)
+    qrole = get_quarantine_role(guild)
+    if not qrole:
+        qrole = await guild.create_role(name="Quarantaine", permissions=discord.Permissions.none(),
+                                        reason="Rôle de quarantaine anti-raid")
+        config[str(guild.id)]["quarantine_role"] = qrole.id
+        await save_config(guild.id)
+    for ch in guild.channels:
+        ow = ch.overwrites_for(qrole)
+        if ow.view_channel is False:
+            continue
+        try:
+            await ch.set_permissions(qrole, view_channel=False, send_messages=False, connect=False,
+                                     add_reactions=False, reason="Rôle de quarantaine anti-raid")
+        except:
+            pass
+    return qrole
+
+def quarantine(member: discord.Member, qrole: discord.Role, reason: str):
+    # remplace tous les rôles (autorole compris) en 1 appel, via le dispatcher
+    return actions.set_roles(member, [qrole], "quarantine", reason)
+
+async def lockdown(guild: discord.Guild, lock: bool, only=None):
+    # Lock/unlock tous les salons textuels (ou seulement les ids de `only`) ; renvoie les ids modifiés
+    changed = []
+    for ch in guild.text_channels:
+        if only is not None and ch.id not in only:
+            continue
+        overwrites = ch.overwrites_for(guild.default_role)
+        if lock:
+            if overwrites.send_messages is not False:
+                overwrites.send_messages = False
+                try:
+                    await ch.set_permissions(guild.default_role, overwrite=overwrites, reason="Lockdown")
+                    changed.append(ch.id)
+                except: pass
+        else:
+            if overwrites.send_messages is False:
+                overwrites.send_messages = None
+                try:
+                    await ch.set_permissions(guild.default_role, overwrite=overwrites, reason="Unlockdown")
+                    changed.append(ch.id)
+                except: pass
+    return changed
+
+def extract_emojis(text: str):
+    # comptera : emojis unicode et custom <:name:id>
+    custom = re.findall(r"<a?:\w+:\d+>", text)
+    # Unicode rough count (heuristic)
+    uni = [c for c in text if c in emoji_unidata]
+    return len(custom) + len(uni)
+
+# basic unicode emoji set (lightweight heuristic)
+emoji_unidata = set()
+try:
+    import emoji as _emoji
+    for em in _emoji.EMOJI_DATA.keys():
+        emoji_unidata.add(em)
+except Exception:
+    # si lib non dispo, on reste minimal
+    pass
+
+# ============================================================
+#  [EVENTS] Arrivées (anti-raid / quarantaine / autorole) / Anti-usurpation
+# ============================================================
+@ext.event
+@track
+async def on_member_join(member: discord.Member):
+    gid = member.guild.id
+    ensure_guild_conf(gid)
+    if recorder: recorder.join(member)
+    # Logging
+    await send_log(member.guild, base_embed("👤 Nouveau membre", f"{member.mention} a rejoint."))
+    qrole = get_quarantine_role(member.guild)
+    # Anti-raid (avant l'autorole : l'arrivant qui déclenche le raid est déjà en quarantaine)
+    pr = config[str(gid)]["protect"]["antiraid"]
+    if pr["enabled"]:
+        now = now_utc()
+        recent_joins[gid].append((now, member.id))
+        # purge fenêtre
+        window = datetime.timedelta(seconds=pr["window_sec"])
+        while recent_joins[gid] and now - recent_joins[gid][0][0] > window:
+            recent_joins[gid].popleft()
+        if len(recent_joins[gid]) >= pr["max_joins"]:
+            if now >= antiraid_cooldown_until[gid]:
+                action = pr.get("action", "lockdown")
+                if action == "quarantine" and qrole:
+                    await _raid_quarantine(member, qrole, pr, now)
+                elif action in ("lockdown", "quarantine"):
+                    # quarantaine sans rôle provisionné : repli sur le lockdown
+                    actions.raid(member.guild, "lockdown", lambda: _raid_lockdown(member.guild, pr))
+                else:
+                    await send_log(member.guild, base_embed("🚨 Anti-Raid",
+                                                            f"Afflux détecté (joins={len(recent_joins[gid])}). Action: {action}"))
+                antiraid_cooldown_until[gid] = now + datetime.timedelta(seconds=pr["cooldown_sec"])
+    # Blacklist : banni dès l'arrivée (lookup O(1) dans le frozenset compilé), avant tout autre appel
+    if is_blacklisted(gid, member.id):
+        if actions.ban(member.guild, member, reason="Blacklist guild"):
+            await send_log(member.guild, base_embed("⛔ Blacklist", f"{member} banni à l'arrivée."))
+        return
+    # Anti-usurpation du staff (quarantaine/ban : pas d'autorole)
+    if await _check_impersonation(member):
+        return
+    # Quarantaine (raid en cours) à la place de l'autorole : 1 seul appel
+    if qrole and now_utc() < quarantine_until[gid]:
+        if qrole not in member.roles:
+            quarantine(member, qrole, "Raid en cours")
+        return
+    # Autorole si configuré
+    ar = config[str(gid)].get("autorole")
+    if ar:
+        role = member.guild.get_role(ar)
+        if role:
+            try: await member.add_roles(role, reason="Autorole configuré")
+            except: pass
+
+async def _check_impersonation(member: discord.Member):
+    # True si le membre a été sanctionné (quarantaine / ban)
+    gid = member.guild.id
+    pr = config[str(gid)]["protect"]["antiimpersonation"]
+    if not pr["enabled"] or member.bot or is_whitelisted(gid, member.id):
+        return False
+    hit = impersonation.check(member, pr["distance"])
+    if not hit:
+        return False
+    name, staff_id, dist = hit
+    reason = f"Usurpation du staff ({staff_id})"
+    journal.record(gid, "impersonation", member.id, None, reason, name=name, staff=staff_id, distance=dist)
+    action = pr["action"]
+    qrole = get_quarantine_role(member.guild) if action == "quarantine" else None
+    if action == "ban":
+        actions.ban(member.guild, member, reason)
+    elif qrole and qrole not in member.roles:
+        quarantine(member, qrole, reason)
+    await send_log(member.guild, base_embed("🎭 Anti-usurpation",
+                                            f"{member.mention} (`{discord.utils.escape_markdown(name)}`) imite <@{staff_id}>"
+                                            f"{' (nom identique)' if not dist else f' (écart {dist})'}. "
+                                            f"Action: {action if action == 'ban' or qrole else 'log'}",
+                                            discord.Color.orange()))
+    return action == "ban" or qrole is not None
+
+@ext.event
+@track
+async def on_member_update(before: discord.Member, after: discord.Member):
+    # index du staff tenu à jour au fil de l'eau (rôles / pseudo), pas reconstruit
+    if before.roles != after.roles or before.nick != after.nick:
+        impersonation.update(after)
+    if after.nick and before.nick != after.nick:
+        ensure_guild_conf(after.guild.id)
+        await _check_impersonation(after)
+
+@ext.event
+@track
+async def on_user_update(before: discord.User, after: discord.User):
+    # nom d'utilisateur / nom global : visible dans toutes les guilds communes
+    if before.name == after.name and before.global_name == after.global_name:
+        return
+    for guild in after.mutual_guilds:
+        member = guild.get_member(after.id)
+        if member is None:
+            continue
+        impersonation.update(member)
+        ensure_guild_conf(guild.id)
+        await _check_impersonation(member)
+
+@ext.event
+@track
+async def on_member_remove(member: discord.Member):
+    impersonation.remove(member)
+    # départ ou kick : seul l'audit-log tranche (fetch groupé, annulé si la gateway l'a livré)
+    if antinuke_conf(member.guild.id)["enabled"]:
+        audit_resolver.poke(member.guild)
+
+@ext.event
+@track
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    # permissions ou nom (Owner) d'un rôle changés : le staff de la guild est à recalculer
+    if before.permissions != after.permissions or before.name != after.name:
+        impersonation.invalidate(after.guild.id)
+
+async def _raid_quarantine(member: discord.Member, qrole: discord.Role, pr, now):
+    guild = member.guild
+    quarantine_until[guild.id] = now + datetime.timedelta(seconds=pr["cooldown_sec"])
+    # les arrivants de la fenêtre qui a déclenché le raid passent aussi en quarantaine
+    # (celui qui déclenche est traité par on_member_join)
+    for _, uid in recent_joins[guild.id]:
+        m = guild.get_member(uid) if uid != member.id else None
+        if m and qrole not in m.roles and not is_blacklisted(guild.id, uid):
+            quarantine(m, qrole, "Raid détecté")
+    prefix = config[str(guild.id)]["prefix"]
+    await send_log(guild, base_embed("🚨 Anti-Raid: QUARANTAINE",
+                                     f"Afflux détecté (joins={len(recent_joins[guild.id])}) → arrivants mis en "
+                                     f"quarantaine pendant {pr['cooldown_sec']}s.\n"
+                                     f"`{prefix}quarantine release all` ou `{prefix}quarantine ban all` pour trancher.",
+                                     discord.Color.red()))
+
+async def _raid_lockdown(guild: discord.Guild, pr):
+    changed = await lockdown(guild, True)
+    # seuls les salons verrouillés par le raid seront rouverts (pas les lock manuels / minutés) ;
+    # un 2e raid avant l'échéance ajoute ses salons à ceux du premier
+    prev = next((e for e in sanctions.pending(guild.id) if e.kind == "unlockdown"), None)
+    channels = sorted(set(changed) | set(prev.data.get("channels", ()) if prev else ()))
+    sanctions.schedule(guild.id, "unlockdown", 0, time.time() + pr["cooldown_sec"], channels=channels)
+    await send_log(guild, base_embed("🚨 Anti-Raid: LOCKDOWN",
+                                     f"Afflux détecté → `{len(changed)}` salons verrouillés pour {pr['cooldown_sec']}s.",
+                                     discord.Color.red()))
+
+# ---- Fin des locks minutés / du lockdown (échéances persistées dans runtime.sanctions) ----
+async def _expire_unlock(guild: discord.Guild, e):
+    ch = guild.get_channel(e.target)
+    if ch is None:
+        return False
+    ow = ch.overwrites_for(guild.default_role)
+    if ow.send_messages is not False:
+        return False
+    ow.send_messages = None
+    await ch.set_permissions(guild.default_role, overwrite=ow, reason="Fin du lock minuté")
+    await send_log(guild, base_embed("🔓 Unlock", f"{ch.mention} déverrouillé (fin du lock minuté)."))
+    return True
+
+async def _expire_unlockdown(guild: discord.Guild, e):
+    # échéance sans liste (programmée avant qu'elle soit enregistrée) : tous les salons, comme avant
+    only = set(e.data["channels"]) if "channels" in e.data else None
+    changed = await lockdown(guild, False, only)
+    if changed:
+        await send_log(guild, base_embed("🔓 Unlockdown", f"{len(changed)} salons déverrouillés.", discord.Color.green()))
+    return True
+
+@ext.loop
+@tasks.loop(minutes=5)
+async def blocklist_watch():
+    # recharge la blocklist si le fichier a changé (construction hors event loop)
+    if await asyncio.to_thread(blocklist.reload):
+        print(f"[blocklist] {len(blocklist)} domaines chargés")
+    if await asyncio.to_thread(bad_hashes.reload):
+        print(f"[blocklist] {len(bad_hashes)} hash de médias chargés")
+
+# ============================================================
+#  [EVENT] Message Create → Anti-link / Anti-spam / Anti-mention / Anti-emoji
+# ============================================================
+async def resolved_urls(content: str):
+    # [(url d'origine, url finale)] ; les liens courts sont suivis (cache partagé)
+    urls = extract_urls(content)
+    finals = await asyncio.gather(*(unshortener.resolve(u) for u in urls))
+    return list(zip(urls, finals))
+
+async def phishing_domain(content: str):
+    for url, final in await resolved_urls(content):
+        hit = blocklist.match(url_host(url)) or (final != url and blocklist.match(url_host(final)))
+        if hit:
+            return hit
+    return None
+
+async def _scan_attachments(message: discord.Message, cc):
+    # liste bot-wide figée pour tout le scan (un reload pendant le téléchargement n'y touche pas)
+    h = await scanner.scan(message.attachments, bad_hashes.current, cc.bad_hashes)
+    if h:
+        actions.delete(message, reason="Média interdit")
+        actions.timeout(message.author, 3600, reason="Média interdit")
+        await send_log(message.guild, base_embed("🖼️ Anti-média", f"Pièce jointe connue (`{h[:16]}…`) supprimée, {message.author.mention} timeout 1h.", discord.Color.red()))
+
+async def _links_allowed(message: discord.Message, cc):
+    content = message.content
+    # invitations : autorisées vers cette guild ou une guild partenaire (par id)
+    codes = extract_invites(content)
+    if codes and not any(d in ("discord.gg", "discord.com", "discordapp.com") for d in cc.link_whitelist):
+        targets = await asyncio.gather(*(invites.resolve(c) for c in codes))
+        for t in targets:
+            if t is INVITE_ERROR:
+                continue   # Discord indisponible : on ne sanctionne pas une invite peut-être partenaire
+            if t is None or (t != message.guild.id and t not in cc.invite_whitelist):
+                return False
+    # autres liens : domaine (ou sous-domaine) whitelisté, vérifié sur la destination finale
+    for url, final in await resolved_urls(content):
+        if INVITE_RE.match(url):
+            continue
+        if not domain_allowed(final, url_host(final), cc.link_whitelist):
+            return False
+    return True
+
+async def protect_message(message: discord.Message):
+    # filtre de runtime.message_filters (appelé par on_message de start.py, hors DM et bots) :
+    # True = message sanctionné, les commandes ne sont pas traitées
+    gid = message.guild.id
+    uid = message.author.id
+    ensure_guild_conf(gid)
+    if recorder: recorder.message(message)
+
+    # Whitelist / Blacklist (blacklist kick-ban auto)
+    if is_blacklisted(gid, uid):
+        if actions.ban(message.guild, message.author, reason="Blacklist guild"):
+            await send_log(message.guild, base_embed("⛔ Blacklist",
+                                                     f"{message.author} banni automatiquement."))
+        return True
+
+    prot = config[str(gid)]["protect"]
+
+    # ---- Anti-Média (hash en tâche de fond : ne retarde jamais les protections texte) ----
+    if message.attachments and prot["antimedia"]["enabled"] and not is_whitelisted(gid, uid):
+        task = asyncio.create_task(_scan_attachments(message, config.compiled(gid)))
+        scan_tasks.add(task)
+        task.add_done_callback(scan_tasks.discard)
+
+    # ---- Anti-Phishing (blocklist bot-wide, indépendante de l'anti-link) ----
+    if prot["antiphishing"] and len(blocklist) and "://" in message.content and not is_whitelisted(gid, uid):
+        bad = await phishing_domain(message.content)
+        if bad:
+            actions.delete(message, reason=f"Phishing: {bad}")
+            actions.timeout(message.author, 3600, reason=f"Phishing: {bad}")
+            await send_log(message.guild, base_embed("🎣 Anti-phishing", f"Lien vers `{bad}` supprimé, {message.author.mention} timeout 1h.", discord.Color.red()))
+            return True
+
+    # ---- Anti-Link ----
+    if prot["antilink"] and not is_whitelisted(gid, uid):
+        if ("://" in message.content or INVITE_RE.search(message.content)):
+            # autoriser si domaine whitelisted / invitation vers une guild autorisée
+            if not await _links_allowed(message, config.compiled(gid)):
+                actions.delete(message, reason="Anti-link")
+                await send_log(message.guild, base_embed("🔗 Lien supprimé", f"Par {message.author.mention}"))
+                return True
+
+    # ---- Filtre de mots (1 automate + 1 regex par liste, recompilés seulement si elle change) ----
+    wf = prot["wordfilter"]
+    if wf["enabled"] and wf["words"] and message.content and not is_whitelisted(gid, uid):
+        term = config.compiled(gid).word_filter.match(message.content)
+        if term:
+            if wf["action"] != "log":
+                actions.delete(message, reason=f"Filtre de mots: {term}")
+            if wf["action"] == "timeout":
+                actions.timeout(message.author, wf["timeout_sec"], reason=f"Filtre de mots: {term}")
+            await send_log(message.guild, base_embed("🤐 Filtre de mots",
+                                                     f"||{discord.utils.escape_markdown(term)}|| → {message.author.mention} "
+                                                     f"dans {message.channel.mention} (action: {wf['action']})"))
+            if wf["action"] != "log":
+                return True
+
+    # ---- Anti-Mention (users/rôles/@everyone distincts + budget glissant) ----
+    am = prot["antimention"]
+    if am["enabled"] and not is_whitelisted(gid, uid):
+        cost = mention_cost(message)
+        if cost:
+            strike, flood, flood_started = mention_budget.check(gid, uid, cost, am, now_utc().timestamp())
+            if strike or flood:
+                actions.delete(message, reason="Anti-mention")
+                if strike:
+                    secs = sanction_for(strike)
+                    actions.timeout(message.author, secs, reason=f"Anti-mention (palier {strike})")
+                    await send_log(message.guild, base_embed("📣 Anti-mention", f"Message supprimé & timeout {secs}s (palier {strike}) → {message.author.mention}"))
+                if flood_started:
+                    await send_log(message.guild, base_embed("📣 Anti-mention: vague de pings",
+                                                             "Budget de la guild dépassé : les messages avec mentions sont supprimés jusqu'au retour au calme.",
+                                                             discord.Color.red()))
+                return True
+
+    # ---- Anti-Emoji Spam ----
+    if prot["antiemoji"]["enabled"] and not is_whitelisted(gid, uid):
+        if extract_emojis(message.content) >= prot["antiemoji"]["max_emojis"]:
+            actions.delete(message, reason="Anti-emoji")
+            await send_log(message.guild, base_embed("😵 Anti-emoji", f"Message supprimé → {message.author.mention}"))
+            return True
+
+    # ---- Slowmode adaptatif (comptage seulement, décision dans autoslowmode_tick) ----
+    if prot["autoslowmode"]["enabled"]:
+        slowmode_ctl.observe(message.channel, uid)
+
+    # ---- Anti-Spam ----
+    asp = prot["antispam"]
+    if asp["enabled"] and not is_whitelisted(gid, uid):
+        dq = recent_msgs[gid][uid]
+        now = now_utc()
+        dq.append(now)
+        window = datetime.timedelta(seconds=asp["window_sec"])
+        while dq and now - dq[0] > window:
+            dq.popleft()
+        if len(dq) >= asp["threshold"]:
+            # sanction = timeout (dédupliqué : pas de re-timeout tant que le précédent court)
+            if actions.timeout(message.author, asp["timeout_sec"], reason="Anti-spam"):
+                await send_log(message.guild, base_embed("🚫 Anti-spam", f"{message.author.mention} timeout {asp['timeout_sec']}s"))
+            dq.clear()
+    return False
+
+@ext.loop
+@tasks.loop(seconds=10)
+async def autoslowmode_tick():
+    def conf_for(cid):
+        ch = bot.get_channel(cid)
+        if not ch or not getattr(ch, "guild", None):
+            return None
+        ensure_guild_conf(ch.guild.id)
+        return config[str(ch.guild.id)]["protect"]["autoslowmode"]
+
+    for cid, delay in slowmode_ctl.tick(now_utc().timestamp(), conf_for):
+        ch = bot.get_channel(cid)
+        if not ch:
+            continue
+        actions.channel_edit(ch, "slowmode", slowmode_delay=delay, reason="Slowmode adaptatif")
+        await send_log(ch.guild, base_embed("🐢 Slowmode auto", f"{ch.mention} → {delay}s"))
+
+# ============================================================
+#  [EVENT] Anti-nuke (audit logs) / Webhooks update
+# ============================================================
+def _antinuke_punish(guild: discord.Guild, uid: int, kind: str, count: int):
+    actions.raid(guild, f"antinuke:{uid}", lambda: _antinuke_strip(guild, uid, kind, count),
+                 target=uid, reason=f"{kind} x{count}")
+
+async def _antinuke_strip(guild: discord.Guild, uid: int, kind: str, count: int):
+    # retire les rôles de l'acteur (1 appel) + neutralise ses rôles d'intégration
+    stripped = 0
+    member = guild.get_member(uid)
+    if member:
+        keep = [r for r in member.roles if r.is_default() or r.managed]
+        if len(keep) != len(member.roles):
+            try:
+                await member.edit(roles=keep, reason=f"Anti-nuke: {kind} x{count}")
+                stripped = len(member.roles) - len(keep)
+            except: pass
+        for r in member.roles:
+            if r.managed and r.permissions.value:
+                try: await r.edit(permissions=discord.Permissions.none(), reason="Anti-nuke")
+                except: pass
+    # supprime les webhooks créés par l'acteur
+    deleted = 0
+    try:
+        for wh in await guild.webhooks():
+            if wh.user and wh.user.id == uid:
+                try:
+                    await wh.delete(reason="Anti-nuke")
+                    deleted += 1
+                except: pass
+    except: pass
+    await send_log(guild, base_embed("☢️ Anti-nuke",
+                                     f"<@{uid}> : `{kind}` x{count} → {stripped} rôles retirés, {deleted} webhooks supprimés.",
+                                     discord.Color.dark_red()))
+
+@ext.event
+@track
+async def on_audit_log_entry_create(entry: discord.AuditLogEntry):
+    audit_resolver.feed(entry)
+
+@ext.event
+@track
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    if antinuke_conf(channel.guild.id)["enabled"]:
+        audit_resolver.poke(channel.guild)
+
+@ext.event
+@track
+async def on_guild_role_delete(role: discord.Role):
+    impersonation.invalidate(role.guild.id)
+    if antinuke_conf(role.guild.id)["enabled"]:
+        audit_resolver.poke(role.guild)
+
+@ext.event
+@track
+async def on_member_ban(guild: discord.Guild, user: discord.User):
+    if antinuke_conf(guild.id)["enabled"]:
+        audit_resolver.poke(guild)
+
+@ext.event
+@track
+async def on_webhooks_update(channel: discord.abc.GuildChannel):
+    guild = channel.guild
+    ensure_guild_conf(guild.id)
+    if recorder: recorder.webhook(channel)
+    if antinuke_conf(guild.id)["enabled"]:
+        audit_resolver.poke(guild)
+    if config[str(guild.id)]["protect"].get("antiwebhook", True):
+        await send_log(guild, base_embed("🪝 Webhook modifié", f"Salon: {channel.mention}"))
+
+# ============================================================
+#  [PROTECT] Anti-link / Whitelist liens
+# ============================================================
+@ext.command(name="antilink")
+@commands.has_permissions(administrator=True)
+async def antilink_cmd(ctx, mode: str):
+    ensure_guild_conf(ctx.guild.id)
+    val = mode.lower() == "on"
+    config[str(ctx.guild.id)]["protect"]["antilink"] = val
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("🔗 Anti-link", f"État: `{val}`"))
+
+@ext.command(name="linkwhitelist")
+@commands.has_permissions(administrator=True)
+async def linkwhitelist_cmd(ctx, sub: str, domain: str = None):
+    ensure_guild_conf(ctx.guild.id)
+    wl = config[str(ctx.guild.id)]["protect"]["link_whitelist"]
+    sub = sub.lower()
+    if sub == "add" and domain:
+        if domain.lower() not in [d.lower() for d in wl]:
+            wl.append(domain)
+        await save_config(ctx.guild.id)
+        await ctx.send(embed=base_embed("✅ Ajout WL", f"Domaine autorisé: `{domain}`"))
+    elif sub == "remove" and domain:
+        wl[:] = [d for d in wl if d.lower() != domain.lower()]
+        await save_config(ctx.guild.id)
+        await ctx.send(embed=base_embed("🗑️ Retrait WL", f"Domaine retiré: `{domain}`"))
+    else:
+        await ctx.send(embed=base_embed("📄 Whitelist", ", ".join(wl) if wl else "∅"))
+
+@ext.command(name="invitewhitelist")
+@commands.has_permissions(administrator=True)
+async def invitewhitelist_cmd(ctx, sub: str, guild_id: int = None):
+    ensure_guild_conf(ctx.guild.id)
+    wl = config[str(ctx.guild.id)]["protect"]["invite_whitelist"]
+    sub = sub.lower()
+    if sub == "add" and guild_id:
+        if guild_id not in wl:
+            wl.append(guild_id)
+        await save_config(ctx.guild.id)
+        await ctx.send(embed=base_embed("✅ Ajout WL invitations", f"Serveur autorisé: `{guild_id}`"))
+    elif sub == "remove" and guild_id:
+        wl[:] = [g for g in wl if g != guild_id]
+        await save_config(ctx.guild.id)
+        await ctx.send(embed=base_embed("🗑️ Retrait WL invitations", f"Serveur retiré: `{guild_id}`"))
+    else:
+        await ctx.send(embed=base_embed("📄 Invitations autorisées", ", ".join(f"`{g}`" for g in wl) if wl else "∅"))
+
+@ext.command(name="antiphishing")
+@commands.has_permissions(administrator=True)
+async def antiphishing_cmd(ctx, mode: str):
+    ensure_guild_conf(ctx.guild.id)
+    val = mode.lower() == "on"
+    config[str(ctx.guild.id)]["protect"]["antiphishing"] = val
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("🎣 Anti-phishing", f"État: `{val}` ({len(blocklist)} domaines connus)"))
+
+@ext.command(name="antimedia")
+@commands.has_permissions(administrator=True)
+async def antimedia_cmd(ctx, mode: str):
+    ensure_guild_conf(ctx.guild.id)
+    am = config[str(ctx.guild.id)]["protect"]["antimedia"]
+    am["enabled"] = mode.lower() == "on"
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("🖼️ Anti-média", f"État: `{am['enabled']}` ({len(am['hashes'])} hash serveur, {len(bad_hashes)} globaux)"))
+
+@ext.command(name="badhash")
+@commands.has_permissions(administrator=True)
+async def badhash_cmd(ctx, sub: str = "list", value: str = None):
+    ensure_guild_conf(ctx.guild.id)
+    lst = config[str(ctx.guild.id)]["protect"]["antimedia"]["hashes"]
+    sub = sub.lower()
+    entries = []
+    if sub in ("add", "remove"):
+        if value:
+            p = parse_hash_entry(value)
+            if not p:
+                return await ctx.send(embed=base_embed("⚠️ Hash invalide", "SHA-256 attendu (64 caractères hex)."))
+            entries.append(p)
+        elif ctx.message.reference and isinstance(ctx.message.reference.resolved, discord.Message):
+            # en réponse à un message : on hache ses pièces jointes (taille connue)
+            for a in ctx.message.reference.resolved.attachments:
+                h = await scanner.digest(a)
+                if h:
+                    entries.append((h, a.size))
+        if not entries:
+            return await ctx.send(embed=base_embed("⚠️ Badhash", "Donne un hash ou réponds à un message avec pièce jointe."))
+    if sub == "add":
+        known = {e.split(":", 1)[0] for e in lst}
+        for h, size in entries:
+            if h not in known:
+                lst.append(f"{h}:{size}" if size is not None else h)
+        await save_config(ctx.guild.id)
+        await ctx.send(embed=base_embed("✅ Hash interdits", "\n".join(f"`{h}`" for h, _ in entries)))
+    elif sub == "remove":
+        drop = {h for h, _ in entries}
+        lst[:] = [e for e in lst if e.split(":", 1)[0] not in drop]
+        await save_config(ctx.guild.id)
+        await ctx.send(embed=base_embed("🗑️ Hash retirés", "\n".join(f"`{h}`" for h in drop)))
+    else:
+        await ctx.send(embed=base_embed("📄 Hash interdits", "\n".join(f"`{e.split(':', 1)[0]}`" for e in lst[:25]) if lst else "∅"))
+
+@ext.command(name="blocklist")
+async def blocklist_cmd(ctx, sub: str = "status"):
+    if ctx.author.id != OWNER_SUPREME_ID:
+        return await ctx.send(embed=base_embed("❌ Permission refusée", "Réservé au Owner supreme."))
+    if sub.lower() == "reload":
+        changed = await asyncio.to_thread(blocklist.reload, True)
+        await asyncio.to_thread(bad_hashes.reload, True)
+        if not changed:
+            return await ctx.send(embed=base_embed("⚠️ Blocklist", f"Fichier introuvable: `{BLOCKLIST_PATH}`", discord.Color.red()))
+    await ctx.send(embed=base_embed("🎣 Blocklist", f"{len(blocklist)} domaines | fichier: `{BLOCKLIST_PATH}`\n"
+                                                    f"{len(bad_hashes)} hash de médias | fichier: `{BADHASH_PATH}`"))
+
+@ext.command(name="usage")
+async def usage_cmd(ctx, arg: str = "10"):
+    # coût des guilds (moyennes décroissantes, demi-vie 1h) : top N ou export JSON
+    if ctx.author.id != OWNER_SUPREME_ID:
+        return await ctx.send(embed=base_embed("❌ Permission refusée", "Réservé au Owner supreme."))
+    if arg.lower() == "export":
+        data = json.dumps(usage.export(), indent=1).encode("utf-8")
+        return await ctx.send(file=discord.File(io.BytesIO(data), filename="usage.json"))
+    n = max(1, min(int(arg) if arg.isdigit() else 10, 25))
+    lines = []
+    for gid, cost, v in usage.top(n):
+        g = bot.get_guild(gid)
+        lines.append(f"**{g.name if g else gid}** `{gid}` — coût {cost:.0f} | cpu {v['cpu']*1000:.0f}ms "
+                     f"evt {v['events']:.0f} rest {v['rest']:.0f} actions {v['actions']:.0f}")
+    await ctx.send(embed=base_embed(f"📈 Top {n} guilds (coût)", "\n".join(lines) or "Aucune donnée."))
+
+# ============================================================
+#  [PROTECT] Anti-spam (on/off + config)
+# ============================================================
+@ext.command(name="antispam")
+@commands.has_permissions(administrator=True)
+async def antispam_cmd(ctx, mode: str = None):
+    ensure_guild_conf(ctx.guild.id)
+    asp = config[str(ctx.guild.id)]["protect"]["antispam"]
+    if mode is None:
+        return await ctx.send(embed=base_embed(
+            "🛡️ Anti-spam",
+            f"enabled={asp['enabled']} window={asp['window_sec']} thr={asp['threshold']} timeout={asp['timeout_sec']}"
+        ))
+    val = mode.lower() == "on"
+    asp["enabled"] = val
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("🛡️ Anti-spam", f"État: `{val}`"))
+
+
+@ext.command(name="antispam_config")
+@commands.has_permissions(administrator=True)
+async def antispam_config_cmd(ctx, window_sec: int, threshold: int, timeout_sec: int):
+    ensure_guild_conf(ctx.guild.id)
+    asp = config[str(ctx.guild.id)]["protect"]["antispam"]
+    asp["window_sec"] = max(2, window_sec)
+    asp["threshold"] = max(3, threshold)
+    asp["timeout_sec"] = max(10, timeout_sec)
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed(
+        "⚙️ Anti-spam configuré",
+        f"window={asp['window_sec']}s thr={asp['threshold']} timeout={asp['timeout_sec']}s"
+    ))
+
+# ============================================================
+#  [PROTECT] Anti-raid (on/off + config)
+# ============================================================
+@ext.command(name="antiraid")
+@commands.has_permissions(administrator=True)
+async def antiraid_cmd(ctx, mode: str = None):
+    ensure_guild_conf(ctx.guild.id)
+    ar = config[str(ctx.guild.id)]["protect"]["antiraid"]
+    if mode is None:
+        return await ctx.send(embed=base_embed("🛡️ Anti-raid", f"enabled={ar['enabled']} window={ar['window_sec']} max_joins={ar['max_joins']} action={ar['action']} cooldown={ar['cooldown_sec']}s"))
+    val = mode.lower() == "on"
+    ar["enabled"] = val
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("🛡️ Anti-raid", f"État: `{val}`"))
+
+@ext.command(name="antiraid_config")
+@commands.has_permissions(administrator=True)
+async def antiraid_config_cmd(ctx, window_sec: int, max_joins: int, action: str, cooldown_sec: int):
+    ensure_guild_conf(ctx.guild.id)
+    ar = config[str(ctx.guild.id)]["protect"]["antiraid"]
+    ar["window_sec"] = max(10, window_sec)
+    ar["max_joins"] = max(3, max_joins)
+    ar["action"] = action if action in ("lockdown", "quarantine", "log") else "lockdown"
+    ar["cooldown_sec"] = max(60, cooldown_sec)
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("⚙️ Anti-raid configuré", f"window={ar['window_sec']} max_joins={ar['max_joins']} action={ar['action']} cooldown={ar['cooldown_sec']}s"))
+    if ar["action"] == "quarantine" and not get_quarantine_role(ctx.guild):
+        await ctx.send(embed=base_embed("⚠️ Quarantaine", f"Aucun rôle provisionné : `{ctx.prefix}quarantine setup` "
+                                                          "(sinon repli sur le lockdown)."))
+
+@ext.command(name="quarantine")
+@commands.has_permissions(manage_roles=True, ban_members=True)
+async def quarantine_cmd(ctx, sub: str = "status", members: commands.Greedy[discord.Member] = None, scope: str = None):
+    ensure_guild_conf(ctx.guild.id)
+    gid = ctx.guild.id
+    if sub == "setup":
+        try:
+            qrole = await ensure_quarantine_role(ctx.guild)
+        except Exception as e:
+            return await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+        return await ctx.send(embed=base_embed("✅ Quarantaine", f"Rôle prêt: {qrole.mention} (aucun salon visible)",
+                                               discord.Color.green()))
+    qrole = get_quarantine_role(ctx.guild)
+    if not qrole:
+        return await ctx.send(embed=base_embed("ℹ️ Quarantaine", f"Aucun rôle : `{ctx.prefix}quarantine setup` "
+                                                                 f"ou `{ctx.prefix}setquarantinerole @role`"))
+    if sub == "end":
+        quarantine_until[gid] = now_utc()
+        return await ctx.send(embed=base_embed("✅ Quarantaine", "Fenêtre de raid terminée : retour à l'autorole."))
+    held = [m for m in qrole.members if not m.bot]
+    if sub in ("release", "ban"):
+        targets = [m for m in members or () if qrole in m.roles]
+        if scope == "all":
+            targets = held
+        if not targets:
+            return await ctx.send(embed=base_embed("ℹ️ Quarantaine", f"`{ctx.prefix}quarantine {sub} @membres…` ou `all`"))
+        reason = f"Quarantaine: {sub} by {ctx.author}"
+        if sub == "ban":
+            # bans regroupés par le dispatcher (bulk_ban, 200 par appel)
+            for m in targets:
+                actions.ban(ctx.guild, m, reason)
+        else:
+            ar = ctx.guild.get_role(config[str(gid)].get("autorole") or 0)
+            for m in targets:
+                roles = [r for r in m.roles if r != qrole and not r.is_default()]
+                if ar and ar not in roles:
+                    roles.append(ar)
+                actions.set_roles(m, roles, "quarantine_release", reason)
+        return await ctx.send(embed=base_embed("✅ Quarantaine", f"{len(targets)} membre(s): {sub} en cours.",
+                                               discord.Color.green()))
+    if sub == "list":
+        names = [m.mention for m in held[:50]]
+        more = f"\n… et {len(held) - 50} autres" if len(held) > 50 else ""
+        return await ctx.send(embed=base_embed(f"📄 Quarantaine ({len(held)})", (", ".join(names) or "∅") + more))
+    left = quarantine_until[gid] - now_utc()
+    state = f"active encore {human_tdelta(left)}" if left.total_seconds() > 0 else "inactive"
+    await ctx.send(embed=base_embed("🛡️ Quarantaine", f"Rôle: {qrole.mention} | fenêtre de raid: {state} | "
+                                                     f"en quarantaine: {len(held)}"))
+
+# ============================================================
+#  [PROTECT] Anti-usurpation du staff
+# ============================================================
+@ext.command(name="antiimpersonation")
+@commands.has_permissions(administrator=True)
+async def antiimpersonation_cmd(ctx, mode: str = None):
+    ensure_guild_conf(ctx.guild.id)
+    ai = config[str(ctx.guild.id)]["protect"]["antiimpersonation"]
+    if mode is None:
+        idx = impersonation.index(ctx.guild, ai["distance"])
+        return await ctx.send(embed=base_embed("🎭 Anti-usurpation", f"enabled={ai['enabled']} action={ai['action']} "
+                                                                     f"distance={ai['distance']} | staff indexé: {len(idx)}"))
+    val = mode.lower() == "on"
+    ai["enabled"] = val
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("🎭 Anti-usurpation", f"État: `{val}`"))
+
+@ext.command(name="antiimpersonation_config")
+@commands.has_permissions(administrator=True)
+async def antiimpersonation_config_cmd(ctx, action: str, distance: int = 1):
+    ensure_guild_conf(ctx.guild.id)
+    ai = config[str(ctx.guild.id)]["protect"]["antiimpersonation"]
+    ai["action"] = action if action in ("log", "quarantine", "ban") else "log"
+    ai["distance"] = min(2, max(0, distance))
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("⚙️ Anti-usurpation configuré", f"action={ai['action']} distance={ai['distance']}"))
+
+# ============================================================
+#  [PROTECT] Filtre de mots
+# ============================================================
+def _split_terms(text: str):
+    # un terme par ligne, ou séparés par des virgules
+    return [t.strip() for line in (text or "").splitlines() for t in line.split(",") if t.strip()]
+
+@ext.command(name="wordfilter")
+@commands.has_permissions(administrator=True)
+async def wordfilter_cmd(ctx, sub: str = "status", *, arg: str = None):
+    ensure_guild_conf(ctx.guild.id)
+    wf = config[str(ctx.guild.id)]["protect"]["wordfilter"]
+    sub = sub.lower()
+    if sub in ("on", "off"):
+        wf["enabled"] = sub == "on"
+        await save_config(ctx.guild.id)
+        return await ctx.send(embed=base_embed("🤐 Filtre de mots", f"État: `{wf['enabled']}`"))
+    if sub == "action":
+        parts = (arg or "").split()
+        if not parts or parts[0] not in ("delete", "timeout", "log"):
+            return await ctx.send(embed=base_embed("ℹ️ Filtre de mots", "`wordfilter action <delete|timeout|log> [timeout_sec]`"))
+        wf["action"] = parts[0]
+        if len(parts) > 1 and parts[1].isdigit():
+            wf["timeout_sec"] = min(2419200, max(10, int(parts[1])))
+        await save_config(ctx.guild.id)
+        return await ctx.send(embed=base_embed("⚙️ Filtre de mots", f"action={wf['action']} timeout={wf['timeout_sec']}s"))
+    if sub in ("add", "remove"):
+        terms = _split_terms(arg)
+        # listes volumineuses : fichier .txt joint, un terme par ligne
+        for att in ctx.message.attachments:
+            if att.filename.endswith(".txt") and att.size <= 512 * 1024:
+                terms += _split_terms((await att.read()).decode("utf-8", "ignore"))
+        if not terms:
+            return await ctx.send(embed=base_embed("ℹ️ Filtre de mots", f"`wordfilter {sub} mot, mot*, *mot*, re:motif` "
+                                                                         "ou un `.txt` joint (un terme par ligne)"))
+        if sub == "add":
+            known = set(wf["words"])
+            bad = [t for t in terms if not parse_term(t)]
+            new = [t for t in dict.fromkeys(terms) if t not in known and parse_term(t)]
+            room = MAX_TERMS - len(wf["words"])
+            wf["words"].extend(new[:room])
+            desc = f"{min(len(new), room)} terme(s) ajouté(s), {len(wf['words'])} au total."
+            if len(new) > room:
+                desc += f"\nLimite de {MAX_TERMS} termes atteinte : {len(new) - room} ignoré(s)."
+            if bad:
+                desc += "\nInvalides: " + ", ".join(f"`{discord.utils.escape_markdown(t)}`" for t in bad[:10])
+                if any(t.startswith(REGEX_PREFIX) for t in bad):
+                    desc += "\nRegex : ni drapeau global `(?i)`, ni référence `\\1`, ni quantificateurs imbriqués `(a+)+`, au plus 2 `*`/`+`."
+        else:
+            drop = set(terms)
+            before = len(wf["words"])
+            wf["words"][:] = [t for t in wf["words"] if t not in drop]
+            desc = f"{before - len(wf['words'])} terme(s) retiré(s), {len(wf['words'])} au total."
+        await save_config(ctx.guild.id)
+        return await ctx.send(embed=base_embed("✅ Filtre de mots", desc))
+    if sub == "clear":
+        wf["words"].clear()
+        await save_config(ctx.guild.id)
+        return await ctx.send(embed=base_embed("🗑️ Filtre de mots", "Liste vidée."))
+    if sub == "list":
+        if len(wf["words"]) > 50:
+            data = "\n".join(wf["words"]).encode("utf-8")
+            return await ctx.send(f"{len(wf['words'])} termes", file=discord.File(io.BytesIO(data), filename="wordfilter.txt"))
+        return await ctx.send(embed=base_embed("📄 Filtre de mots", "\n".join(f"||{discord.utils.escape_markdown(t)}||" for t in wf["words"]) or "∅"))
+    if sub == "test":
+        term = config.compiled(ctx.guild.id).word_filter.match(arg or "")
+        return await ctx.send(embed=base_embed("🧪 Filtre de mots", f"Bloqué par ||{discord.utils.escape_markdown(term)}||"
+                                                                    if term else "Aucun terme ne correspond."))
+    await ctx.send(embed=base_embed("🤐 Filtre de mots", f"enabled={wf['enabled']} action={wf['action']} "
+                                                         f"timeout={wf['timeout_sec']}s termes={len(wf['words'])}"))
+
+# ============================================================
+#  [PROTECT] Anti-mention / Anti-emoji
+# ============================================================
+@ext.command(name="antimention")
+@commands.has_permissions(administrator=True)
+async def antimention_cmd(ctx, mode: str, max_mentions: int = None):
+    ensure_guild_conf(ctx.guild.id)
+    am = config[str(ctx.guild.id)]["protect"]["antimention"]
+    am["enabled"] = (mode.lower() == "on")
+    if max_mentions is not None:
+        am["max_mentions"] = max(2, max_mentions)
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("📣 Anti-mention", f"enabled={am['enabled']} max={am['max_mentions']}"))
+
+@ext.command(name="antimention_config")
+@commands.has_permissions(administrator=True)
+async def antimention_config_cmd(ctx, max_mentions: int, budget: int, window_sec: int, guild_budget: int):
+    ensure_guild_conf(ctx.guild.id)
+    am = config[str(ctx.guild.id)]["protect"]["antimention"]
+    am["max_mentions"] = max(2, max_mentions)
+    am["budget"] = max(2, budget)
+    am["window_sec"] = max(10, min(3600, window_sec))
+    am["guild_budget"] = max(5, guild_budget)
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("⚙️ Anti-mention configuré", f"max={am['max_mentions']} budget={am['budget']}/{am['window_sec']}s guild={am['guild_budget']}"))
+
+@ext.command(name="antiemoji")
+@commands.has_permissions(administrator=True)
+async def antiemoji_cmd(ctx, mode: str, max_emojis: int = None):
+    ensure_guild_conf(ctx.guild.id)
+    ae = config[str(ctx.guild.id)]["protect"]["antiemoji"]
+    ae["enabled"] = (mode.lower() == "on")
+    if max_emojis is not None:
+        ae["max_emojis"] = max(5, max_emojis)
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("😵 Anti-emoji", f"enabled={ae['enabled']} max={ae['max_emojis']}"))
+
+# ============================================================
+#  [PROTECT] Anti-nuke (on/off + config)
+# ============================================================
+@ext.command(name="antinuke")
+@commands.has_permissions(administrator=True)
+async def antinuke_cmd(ctx, mode: str = None):
+    an = antinuke_conf(ctx.guild.id)
+    if mode is None:
+        return await ctx.send(embed=base_embed("☢️ Anti-nuke", f"enabled={an['enabled']} window={an['window_sec']}s channels={an['max_channel_delete']} roles={an['max_role_delete']} bans={an['max_ban']} kicks={an['max_kick']} webhooks={an['max_webhook_create']}"))
+    an["enabled"] = (mode.lower() == "on")
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("☢️ Anti-nuke", f"État: `{an['enabled']}`"))
+
+@ext.command(name="antinuke_config")
+@commands.has_permissions(administrator=True)
+async def antinuke_config_cmd(ctx, window_sec: int, max_channels: int, max_roles: int, max_bans: int, max_webhooks: int,
+                              max_kicks: int = None):
+    an = antinuke_conf(ctx.guild.id)
+    an["window_sec"] = max(5, min(300, window_sec))
+    an["max_channel_delete"] = max(2, max_channels)
+    an["max_role_delete"] = max(2, max_roles)
+    an["max_ban"] = max(2, max_bans)
+    if max_kicks is not None:
+        an["max_kick"] = max(2, max_kicks)
+    an["max_webhook_create"] = max(2, max_webhooks)
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("⚙️ Anti-nuke configuré", f"window={an['window_sec']}s channels={an['max_channel_delete']} roles={an['max_role_delete']} bans={an['max_ban']} kicks={an['max_kick']} webhooks={an['max_webhook_create']}"))
+
+# ============================================================
+#  [PROTECT] Whitelist / Blacklist
+# ============================================================
+@ext.command(name="whitelist")
+@commands.has_permissions(administrator=True)
+async def whitelist_cmd(ctx, sub: str, member: discord.Member = None):
+    ensure_guild_conf(ctx.guild.id)
+    wl = config[str(ctx.guild.id)]["whitelist"]
+    if sub == "add" and member:
+        if member.id not in wl: wl.append(member.id)
+        await save_config(ctx.guild.id)
+        await ctx.send(embed=base_embed("✅ Whitelist", f"{member.mention} ajouté"))
+    elif sub == "remove" and member:
+        if member.id in wl: wl.remove(member.id)
+        await save_config(ctx.guild.id)
+        await ctx.send(embed=base_embed("🗑️ Whitelist", f"{member.mention} retiré"))
+    else:
+        names = []
+        for uid in wl:
+            u = ctx.guild.get_member(uid)
+            names.append(u.mention if u else f"`{uid}`")
+        await ctx.send(embed=base_embed("📄 Whitelist", ", ".join(names) if names else "∅"))
+
+ID_RE = re.compile(r"\d{15,21}")
+
+async def _collect_ids(ctx, arg: str):
+    # mentions / ids bruts (membres absents compris) + .txt/.json joint (liste partagée)
+    text = arg or ""
+    for att in ctx.message.attachments:
+        if att.filename.endswith((".txt", ".json")) and att.size <= 1024 * 1024:
+            text += "\n" + (await att.read()).decode("utf-8", "ignore")
+    return [int(x) for x in dict.fromkeys(ID_RE.findall(text))]
+
+@ext.command(name="blacklist")
+@commands.has_permissions(administrator=True)
+async def blacklist_cmd(ctx, sub: str = "list", *, arg: str = None):
+    ensure_guild_conf(ctx.guild.id)
+    gid = ctx.guild.id
+    bl = config[str(gid)]["blacklist"]
+    sub = sub.lower()
+    if sub in ("add", "import", "remove"):
+        ids = await _collect_ids(ctx, arg)
+        if not ids:
+            return await ctx.send(embed=base_embed("ℹ️ Blacklist", f"`blacklist {sub} @user|id …` "
+                                                                 "ou un `.txt` joint (un id par ligne, cf. `blacklist export`)"))
+    if sub in ("add", "import"):
+        known = set(bl)
+        protected = {ctx.author.id, ctx.guild.owner_id, bot.user.id}
+        new, skipped = [], 0
+        for uid in ids:
+            if uid in known:
+                continue
+            m = ctx.guild.get_member(uid)
+            if uid in protected or is_whitelisted(gid, uid) or (m and is_staff(m)):
+                skipped += 1
+                continue
+            new.append(uid)
+        bl.extend(new)
+        await save_config(gid)
+        # bannis d'avance, présents ou non : le dispatcher les regroupe en bulk-ban de 200
+        reason = f"Blacklist by {ctx.author}"
+        for uid in new:
+            journal.record(gid, "blacklist_add", uid, ctx.author.id)
+            actions.ban(ctx.guild, ctx.guild.get_member(uid) or discord.Object(uid), reason=reason)
+        desc = f"{len(new)} id(s) ajouté(s) et bannis, {len(bl)} au total."
+        if len(ids) - len(new) - skipped:
+            desc += f"\n{len(ids) - len(new) - skipped} déjà présent(s)."
+        if skipped:
+            desc += f"\n{skipped} ignoré(s) (whitelist / staff / owner)."
+        return await ctx.send(embed=base_embed("✅ Blacklist", desc))
+    if sub == "remove":
+        drop = set(ids)
+        before = len(bl)
+        bl[:] = [uid for uid in bl if uid not in drop]
+        await save_config(gid)
+        for uid in drop:
+            journal.record(gid, "blacklist_remove", uid, ctx.author.id)
+        return await ctx.send(embed=base_embed("🗑️ Blacklist", f"{before - len(bl)} id(s) retiré(s), {len(bl)} au total.\n"
+                                                              f"Le ban reste en place : `{ctx.prefix}unban <id>` pour le lever."))
+    if sub == "export" or len(bl) > 50:
+        data = "\n".join(map(str, bl)).encode("utf-8")
+        return await ctx.send(f"{len(bl)} ids", file=discord.File(io.BytesIO(data), filename="blacklist.txt"))
+    names = []
+    for uid in bl:
+        u = ctx.guild.get_member(uid)
+        names.append(u.mention if u else f"`{uid}`")
+    await ctx.send(embed=base_embed("📄 Blacklist", ", ".join(names) if names else "∅"))
+
+# ============================================================
+#  [PROTECT] Lock / Unlock / Nuke / Autorole
+# ============================================================
+@ext.command(name="lock")
+@commands.has_permissions(manage_channels=True)
+async def lock_cmd(ctx, channel: discord.TextChannel = None, duration: str = None):
+    ch = channel or ctx.channel
+    try:
+        seconds = parse_duration(duration) if duration else None
+    except ValueError as e:
+        return await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+    ow = ch.overwrites_for(ctx.guild.default_role)
+    if ow.send_messages is False and not seconds:
+        return await ctx.send(embed=base_embed("🔒 Lock", f"{ch.mention} est déjà verrouillé"))
+    ow.send_messages = False
+    try:
+        await ch.set_permissions(ctx.guild.default_role, overwrite=ow, reason=f"Lock by {ctx.author}")
+        if seconds:
+            sanctions.schedule(ctx.guild.id, "unlock", ch.id, time.time() + seconds)
+        await ctx.send(embed=base_embed("🔒 Lock", f"{ch.mention} verrouillé" + (f" pour {duration}" if seconds else "")))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+@ext.command(name="unlock")
+@commands.has_permissions(manage_channels=True)
+async def unlock_cmd(ctx, channel: discord.TextChannel = None):
+    ch = channel or ctx.channel
+    ow = ch.overwrites_for(ctx.guild.default_role)
+    if ow.send_messages is None:
+        return await ctx.send(embed=base_embed("🔓 Unlock", f"{ch.mention} est déjà ouvert"))
+    ow.send_messages = None
+    try:
+        await ch.set_permissions(ctx.guild.default_role, overwrite=ow, reason=f"Unlock by {ctx.author}")
+        sanctions.cancel(ctx.guild.id, "unlock", ch.id)
+        await ctx.send(embed=base_embed("🔓 Unlock", f"{ch.mention} déverrouillé"))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+@ext.command(name="nuke")
+@commands.has_permissions(manage_channels=True)
+async def nuke_cmd(ctx):
+    ch = ctx.channel
+    pos = ch.position
+    new_ch = await ch.clone(reason=f"Nuke by {ctx.author}")
+    await new_ch.edit(position=pos)
+    await ch.delete()
+    await new_ch.send(embed=base_embed("💥 Nuke", "Salon recréé, messages nettoyés.", discord.Color.red()))
+
+@ext.command(name="autorole")
+@commands.has_permissions(manage_roles=True)
+async def autorole_cmd(ctx, sub: str, role: discord.Role = None):
+    ensure_guild_conf(ctx.guild.id)
+    if sub == "set" and role:
+        config[str(ctx.guild.id)]["autorole"] = role.id
+        await save_config(ctx.guild.id)
+        await ctx.send(embed=base_embed("✅ Autorole", f"Rôle défini: {role.mention}"))
+    elif sub == "clear":
+        config[str(ctx.guild.id)]["autorole"] = None
+        await save_config(ctx.guild.id)
+        await ctx.send(embed=base_embed("🗑️ Autorole", "Autorole désactivé"))
+    else:
+        await ctx.send(embed=base_embed("ℹ️ Autorole", "Utilise: `autorole set @role` ou `autorole clear`"))
+
+# ============================================================
+#  [PROTECT] Gestion du rôle Owner (is_owner / owner_only : runtime)
+# ============================================================
+# Commande pour donner le rôle Owner à quelqu'un
+@ext.command(name="addowner")
+async def add_owner_cmd(ctx, member: discord.Member):
+    if ctx.author.id != OWNER_SUPREME_ID:
+        return await ctx.send(embed=base_embed(
+            "❌ Permission refusée",
+            "Seul le Owner supreme peut attribuer le rôle Owner."
+        ))
+
+    # Cherche le rôle Owner sur le serveur, sinon le crée
+    role = discord.utils.get(ctx.guild.roles, name=OWNER_ROLE_NAME)
+    if not role:
+        role = await ctx.guild.create_role(name=OWNER_ROLE_NAME, permissions=discord.Permissions(administrator=True))
+    
+    # Ajoute le rôle au membre
+    await member.add_roles(role)
+    await ctx.send(embed=base_embed(
+        "✅ Rôle Owner ajouté",
+        f"{member.mention} a reçu le rôle {OWNER_ROLE_NAME}."
+    ))
+
+# Exemple de commande protégée par Owner
+@ext.command(name="secretprotect")
+@owner_only()
+async def secret_protect_cmd(ctx):
+    await ctx.send(embed=base_embed(
+        "🔒 Commande Owner",
+        "Tu as accès à cette commande spéciale car tu es Owner."
+    ))
+
+# ============================================================
+#  [EXTENSION] Branchement sur l'état de runtime (rechargeable à chaud)
+# ============================================================
+async def setup(bot):
+    message_filters.append(protect_message)
+    expiry_handlers.update(unlock=_expire_unlock, unlockdown=_expire_unlockdown)
+    antinuke.punish = _antinuke_punish
+    if recorder:
+        recorder.count_emojis = extract_emojis
+    await ext.setup(bot)
+
+async def teardown(bot):
+    await ext.teardown(bot)
+    if protect_message in message_filters:
+        message_filters.remove(protect_message)
+    for kind in ("unlock", "unlockdown"):
+        expiry_handlers.pop(kind, None)
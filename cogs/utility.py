@@ -0,0 +1,516 @@
+# ============================================================
+#  BOT PROTECT - cogs/utility.py
+#  Extension rechargeable : help paginé, config admin/bot (prefix, logs, import/export,
+#  snapshots) et commandes d'info (ping, serverinfo, userinfo, botinfo…)
+# ============================================================
+
+import json
+import asyncio
+import aiohttp
+from configstore import ConfigError, validate_guild_conf
+from httpclient import ResponseTooLarge
+from snapshot import GuildRestorer, DiscordRest, serialize_guild
+from runtime import (
+    Extension, bot, config, ensure_guild_conf, get_prefix, save_config, now_utc, human_tdelta, send_log, base_embed,
+    started_at, snapshots, http, blocklist, bad_hashes, renders, totals,
+)
+
+import discord
+from discord.ext import commands, tasks
+
+ext = Extension()
+
+# ============================================================
+#  [SNAPSHOT] Sauvegarde périodique de la structure
+# ============================================================
+@ext.loop
+@tasks.loop(minutes=30)
+async def snapshot_loop():
+    # n'écrit que si la structure a changé (diff), rien sinon
+    for guild in bot.guilds:
+        snap = serialize_guild(guild)
+        try:
+            await asyncio.to_thread(snapshots.save, guild.id, snap, now_utc().timestamp())
+        except Exception as e:
+            print(f"[snapshot] {guild.id}: {e}")
+
+# ============================================================
+#  [HELP] Embeds + Pagination (Boutons)
+# ============================================================
+class HelpView(discord.ui.View):
+    def __init__(self, embeds):
+        super().__init__(timeout=120)
+        self.embeds = embeds
+        self.index = 0
+
+    @discord.ui.button(emoji="⬅️", style=discord.ButtonStyle.secondary)
+    async def prev(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index = (self.index - 1) % len(self.embeds)
+        await interaction.response.edit_message(embed=self.embeds[self.index], view=self)
+
+    @discord.ui.button(emoji="➡️", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index = (self.index + 1) % len(self.embeds)
+        await interaction.response.edit_message(embed=self.embeds[self.index], view=self)
+
+def _help_pages(prefix: str):
+    # ---- Pages ----
+    p1 = base_embed("🔒 Protect", f"""
+`{prefix}setlogs #salon` — définir salon de logs
+`{prefix}antilink on/off` — bloque liens (whitelist possible)
+`{prefix}linkwhitelist add/remove <domaine>` — gérer domaines autorisés
+`{prefix}invitewhitelist add/remove <guild_id>` — invitations autorisées vers ces serveurs
+`{prefix}antiphishing on/off` — bloque les domaines de phishing connus
+`{prefix}antimedia on/off` — bloque les images/fichiers connus (hash)
+`{prefix}badhash add/remove <sha256>` — hash interdits (ou répondre à un message avec pièce jointe)
+`{prefix}antispam on/off` — anti-flood
+`{prefix}antispam config <window> <threshold> <timeout>` — réglages
+`{prefix}antiraid on/off` — anti-raid
+`{prefix}antiraid config <window> <max_joins> <action> <cooldown>` — réglages (action: lockdown/quarantine/log)
+`{prefix}quarantine setup` — prépare le rôle de quarantaine (avant un raid)
+`{prefix}quarantine list` / `release @membres|all` / `ban @membres|all` / `end` — trancher après un raid
+`{prefix}antiimpersonation on/off` — détecte les noms qui imitent le staff (homoglyphes, invisibles)
+`{prefix}antiimpersonation_config <log|quarantine|ban> [distance 0-2]` — réglages
+`{prefix}wordfilter on/off` — filtre de mots (leetspeak, lettres espacées, homoglyphes)
+`{prefix}wordfilter add/remove mot, mot*, *mot*, re:motif` — termes (ou `.txt` joint) ; `list` / `test <texte>`
+`{prefix}wordfilter action <delete|timeout|log> [sec]` — sanction
+`{prefix}antimention on/off <max>` — limite @mentions
+`{prefix}antimention_config <max> <budget> <window> <budget_guild>` — budget glissant
+`{prefix}antiemoji on/off <max>` — limite emojis
+`{prefix}antinuke on/off` — anti-nuke (suppressions/bans en masse)
+`{prefix}antinuke_config <window> <salons> <rôles> <bans> <webhooks> [kicks]` — réglages
+`{prefix}whitelist add/remove @user` — bypass protections
+`{prefix}blacklist add/remove <@user|id…>` — ban immédiat, absents compris
+`{prefix}blacklist export` / `import` + `.txt` — liste partagée entre serveurs
+`{prefix}lock [#ch] [durée]` / `{prefix}unlock [#ch]` — verrouille salons (durée: 30m, 2h…)
+`{prefix}nuke` — recrée le salon courant
+`{prefix}autorole set @role` / `clear` — rôle auto à l'arrivée
+`{prefix}addowner <@membre>` — Seul le Owner supreme peut donner le rôle Owner à un membre
+`{prefix}secretprotect` — Commande accessible uniquement aux membres ayant le rôle Owner.
+""", discord.Color.red())
+
+    p2 = base_embed("🛡️ Modération", f"""
+`{prefix}ban @user [raison]` / `{prefix}tempban @user <durée> [raison]`
+`{prefix}unban <user_id|name#discrim>`
+`{prefix}kick @user [raison]`
+`{prefix}mute @user [durée]` / `{prefix}unmute @user`
+`{prefix}timeout @user <durée>` / `{prefix}untimeout @user`
+`{prefix}clear <n>` — purge messages
+`{prefix}slowmode <sec>` — mode lent
+`{prefix}autoslowmode on/off [msgs/min] [auteurs] [max]` — slowmode adaptatif
+`{prefix}warn @user [raison]` / `{prefix}warnings @user` / `{prefix}unwarn @user <id>`
+`{prefix}modlog [@user|id] [jours] [action]` — historique de modération
+`{prefix}nick @user <nouveau>` / `nickreset @user`
+`{prefix}role add/remove @user @role`
+`{prefix}move @user @vocal` — déplacer en vocal
+""", discord.Color.orange())
+
+    p3 = base_embed("⚙️ Admin/Bot", f"""
+`{prefix}setname "nom"`
+`{prefix}setavatar "url"`
+`{prefix}setstatus <playing|watching|listening|streaming> "texte" [url_stream]`
+`{prefix}prefix <nouveau>`
+`{prefix}serverconfig` — affiche config serveur
+`{prefix}setmuterole @role`
+`{prefix}setquarantinerole @role`
+`{prefix}exportconfig` — export JSON
+`{prefix}snapshot` — sauvegarde la structure (rôles/salons)
+`{prefix}restore` — recrée rôles/salons manquants depuis le snapshot
+`{prefix}importconfig` — répondre avec un fichier JSON
+`{prefix}reload <protection|moderation|utility|all>` — recharge le code à chaud (Owner supreme)
+""", discord.Color.blue())
+
+    p4 = base_embed("📊 Utils/Infos", f"""
+`{prefix}ping` — latence
+`{prefix}uptime`
+`{prefix}serverinfo`
+`{prefix}userinfo [@user]`
+`{prefix}roleinfo @role`
+`{prefix}channelinfo [#ch]`
+`{prefix}avatar [@user]`
+`{prefix}botinfo`
+`{prefix}invite`
+`{prefix}id` — renvoie les IDs utiles
+`{prefix}emojis` — liste emojis du serveur
+""", discord.Color.green())
+    return [p1, p2, p3, p4]
+
+@ext.command(name="help")
+async def help_cmd(ctx: commands.Context):
+    prefix = await get_prefix(bot, ctx.message)
+    # pages rendues une fois par préfixe (partagées entre guilds) ; seule la vue est par message
+    pages = renders.get(None, "help", prefix, lambda: _help_pages(prefix))
+    await ctx.send(embed=pages[0], view=HelpView(pages))
+
+# ============================================================
+#  [ADMIN/BOT CONFIG] prefix / setname / setavatar / setstatus / serverconfig
+# ============================================================
+
+# ---- COMMAND: prefix ----
+@commands.has_permissions(administrator=True)
+@ext.command(name="prefix")
+async def prefix_cmd(ctx, new_prefix: str):
+    ensure_guild_conf(ctx.guild.id)
+    config[str(ctx.guild.id)]["prefix"] = new_prefix
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("✅ Prefix modifié", f"Nouveau préfixe: `{new_prefix}`", discord.Color.green()))
+
+# ---- COMMAND: setname ----
+@commands.has_permissions(administrator=True)
+@ext.command(name="setname")
+async def setname_cmd(ctx, *, name: str):
+    try:
+        await bot.user.edit(username=name)
+        await ctx.send(embed=base_embed("✅ Nom modifié", f"Mon nouveau nom est **{name}**", discord.Color.green()))
+    except discord.HTTPException as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+# ---- COMMAND: setavatar ----
+AVATAR_MAX_BYTES = 8 * 1024 * 1024
+
+@commands.has_permissions(administrator=True)
+@ext.command(name="setavatar")
+async def setavatar_cmd(ctx, url: str):
+    try:
+        status, data = await http.fetch_bytes(url, max_bytes=AVATAR_MAX_BYTES)
+    except ResponseTooLarge:
+        return await ctx.send(embed=base_embed("⚠️ Erreur", "Image trop lourde (8 Mo max)", discord.Color.red()))
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        status, data = None, b""
+    if status != 200:
+        return await ctx.send(embed=base_embed("⚠️ Erreur", "Impossible de télécharger l'image", discord.Color.red()))
+    try:
+        await bot.user.edit(avatar=data)
+        await ctx.send(embed=base_embed("✅ Avatar modifié", "Nouvelle photo de profil appliquée !", discord.Color.green()))
+    except discord.HTTPException as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur", str(e), discord.Color.red()))
+
+# ---- COMMAND: setstatus ----
+@commands.has_permissions(administrator=True)
+@ext.command(name="setstatus")
+async def setstatus_cmd(ctx, status_type: str, *, text_and_url: str):
+    # Optionnel: URL pour streaming à la fin
+    parts = text_and_url.split()
+    url = None
+    if status_type.lower() == "streaming" and parts:
+        # si dernier token ressemble à une URL on la prend
+        if parts[-1].startswith("http"):
+            url = parts[-1]
+            text = " ".join(parts[:-1]) if len(parts) > 1 else "Live"
+        else:
+            text = text_and_url
+    else:
+        text = text_and_url
+
+    st = status_type.lower()
+    activity = None
+    if st == "playing":
+        activity = discord.Game(name=text)
+    elif st == "watching":
+        activity = discord.Activity(type=discord.ActivityType.watching, name=text)
+    elif st == "listening":
+        activity = discord.Activity(type=discord.ActivityType.listening, name=text)
+    elif st == "streaming":
+        activity = discord.Streaming(name=text, url=url or "https://twitch.tv/discord")
+    else:
+        return await ctx.send(embed=base_embed("⚠️ Type invalide", "Utilise: playing/watching/listening/streaming"))
+
+    await bot.change_presence(activity=activity)
+    await ctx.send(embed=base_embed("✅ Statut modifié", f"{status_type} **{text}**"))
+
+# ---- COMMAND: serverconfig ----
+@ext.command(name="serverconfig")
+@commands.has_permissions(administrator=True)
+async def serverconfig_cmd(ctx):
+    ensure_guild_conf(ctx.guild.id)
+    c = config[str(ctx.guild.id)]
+    prot = c["protect"]
+    desc = (
+        f"**Prefix**: `{c['prefix']}`\n"
+        f"**Logs**: {('<#'+str(c['log_channel'])+'>') if c['log_channel'] else 'Non défini'}\n"
+        f"**MuteRole**: {('<@&'+str(c['mute_role'])+'>') if c['mute_role'] else 'Auto'}\n"
+        f"**Autorole**: {('<@&'+str(c['autorole'])+'>') if c['autorole'] else 'Aucun'}\n"
+        f"**Quarantaine**: {('<@&'+str(c['quarantine_role'])+'>') if c['quarantine_role'] else 'Aucun'}\n"
+        f"**AntiLink**: `{prot['antilink']}` | WL: {', '.join(prot['link_whitelist']) if prot['link_whitelist'] else '∅'}\n"
+        f"**AntiSpam**: `{prot['antispam']['enabled']}` window={prot['antispam']['window_sec']}s thr={prot['antispam']['threshold']} timeout={prot['antispam']['timeout_sec']}s\n"
+        f"**AntiRaid**: `{prot['antiraid']['enabled']}` window={prot['antiraid']['window_sec']}s maxjoins={prot['antiraid']['max_joins']} action={prot['antiraid']['action']} cooldown={prot['antiraid']['cooldown_sec']}s\n"
+        f"**AntiMention**: `{prot['antimention']['enabled']}` max={prot['antimention']['max_mentions']} budget={prot['antimention']['budget']}/{prot['antimention']['window_sec']}s guild={prot['antimention']['guild_budget']}\n"
+        f"**AntiEmoji**: `{prot['antiemoji']['enabled']}` max={prot['antiemoji']['max_emojis']}\n"
+        f"**AntiUsurpation**: `{prot['antiimpersonation']['enabled']}` action={prot['antiimpersonation']['action']} distance={prot['antiimpersonation']['distance']}\n"
+        f"**WordFilter**: `{prot['wordfilter']['enabled']}` action={prot['wordfilter']['action']} termes={len(prot['wordfilter']['words'])}\n"
+        f"**AntiWebhook**: `{prot.get('antiwebhook', True)}`\n"
+        f"**AntiPhishing**: `{prot['antiphishing']}` ({len(blocklist)} domaines)\n"
+        f"**AntiMedia**: `{prot['antimedia']['enabled']}` ({len(prot['antimedia']['hashes'])} hash serveur, {len(bad_hashes)} globaux)\n"
+        f"**AntiNuke**: `{prot['antinuke']['enabled']}` window={prot['antinuke']['window_sec']}s ch={prot['antinuke']['max_channel_delete']} roles={prot['antinuke']['max_role_delete']} bans={prot['antinuke']['max_ban']} webhooks={prot['antinuke']['max_webhook_create']}\n"
+        f"**AutoSlowmode**: `{prot['autoslowmode']['enabled']}` target={prot['autoslowmode']['target_per_min']}/min authors={prot['autoslowmode']['min_authors']} max={prot['autoslowmode']['max_delay']}s\n"
+        f"**Whitelist**: {len(c['whitelist'])} | **Blacklist**: {len(c['blacklist'])}\n"
+    )
+    await ctx.send(embed=base_embed(f"⚙️ Config — {ctx.guild.name}", desc))
+
+# ---- COMMAND: setlogs ----
+@ext.command(name="setlogs")
+@commands.has_permissions(administrator=True)
+async def setlogs_cmd(ctx, channel: discord.TextChannel):
+    ensure_guild_conf(ctx.guild.id)
+    config[str(ctx.guild.id)]["log_channel"] = channel.id
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("✅ Logs configurés", f"Les logs iront dans {channel.mention}", discord.Color.green()))
+
+# ---- COMMAND: setmuterole ----
+@ext.command(name="setmuterole")
+@commands.has_permissions(administrator=True)
+async def setmuterole_cmd(ctx, role: discord.Role):
+    ensure_guild_conf(ctx.guild.id)
+    config[str(ctx.guild.id)]["mute_role"] = role.id
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("✅ Rôle mute défini", f"{role.mention}", discord.Color.green()))
+
+# ---- COMMAND: setquarantinerole ----
+@ext.command(name="setquarantinerole")
+@commands.has_permissions(administrator=True)
+async def setquarantinerole_cmd(ctx, role: discord.Role):
+    ensure_guild_conf(ctx.guild.id)
+    config[str(ctx.guild.id)]["quarantine_role"] = role.id
+    await save_config(ctx.guild.id)
+    await ctx.send(embed=base_embed("✅ Rôle quarantaine défini", f"{role.mention} — `{ctx.prefix}quarantine setup` "
+                                                                "pour masquer les salons", discord.Color.green()))
+
+# ---- COMMAND: exportconfig / importconfig ----
+@ext.command(name="exportconfig")
+@commands.has_permissions(administrator=True)
+async def exportconfig_cmd(ctx):
+    # export config du serveur uniquement
+    ensure_guild_conf(ctx.guild.id)
+    data = json.dumps(config[str(ctx.guild.id)], indent=2).encode("utf-8")
+    file = discord.File(fp=bytes(data), filename=f"config_{ctx.guild.id}.json")
+    await ctx.send(embed=base_embed("📦 Export Config", "Voici le JSON de votre config."), file=file)
+
+@ext.command(name="importconfig")
+@commands.has_permissions(administrator=True)
+async def importconfig_cmd(ctx):
+    if not ctx.message.attachments:
+        return await ctx.send(embed=base_embed("⚠️ Fichier manquant", "Uploadez un `.json` en pièce jointe."))
+    att = ctx.message.attachments[0]
+    if not att.filename.endswith(".json"):
+        return await ctx.send(embed=base_embed("⚠️ Format invalide", "Fichier attendu: `.json`"))
+    try:
+        raw = await att.read()
+        # même validateur que configtool.py : migration + types/bornes, jamais de KeyError ensuite
+        conf, errors = validate_guild_conf(json.loads(raw.decode("utf-8")))
+        config[str(ctx.guild.id)] = conf
+        await save_config(ctx.guild.id)
+        config.compiled(ctx.guild.id)
+        desc = "Configuration appliquée."
+        if errors:
+            desc += "\n**Corrections :**\n" + "\n".join(f"• {e}" for e in errors[:15])
+        await ctx.send(embed=base_embed("✅ Import réussi", desc[:4000]))
+    except (ConfigError, ValueError) as e:
+        await ctx.send(embed=base_embed("⚠️ Import refusé", str(e), discord.Color.red()))
+    except Exception as e:
+        await ctx.send(embed=base_embed("⚠️ Erreur import", str(e), discord.Color.red()))
+
+# ---- COMMAND: snapshot / restore ----
+@ext.command(name="snapshot")
+@commands.has_permissions(administrator=True)
+async def snapshot_cmd(ctx):
+    snap = serialize_guild(ctx.guild)
+    kind = await asyncio.to_thread(snapshots.save, ctx.guild.id, snap, now_utc().timestamp())
+    await ctx.send(embed=base_embed("📸 Snapshot",
+                                    f"Rôles: {len(snap['roles'])} | Salons: {len(snap['channels'])}\n"
+                                    f"Écriture: `{kind or 'inchangé'}`", discord.Color.green()))
+
+@ext.command(name="restore")
+@commands.has_permissions(administrator=True)
+async def restore_cmd(ctx):
+    snap = await asyncio.to_thread(snapshots.load, ctx.guild.id)
+    if not snap:
+        return await ctx.send(embed=base_embed("⚠️ Aucun snapshot", "Utilise d'abord `snapshot`.", discord.Color.red()))
+    msg = await ctx.send(embed=base_embed("♻️ Restore", "Analyse…"))
+    last_edit = [0.0]
+
+    async def progress(stage, done, total):
+        # pas plus d'un edit toutes les 2s (rate-limit message edit)
+        t = now_utc().timestamp()
+        if done == total or t - last_edit[0] >= 2:
+            last_edit[0] = t
+            try: await msg.edit(embed=base_embed("♻️ Restore", f"`{stage}` : {done}/{total}"))
+            except: pass
+
+    restorer = GuildRestorer(DiscordRest(ctx.guild, reason=f"Restore by {ctx.author}"), concurrency=3, progress=progress)
+    report = await restorer.restore(snap, serialize_guild(ctx.guild))
+    e = base_embed("✅ Restore terminé",
+                   f"Rôles: {report['roles']} | Catégories: {report['categories']} | Salons: {report['channels']} | Overwrites: {report['overwrites']} | Échecs: {report['failed']}",
+                   discord.Color.green())
+    try: await msg.edit(embed=e)
+    except: await send_log(ctx.guild, e)
+# ============================================================
+#  [UTILS] ping / uptime / serverinfo / userinfo / roleinfo / channelinfo / avatar / botinfo / invite / id / emojis
+# ============================================================
+@ext.command(name="ping")
+async def ping_cmd(ctx):
+    await ctx.send(embed=base_embed("🏓 Pong", f"{round(bot.latency*1000)}ms"))
+
+@ext.command(name="uptime")
+async def uptime_cmd(ctx):
+    td = now_utc() - started_at
+    await ctx.send(embed=base_embed("⏱️ Uptime", human_tdelta(td)))
+
+def _server_stats(g: discord.Guild):
+    # text_channels / voice_channels trient tous les salons : recalculé seulement si la structure change
+    return len(g.channels), len(g.text_channels), len(g.voice_channels), len(g.roles)
+
+@ext.command(name="serverinfo")
+async def serverinfo_cmd(ctx):
+    g = ctx.guild
+    channels, text, voice, roles = renders.get(g.id, "guild", "serverinfo", lambda: _server_stats(g))
+    desc = (
+        f"**ID:** {g.id}\n"
+        f"**Owner:** <@{g.owner_id}>\n"
+        f"**Membres:** {g.member_count}\n"
+        f"**Salons:** {channels} | Text: {text} | Voice: {voice}\n"
+        f"**Rôles:** {roles}\n"
+        f"**Créé le:** {g.created_at.strftime('%Y-%m-%d')}\n"
+    )
+    e = base_embed(f"📊 Server Info — {g.name}", desc)
+    if g.icon: e.set_thumbnail(url=g.icon.url)
+    await ctx.send(embed=e)
+
+@ext.command(name="userinfo")
+async def userinfo_cmd(ctx, member: discord.Member = None):
+    m = member or ctx.author
+    roles = [r.mention for r in m.roles if r != ctx.guild.default_role]
+    desc = (
+        f"**ID:** {m.id}\n"
+        f"**Compte créé:** {m.created_at.strftime('%Y-%m-%d')}\n"
+        f"**A rejoint:** {m.joined_at.strftime('%Y-%m-%d') if m.joined_at else 'N/A'}\n"
+        f"**Top rôle:** {m.top_role.mention}\n"
+        f"**Rôles:** {', '.join(roles) if roles else '∅'}\n"
+        f"**Bot:** {m.bot}\n"
+    )
+    e = base_embed(f"👤 User Info — {m}", desc)
+    try:
+        e.set_thumbnail(url=m.display_avatar.url)
+    except: pass
+    await ctx.send(embed=e)
+
+def _role_perms(role: discord.Role):
+    return ", ".join([p[0] for p in role.permissions if p[1]])[:1000]
+
+def _role_stats(role: discord.Role):
+    # role.members parcourt tous les membres de la guild : recalculé seulement si les rôles bougent
+    return len(role.members), _role_perms(role)
+
+@ext.command(name="roleinfo")
+async def roleinfo_cmd(ctx, role: discord.Role):
+    if role.is_default():
+        count, perms = ctx.guild.member_count, _role_perms(role)
+    else:
+        count, perms = renders.get(ctx.guild.id, "roles", role.id, lambda: _role_stats(role))
+    desc = (
+        f"**ID:** {role.id}\n"
+        f"**Membres:** {count}\n"
+        f"**Couleur:** {role.color}\n"
+        f"**Créé:** {role.created_at.strftime('%Y-%m-%d')}\n"
+        f"**Permissions:** {perms if perms else '∅'}\n"
+    )
+    e = base_embed(f"🏷️ Role Info — {role.name}", desc, role.color or discord.Color.blurple())
+    await ctx.send(embed=e)
+
+@ext.command(name="channelinfo")
+async def channelinfo_cmd(ctx, channel: discord.TextChannel = None):
+    ch = channel or ctx.channel
+    desc = (
+        f"**ID:** {ch.id}\n"
+        f"**Nom:** {ch.name}\n"
+        f"**Créé:** {ch.created_at.strftime('%Y-%m-%d')}\n"
+        f"**NSFW:** {getattr(ch, 'nsfw', False)}\n"
+        f"**Topic:** {ch.topic or '∅'}\n"
+        f"**Slowmode:** {getattr(ch, 'slowmode_delay', 0)}s\n"
+    )
+    await ctx.send(embed=base_embed(f"🧩 Channel Info — #{ch.name}", desc))
+
+@ext.command(name="avatar")
+async def avatar_cmd(ctx, member: discord.Member = None):
+    m = member or ctx.author
+    e = base_embed(f"🖼️ Avatar — {m}", f"[Ouvrir]({m.display_avatar.url})")
+    e.set_image(url=m.display_avatar.url)
+    await ctx.send(embed=e)
+
+@ext.command(name="botinfo")
+async def botinfo_cmd(ctx):
+    # totaux tenus à jour par les events (start.py), pas de parcours des guilds
+    td = now_utc() - started_at
+    desc = f"**Guilds:** {totals.guilds}\n**Users (approx):** {totals.members}\n**Uptime:** {human_tdelta(td)}\n**Latency:** {round(bot.latency*1000)}ms"
+    await ctx.send(embed=base_embed("🤖 Bot Info", desc))
+
+@ext.command(name="invite")
+async def invite_cmd(ctx):
+    perms = "8"  # admin
+    url = f"https://discord.com/api/oauth2/authorize?client_id={bot.user.id}&permissions={perms}&scope=bot%20applications.commands"
+    await ctx.send(embed=base_embed("🔗 Invite", f"[Ajouter le bot]({url})"))
+
+@ext.command(name="id")
+async def id_cmd(ctx):
+    await ctx.send(embed=base_embed("🆔 IDs", f"Serveur: `{ctx.guild.id}`\nSalon: `{ctx.channel.id}`\nAuteur: `{ctx.author.id}`"))
+
+@ext.command(name="emojis")
+async def emojis_cmd(ctx):
+    if not ctx.guild.emojis:
+        return await ctx.send(embed=base_embed("😀 Emojis", "Aucun emoji."))
+    lines = []
+    for e in ctx.guild.emojis[:50]:
+        lines.append(f"{e} `:{e.name}:` (ID {e.id})")
+    await ctx.send(embed=base_embed("😀 Emojis", "\n".join(lines)))
+
+# ============================================================
+#  [CACHE] Invalidation des rendus (serverinfo : portée "guild", roleinfo : portée "roles")
+# ============================================================
+@ext.event
+async def on_guild_update(before: discord.Guild, after: discord.Guild):
+    renders.bump(after.id, "guild")
+
+@ext.event
+async def on_guild_channel_create(channel: discord.abc.GuildChannel):
+    renders.bump(channel.guild.id, "guild")
+
+@ext.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    renders.bump(channel.guild.id, "guild")
+
+@ext.event
+async def on_guild_role_create(role: discord.Role):
+    renders.bump(role.guild.id, "guild")
+
+@ext.event
+async def on_guild_role_delete(role: discord.Role):
+    renders.bump(role.guild.id, "guild")
+    renders.bump(role.guild.id, "roles")
+
+@ext.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    renders.bump(after.guild.id, "roles")
+
+@ext.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    if before.roles != after.roles:
+        renders.bump(after.guild.id, "roles")
+
+@ext.event
+async def on_member_remove(member: discord.Member):
+    # les arrivants n'ont que @everyone (compté via member_count) : seuls les départs comptent
+    if len(member.roles) > 1:
+        renders.bump(member.guild.id, "roles")
+
+# alias confort
+ext.alias(setstatus_cmd, "status")
+ext.alias(setname_cmd, "rename")
+
+# ============================================================
+#  [EXTENSION] Branchement sur l'état de runtime (rechargeable à chaud)
+# ============================================================
+async def setup(bot):
+    renders.clear()   # code de rendu peut-être modifié : aucun rendu de l'ancienne version
+    await ext.setup(bot)
+
+async def teardown(bot):
+    await ext.teardown(bot)
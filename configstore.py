@@ -0,0 +1,418 @@
+# ============================================================
+#  BOT PROTECT - configstore.py
+#  Config par guild : chargement paresseux, LRU en mémoire, SQLite sur disque
+# ============================================================
+
+import os
+import json
+import time
+import sqlite3
+from collections import OrderedDict
+
+from attachments import BadHashes, parse_hash_entry
+from wordfilter import compile_terms, parse_term, MAX_TERMS
+
+DB_PATH = "config.db"
+LEGACY_PATH = "config.json"
+# un record lu il y a moins de PIN_SEC n'est pas évincé : le handler qui le modifie n'a peut-être pas encore fait save()
+PIN_SEC = 60.0
+
+# Version du schéma des records (clé "schema_version"); voir MIGRATIONS
+SCHEMA_VERSION = 1
+
+DEFAULT_GUILD_CONF = {
+    "prefix": "+",
+    "log_channel": None,
+    "mute_role": None,
+    "quarantine_role": None,
+    "autorole": None,
+    "protect": {
+        "antilink": False,
+        "link_whitelist": [],  # domains
+        "invite_whitelist": [],  # guild ids dont les invitations sont autorisées
+        "antispam": {
+            "enabled": True,
+            "window_sec": 6,
+            "threshold": 6,
+            "timeout_sec": 300
+        },
+        "antiraid": {
+            "enabled": False,
+            "window_sec": 60,
+            "max_joins": 8,
+            "action": "lockdown",  # lockdown / quarantine / log
+            "cooldown_sec": 300
+        },
+        "antimention": {
+            "enabled": False,
+            "max_mentions": 6,     # coût max d'un seul message
+            "budget": 10,          # coût max par user sur window_sec (glissant)
+            "window_sec": 60,
+            "guild_budget": 60     # coût max cumulé de la guild (raid de pings)
+        },
+        "antiemoji": {
+            "enabled": False,
+            "max_emojis": 15
+        },
+        "antiimpersonation": {
+            "enabled": False,
+            "action": "log",       # log / quarantine / ban
+            "distance": 1          # écart toléré (0 = noms identiques après normalisation)
+        },
+        "wordfilter": {
+            "enabled": False,
+            "action": "delete",    # delete / timeout / log
+            "timeout_sec": 600,
+            "words": []            # "mot", "mot*", "*mot", "*mot*", "re:motif"
+        },
+        "antiwebhook": True,
+        "antiphishing": True,  # blocklist bot-wide, même si les liens sont autorisés
+        "antimedia": {
+            "enabled": False,      # pièces jointes comparées aux hash connus (bot-wide + guild)
+            "hashes": []           # "sha256" ou "sha256:taille"
+        },
+        "autoslowmode": {
+            "enabled": False,
+            "target_per_min": 60,  # débit max toléré par salon
+            "min_authors": 4,      # en dessous, c'est l'anti-spam qui gère
+            "max_delay": 30
+        },
+        "antinuke": {
+            "enabled": False,
+            "window_sec": 10,
+            "max_channel_delete": 3,
+            "max_role_delete": 3,
+            "max_ban": 5,
+            "max_kick": 5,
+            "max_webhook_create": 3
+        }
+    },
+    "whitelist": [],
+    "blacklist": []
+}
+
+
+def default_guild_conf():
+    return json.loads(json.dumps(DEFAULT_GUILD_CONF))
+
+
+def fill_defaults(dst, defaults=DEFAULT_GUILD_CONF):
+    # complète les clés manquantes (configs créées par une version antérieure)
+    for k, v in defaults.items():
+        if k not in dst:
+            dst[k] = json.loads(json.dumps(v))
+        elif isinstance(v, dict) and isinstance(dst[k], dict):
+            fill_defaults(dst[k], v)
+    return dst
+
+
+def deep_merge(dst, src):
+    # applique un template partiel (politique) sur un record
+    for k, v in src.items():
+        if isinstance(v, dict) and isinstance(dst.get(k), dict):
+            deep_merge(dst[k], v)
+        else:
+            dst[k] = json.loads(json.dumps(v))
+    return dst
+
+
+# Bornes des champs entiers (mêmes minimums que les commandes)
+RANGES = {
+    ("protect", "antispam", "window_sec"): (2, 3600),
+    ("protect", "antispam", "threshold"): (3, 1000),
+    ("protect", "antispam", "timeout_sec"): (10, 2419200),
+    ("protect", "antiraid", "window_sec"): (10, 3600),
+    ("protect", "antiraid", "max_joins"): (3, 10000),
+    ("protect", "antiraid", "cooldown_sec"): (60, 86400),
+    ("protect", "antimention", "max_mentions"): (2, 1000),
+    ("protect", "antimention", "budget"): (2, 10000),
+    ("protect", "antimention", "window_sec"): (10, 3600),
+    ("protect", "antimention", "guild_budget"): (5, 100000),
+    ("protect", "antiemoji", "max_emojis"): (5, 1000),
+    ("protect", "antiimpersonation", "distance"): (0, 2),
+    ("protect", "wordfilter", "timeout_sec"): (10, 2419200),
+    ("protect", "autoslowmode", "target_per_min"): (10, 100000),
+    ("protect", "autoslowmode", "min_authors"): (2, 1000),
+    ("protect", "autoslowmode", "max_delay"): (2, 21600),
+    ("protect", "antinuke", "window_sec"): (5, 300),
+}
+CHOICES = {
+    ("protect", "antiraid", "action"): ("lockdown", "quarantine", "log"),
+    ("protect", "antiimpersonation", "action"): ("log", "quarantine", "ban"),
+    ("protect", "wordfilter", "action"): ("delete", "timeout", "log"),
+}
+ID_LISTS = (("whitelist",), ("blacklist",), ("protect", "invite_whitelist"))
+HASH_LISTS = (("protect", "antimedia", "hashes"),)
+TERM_LISTS = (("protect", "wordfilter", "words"),)
+DOMAIN_LISTS = (("protect", "link_whitelist"),)
+
+
+class ConfigError(ValueError):
+    pass
+
+
+# ============================================================
+#  [SCHEMA] Migrations / validation / compilation
+# ============================================================
+def _migrate_0_to_1(rec):
+    # v0 (config.json historique) : ids parfois en str, domaines non normalisés
+    for key in ("whitelist", "blacklist"):
+        lst = rec.get(key)
+        if isinstance(lst, list):
+            rec[key] = [int(x) for x in lst if isinstance(x, int) or (isinstance(x, str) and x.isdigit())]
+    prot = rec.get("protect")
+    if isinstance(prot, dict) and isinstance(prot.get("link_whitelist"), list):
+        prot["link_whitelist"] = [d.strip().lower() for d in prot["link_whitelist"] if isinstance(d, str) and d.strip()]
+    return rec
+
+MIGRATIONS = {0: _migrate_0_to_1}
+
+
+def migrate_guild_conf(rec):
+    v = rec.get("schema_version", 0)
+    if not isinstance(v, int) or v > SCHEMA_VERSION:
+        raise ConfigError(f"schema_version inconnue: {v!r}")
+    while v < SCHEMA_VERSION:
+        rec = MIGRATIONS[v](rec)
+        v += 1
+    rec["schema_version"] = SCHEMA_VERSION
+    return fill_defaults(rec)
+
+
+def _check(rec, defaults, path, errors):
+    for k in list(rec.keys()):
+        if k not in defaults and not (not path and k == "schema_version"):
+            errors.append(f"{'.'.join(path + (k,))}: clé inconnue (supprimée)")
+            del rec[k]
+    for k, dv in defaults.items():
+        if k not in rec:
+            continue
+        p = path + (k,)
+        name = ".".join(p)
+        v = rec[k]
+        if isinstance(dv, dict):
+            if not isinstance(v, dict):
+                errors.append(f"{name}: objet attendu")
+                rec[k] = json.loads(json.dumps(dv))
+            else:
+                _check(v, dv, p, errors)
+            continue
+        if isinstance(dv, bool):
+            ok = isinstance(v, bool)
+        elif isinstance(dv, int):
+            ok = isinstance(v, int) and not isinstance(v, bool)
+        elif isinstance(dv, str):
+            ok = isinstance(v, str) and v != ""
+        elif isinstance(dv, list):
+            ok = isinstance(v, list)
+        else:  # None → id Discord optionnel
+            ok = v is None or (isinstance(v, int) and not isinstance(v, bool))
+        if not ok:
+            errors.append(f"{name}: type invalide ({type(v).__name__}), valeur par défaut")
+            rec[k] = json.loads(json.dumps(dv))
+            continue
+        if p in RANGES:
+            lo, hi = RANGES[p]
+            if not lo <= v <= hi:
+                errors.append(f"{name}: {v} hors bornes [{lo}, {hi}]")
+                rec[k] = min(hi, max(lo, v))
+        if p in CHOICES and v not in CHOICES[p]:
+            errors.append(f"{name}: {v!r} non autorisé")
+            rec[k] = dv
+        if p in ID_LISTS:
+            clean = [x for x in v if isinstance(x, int) and not isinstance(x, bool)]
+            if len(clean) != len(v):
+                errors.append(f"{name}: ids non entiers supprimés")
+                rec[k] = clean
+        if p in DOMAIN_LISTS:
+            clean = [x.strip().lower() for x in v if isinstance(x, str) and x.strip()]
+            if len(clean) != len(v):
+                errors.append(f"{name}: domaines invalides supprimés")
+            rec[k] = clean
+        if p in HASH_LISTS:
+            clean = [x.strip().lower() for x in v if isinstance(x, str) and parse_hash_entry(x)]
+            if len(clean) != len(v):
+                errors.append(f"{name}: hash invalides supprimés")
+            rec[k] = clean
+        if p in TERM_LISTS:
+            clean = [x.strip() for x in v if parse_term(x)]
+            if len(clean) != len(v):
+                errors.append(f"{name}: termes invalides supprimés")
+            if len(clean) > MAX_TERMS:
+                errors.append(f"{name}: plus de {MAX_TERMS} termes, liste tronquée")
+                clean = clean[:MAX_TERMS]
+            rec[k] = clean
+
+
+def validate_guild_conf(rec):
+    # renvoie (record migré + corrigé, [erreurs]) ; ConfigError si inutilisable
+    if not isinstance(rec, dict):
+        raise ConfigError("objet JSON attendu")
+    rec = json.loads(json.dumps(rec))
+    rec = migrate_guild_conf(rec)
+    errors = []
+    _check(rec, DEFAULT_GUILD_CONF, (), errors)
+    return fill_defaults(rec), errors
+
+
+class CompiledConf:
+    # structures prêtes pour le hot-path (lookups O(1), domaines normalisés)
+    __slots__ = ("whitelist", "blacklist", "link_whitelist", "invite_whitelist", "bad_hashes", "word_filter")
+
+    def __init__(self, rec):
+        self.whitelist = frozenset(rec["whitelist"])
+        self.blacklist = frozenset(rec["blacklist"])
+        self.link_whitelist = tuple(d.lower() for d in rec["protect"]["link_whitelist"])
+        self.invite_whitelist = frozenset(rec["protect"]["invite_whitelist"])
+        self.bad_hashes = BadHashes(rec["protect"]["antimedia"]["hashes"])
+        # automate partagé/mis en cache par liste : recompilé seulement si les termes changent
+        self.word_filter = compile_terms(rec["protect"]["wordfilter"]["words"])
+
+
+def copy_db(src: str, dst: str):
+    # copie cohérente (WAL compris) via l'API backup de SQLite ; base vide si src n'existe pas
+    out = sqlite3.connect(dst)
+    if os.path.exists(src):
+        db = sqlite3.connect(src)
+        db.backup(out)
+        db.close()
+    out.close()
+    return dst
+
+
+def _dump(rec):
+    return json.dumps(rec, separators=(",", ":"))
+
+
+class GuildConfigStore:
+    # S'utilise comme l'ancien dict global : config[str(gid)] → dict de la guild.
+    # - 1re lecture : chargée depuis SQLite (ou défauts si inconnue)
+    # - au-delà de `capacity` guilds résidentes, la moins récente est évincée (sauf si lue
+    #   depuis moins de PIN_SEC) ; un record modifié mais pas encore sauvé est écrit en sortant
+    # - save(gid) persiste UNE ligne, indépendamment des autres guilds
+    def __init__(self, path: str = DB_PATH, capacity: int = 512):
+        self.path = path
+        self.capacity = capacity
+        self._lru = OrderedDict()   # gid(str) -> dict
+        self._compiled = {}         # gid(str) -> CompiledConf
+        self._seen = {}             # gid(str) -> monotonic() du dernier accès
+        self._clean = {}            # gid(str) -> hash du JSON sur disque (None : jamais écrit tel quel)
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS guilds (id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        self.hits = 0
+        self.misses = 0
+
+    # ---- Accès type dict ----
+    def __getitem__(self, gid):
+        gid = str(gid)
+        rec = self._lru.get(gid)
+        if rec is not None:
+            self._lru.move_to_end(gid)
+            self._seen[gid] = time.monotonic()
+            self.hits += 1
+            return rec
+        self.misses += 1
+        row = self.db.execute("SELECT data FROM guilds WHERE id = ?", (gid,)).fetchone()
+        rec = None
+        if row:
+            # record validé au chargement : jamais de KeyError dans les handlers
+            try:
+                rec, _ = validate_guild_conf(json.loads(row[0]))
+            except (ConfigError, ValueError):
+                rec = None
+        if rec is None:
+            rec = migrate_guild_conf(default_guild_conf())
+        self._put(gid, rec)
+        # défauts compris : une guild jamais configurée n'est pas écrite à l'éviction
+        self._clean[gid] = hash(_dump(rec))
+        return rec
+
+    def __setitem__(self, gid, rec):
+        gid = str(gid)
+        self._put(gid, rec)
+        self._clean[gid] = None
+
+    def __contains__(self, gid):
+        gid = str(gid)
+        if gid in self._lru:
+            return True
+        return self.db.execute("SELECT 1 FROM guilds WHERE id = ?", (gid,)).fetchone() is not None
+
+    def _put(self, gid, rec):
+        self._lru[gid] = rec
+        self._lru.move_to_end(gid)
+        self._compiled.pop(gid, None)
+        now = self._seen[gid] = time.monotonic()
+        while len(self._lru) > self.capacity:
+            old = next(iter(self._lru))
+            if now - self._seen.get(old, 0) < PIN_SEC:
+                break  # tout le reste est plus récent : dépassement temporaire de capacity
+            evicted = self._lru.pop(old)
+            self._compiled.pop(old, None)
+            self._seen.pop(old, None)
+            data = _dump(evicted)
+            if self._clean.pop(old, None) != hash(data):
+                self._write(old, data)
+
+    def compiled(self, gid):
+        gid = str(gid)
+        c = self._compiled.get(gid)
+        if c is None:
+            c = self._compiled[gid] = CompiledConf(self[gid])
+        return c
+
+    def resident(self):
+        return len(self._lru)
+
+    def keys(self):
+        # itère les ids sur disque sans charger les records
+        for (gid,) in self.db.execute("SELECT id FROM guilds"):
+            yield gid
+
+    # ---- Persistance ----
+    def save(self, gid):
+        gid = str(gid)
+        rec = self._lru.get(gid)
+        if rec is None:
+            return  # évincé : déjà écrit en sortant s'il avait changé
+        self._compiled.pop(gid, None)
+        data = _dump(rec)
+        self._write(gid, data)
+        self._clean[gid] = hash(data)
+
+    def _write(self, gid, data: str):
+        self.db.execute("INSERT OR REPLACE INTO guilds (id, data) VALUES (?, ?)", (gid, data))
+
+    def evict(self, gid):
+        # guild quittée : on libère la mémoire, le record reste sur disque
+        gid = str(gid)
+        self._lru.pop(gid, None)
+        self._compiled.pop(gid, None)
+        self._seen.pop(gid, None)
+        self._clean.pop(gid, None)
+
+    def import_legacy(self, path: str = LEGACY_PATH):
+        # migration unique de l'ancien config.json (ignorée si la base a déjà des guilds)
+        if not os.path.exists(path):
+            return 0
+        if self.db.execute("SELECT 1 FROM guilds LIMIT 1").fetchone():
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                legacy = json.load(f)
+            except json.JSONDecodeError:
+                return 0
+        n = 0
+        self.db.execute("BEGIN")
+        for gid, rec in legacy.items():
+            try:
+                int(gid)
+            except ValueError:
+                continue
+            if isinstance(rec, dict):
+                self.db.execute("INSERT OR REPLACE INTO guilds (id, data) VALUES (?, ?)",
+                                (gid, json.dumps(migrate_guild_conf(rec), separators=(",", ":"))))
+                n += 1
+        self.db.execute("COMMIT")
+        return n
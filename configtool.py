@@ -0,0 +1,198 @@
+# ============================================================
+#  BOT PROTECT - configtool.py
+#  Outil hors-ligne sur config.db (bot arrêté : son LRU écraserait les changements)
+#
+#    python configtool.py validate
+#    python configtool.py migrate
+#    python configtool.py apply-template policy.json [--guilds ids.txt]
+#    python configtool.py export out.jsonl / import in.jsonl
+#    python configtool.py compact
+#
+#  Tout est traité par pages de PAGE lignes : mémoire constante
+#  quel que soit le nombre de guilds.
+# ============================================================
+
+import sys
+import json
+import sqlite3
+import argparse
+
+from configstore import DB_PATH, ConfigError, validate_guild_conf, deep_merge
+
+PAGE = 500
+
+
+def iter_rows(db):
+    # pagination par rowid : pas de gros curseur ouvert pendant les écritures
+    last = 0
+    while True:
+        rows = db.execute("SELECT rowid, id, data FROM guilds WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                          (last, PAGE)).fetchall()
+        if not rows:
+            return
+        for row in rows:
+            yield row
+        last = rows[-1][0]
+
+
+def _dump(rec):
+    return json.dumps(rec, separators=(",", ":"))
+
+
+def _rewrite(db, transform, dry_run=False):
+    # applique transform(gid, rec) -> rec|None à chaque record, écrit par lots
+    stats = {"seen": 0, "changed": 0, "invalid": 0}
+    batch = []
+    for _, gid, data in iter_rows(db):
+        stats["seen"] += 1
+        try:
+            rec = json.loads(data)
+            new = transform(gid, rec)
+        except (ConfigError, ValueError) as e:
+            stats["invalid"] += 1
+            print(f"{gid}: illisible ({e})", file=sys.stderr)
+            continue
+        if new is None:
+            continue
+        out = _dump(new)
+        if out != data:
+            stats["changed"] += 1
+            batch.append((out, gid))
+        if len(batch) >= PAGE and not dry_run:
+            db.executemany("UPDATE guilds SET data = ? WHERE id = ?", batch)
+            db.commit()
+            batch.clear()
+    if batch and not dry_run:
+        db.executemany("UPDATE guilds SET data = ? WHERE id = ?", batch)
+        db.commit()
+    return stats
+
+
+# ============================================================
+#  [COMMANDES]
+# ============================================================
+def cmd_validate(db, args):
+    bad = 0
+
+    def check(gid, rec):
+        nonlocal bad
+        _, errors = validate_guild_conf(rec)
+        if errors:
+            bad += 1
+            for e in errors:
+                print(f"{gid}: {e}")
+        return None
+
+    stats = _rewrite(db, check, dry_run=True)
+    print(f"{stats['seen']} guilds, {bad} avec erreurs, {stats['invalid']} illisibles")
+    return 1 if bad or stats["invalid"] else 0
+
+
+def cmd_migrate(db, args):
+    stats = _rewrite(db, lambda gid, rec: validate_guild_conf(rec)[0], dry_run=args.dry_run)
+    print(f"{stats['seen']} guilds, {stats['changed']} réécrites, {stats['invalid']} illisibles")
+    return 1 if stats["invalid"] else 0
+
+
+def cmd_apply_template(db, args):
+    with open(args.template, "r", encoding="utf-8") as f:
+        template = json.load(f)
+    only = None
+    if args.guilds:
+        with open(args.guilds, "r", encoding="utf-8") as f:
+            only = {line.strip() for line in f if line.strip()}
+
+    def apply(gid, rec):
+        if only is not None and gid not in only:
+            return None
+        rec, errors = validate_guild_conf(deep_merge(rec, template))
+        for e in errors:
+            print(f"{gid}: {e}", file=sys.stderr)
+        return rec
+
+    stats = _rewrite(db, apply, dry_run=args.dry_run)
+    print(f"{stats['seen']} guilds parcourues, {stats['changed']} modifiées")
+    return 0
+
+
+def cmd_export(db, args):
+    n = 0
+    with open(args.out, "w", encoding="utf-8") as f:
+        for _, gid, data in iter_rows(db):
+            f.write(_dump({"id": gid, "conf": json.loads(data)}) + "\n")
+            n += 1
+    print(f"{n} guilds exportées → {args.out}")
+    return 0
+
+
+def cmd_import(db, args):
+    n, bad, batch = 0, 0, []
+    with open(args.src, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                gid = str(int(item["id"]))
+                rec, errors = validate_guild_conf(item["conf"])
+            except (ConfigError, ValueError, KeyError, TypeError) as e:
+                bad += 1
+                print(f"ligne {lineno}: rejetée ({e})", file=sys.stderr)
+                continue
+            for e in errors:
+                print(f"{gid}: {e}", file=sys.stderr)
+            batch.append((gid, _dump(rec)))
+            n += 1
+            if len(batch) >= PAGE:
+                db.executemany("INSERT OR REPLACE INTO guilds (id, data) VALUES (?, ?)", batch)
+                db.commit()
+                batch.clear()
+    if batch:
+        db.executemany("INSERT OR REPLACE INTO guilds (id, data) VALUES (?, ?)", batch)
+        db.commit()
+    print(f"{n} guilds importées, {bad} rejetées")
+    return 1 if bad else 0
+
+
+def cmd_compact(db, args):
+    db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    db.execute("VACUUM")
+    print("Base compactée.")
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Outil hors-ligne pour la config des guilds")
+    ap.add_argument("--db", default=DB_PATH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("validate")
+    p = sub.add_parser("migrate")
+    p.add_argument("--dry-run", action="store_true")
+    p = sub.add_parser("apply-template")
+    p.add_argument("template")
+    p.add_argument("--guilds", help="fichier d'ids (un par ligne) ; défaut : toutes")
+    p.add_argument("--dry-run", action="store_true")
+    p = sub.add_parser("export")
+    p.add_argument("out")
+    p = sub.add_parser("import")
+    p.add_argument("src")
+    sub.add_parser("compact")
+    args = ap.parse_args(argv)
+
+    db = sqlite3.connect(args.db)
+    db.execute("CREATE TABLE IF NOT EXISTS guilds (id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+    try:
+        return {
+            "validate": cmd_validate,
+            "migrate": cmd_migrate,
+            "apply-template": cmd_apply_template,
+            "export": cmd_export,
+            "import": cmd_import,
+            "compact": cmd_compact,
+        }[args.cmd](db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
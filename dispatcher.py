@@ -0,0 +1,373 @@
+# ============================================================
+#  BOT PROTECT - dispatcher.py
+#  File d'actions de modération priorisée (raid > sanctions > deletes > logs)
+# ============================================================
+
+import time
+import heapq
+import datetime
+import asyncio
+import itertools
+from collections import defaultdict
+
+import discord
+
+# ---- Classes de priorité (plus petit = plus urgent) ----
+PRIO_RAID = 0
+PRIO_SANCTION = 1
+PRIO_DELETE = 2
+PRIO_LOG = 3
+PRIO_NAMES = {PRIO_RAID: "raid", PRIO_SANCTION: "sanction", PRIO_DELETE: "delete", PRIO_LOG: "log"}
+
+# Discord accepte jusqu'à 10 embeds par message
+LOG_BATCH = 10
+# Discord accepte jusqu'à 200 users par bulk-ban
+BAN_BATCH = 200
+# Bulk-delete : 2 à 100 messages par appel, collectés par salon sur une courte fenêtre
+DELETE_BATCH = 100
+DELETE_WINDOW = 0.5
+
+
+class _Action:
+    __slots__ = ("prio", "seq", "key", "bucket", "run", "cancelled")
+
+    def __init__(self, prio, seq, key, bucket, run):
+        self.prio = prio
+        self.seq = seq
+        self.key = key
+        self.bucket = bucket
+        self.run = run
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.prio, self.seq) < (other.prio, other.seq)
+
+
+class ActionDispatcher:
+    # Les handlers ne font qu'enqueue; N workers exécutent par priorité.
+    # - dédup par clé (une cible = une action en attente)
+    # - 1 requête en vol par bucket (salon / guild), les autres buckets avancent
+    # - bucket bloqué jusqu'à retry_after sur 429
+    def __init__(self, workers: int = 4):
+        self.workers = workers
+        self._heap = []
+        self._seq = itertools.count()
+        self._pending = {}                  # key -> _Action
+        self._busy = set()                  # buckets avec une requête en vol
+        self._blocked = {}                  # bucket -> monotonic() de déblocage
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+        self._log_buf = defaultdict(list)   # guild_id -> [embeds]
+        self._ban_buf = defaultdict(dict)   # guild_id -> {user_id: (guild, user, reason)}
+        self._timeouts = {}                 # (guild_id, user_id) -> until (timestamp)
+        self._del_buf = defaultdict(dict)   # channel_id -> {message_id: (message, reason)}
+        self._del_armed = set()             # salons dont le flush est programmé
+        self.stats = defaultdict(int)
+        # mode shadow (rejeu) : Counter des actions qui auraient été faites, rien n'est exécuté
+        self.shadow = None
+        # on_action(guild_id, kind, target_id, reason) : action acceptée (comptabilité)
+        self.on_action = None
+        # on_done(guild_id, kind, target_id, reason) : action exécutée avec succès (journal)
+        self.on_done = None
+
+    # ---- Cycle de vie ----
+    def start(self):
+        if self._tasks:
+            return
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def pending(self):
+        return len(self._pending)
+
+    def idle(self):
+        # rien en file, en vol, ni en attente de flush (buffers batchés)
+        return not (self._heap or self._busy or self._del_armed or self._del_buf or self._ban_buf or self._log_buf)
+
+    # ---- API générique ----
+    def _count(self, gid, kind, target=None, reason=None):
+        if self.on_action:
+            self.on_action(gid, kind, target, reason)
+
+    def _done(self, gid, kind, target=None, reason=None):
+        if self.on_done:
+            self.on_done(gid, kind, target, reason)
+
+    def _then_done(self, run, gid, kind, target=None, reason=None):
+        # run() puis _done ; un échec (ou un 429 rejoué plus tard) n'est pas journalisé
+        async def wrapped():
+            await run()
+            self._done(gid, kind, target, reason)
+        return wrapped
+
+    def _shadowed(self, prio, kind):
+        if self.shadow is None:
+            return False
+        self.shadow[f"{PRIO_NAMES[prio]}:{kind}"] += 1
+        return True
+
+    def enqueue(self, prio, key, bucket, run):
+        # run: fonction sans argument qui renvoie une coroutine
+        if self._shadowed(prio, key[0] if key else "action"):
+            return True
+        if key is not None and key in self._pending:
+            self.stats["deduped"] += 1
+            return False
+        act = _Action(prio, next(self._seq), key, bucket, run)
+        if key is not None:
+            self._pending[key] = act
+        heapq.heappush(self._heap, act)
+        self._wakeup.set()
+        return True
+
+    def cancel(self, key):
+        act = self._pending.pop(key, None)
+        if act:
+            act.cancelled = True
+
+    # ---- Helpers haut niveau ----
+    def raid(self, guild: discord.Guild, name: str, run, target=None, reason=None):
+        kind = name.split(":", 1)[0]
+        self._count(guild.id, kind, target, reason)
+        return self.enqueue(PRIO_RAID, ("raid", guild.id, name), ("raid", guild.id),
+                            self._then_done(run, guild.id, kind, target, reason))
+
+    def timeout(self, member: discord.Member, seconds: int, reason: str = None):
+        # Un membre déjà timeout au moins aussi longtemps n'est pas re-sanctionné
+        if self._shadowed(PRIO_SANCTION, "timeout"):
+            return True
+        k = (member.guild.id, member.id)
+        until = time.time() + seconds
+        if self._timeouts.get(k, 0) >= until - 1:
+            self.stats["deduped"] += 1
+            return False
+        # un timeout plus long remplace celui encore en attente (escalade : paliers, phishing)
+        key = ("timeout",) + k
+        self.cancel(key)
+        self._timeouts[k] = until
+        self._count(member.guild.id, "timeout", member.id, reason)
+        if len(self._timeouts) > 5000:
+            now = time.time()
+            self._timeouts = {kk: u for kk, u in self._timeouts.items() if u > now}
+
+        async def run():
+            try:
+                await member.edit(timed_out_until=discord.utils.utcnow() + datetime.timedelta(seconds=seconds), reason=reason)
+            except Exception:
+                if self._timeouts.get(k) == until:
+                    self._timeouts.pop(k, None)
+                raise
+            self._done(member.guild.id, "timeout", member.id, reason)
+
+        return self.enqueue(PRIO_SANCTION, key, ("member", member.guild.id), run)
+
+    def ban(self, guild: discord.Guild, user, reason: str = None):
+        if self._shadowed(PRIO_SANCTION, "ban"):
+            return True
+        buf = self._ban_buf[guild.id]
+        if user.id in buf:
+            self.stats["deduped"] += 1
+            return False
+        buf[user.id] = (guild, user, reason)
+        self._count(guild.id, "ban", user.id, reason)
+        self.enqueue(PRIO_SANCTION, ("ban", guild.id), ("ban", guild.id), lambda: self._flush_bans(guild.id))
+        return True
+
+    def channel_edit(self, channel, name: str, **fields):
+        # la dernière valeur demandée gagne (remplace un edit encore en attente)
+        key = ("edit", channel.id, name)
+        self.cancel(key)
+        self._count(channel.guild.id, name, None, fields.get("reason"))
+        return self.enqueue(PRIO_SANCTION, key, ("channel_edit", channel.id),
+                            self._then_done(lambda: channel.edit(**fields), channel.guild.id, name, None, fields.get("reason")))
+
+    def set_roles(self, member: discord.Member, roles, kind: str, reason: str = None):
+        # remplace TOUS les rôles du membre en 1 appel ; la dernière demande gagne
+        if self._shadowed(PRIO_SANCTION, kind):
+            return True
+        key = ("roles", member.guild.id, member.id)
+        self.cancel(key)
+        self._count(member.guild.id, kind, member.id, reason)
+        return self.enqueue(PRIO_SANCTION, key, ("member", member.guild.id),
+                            self._then_done(lambda: member.edit(roles=roles, reason=reason),
+                                            member.guild.id, kind, member.id, reason))
+
+    def delete(self, message: discord.Message, reason: str = None):
+        # collecte par salon pendant DELETE_WINDOW puis flush via bulk-delete
+        if self._shadowed(PRIO_DELETE, "delete"):
+            return True
+        ch = message.channel
+        buf = self._del_buf[ch.id]
+        if message.id in buf:
+            self.stats["deduped"] += 1
+            return False
+        buf[message.id] = (message, reason)
+        self._count(ch.guild.id, "delete", message.author.id, reason)
+        if len(buf) >= DELETE_BATCH:
+            self._enqueue_delete_flush(ch)
+        elif ch.id not in self._del_armed:
+            self._del_armed.add(ch.id)
+            asyncio.get_running_loop().call_later(DELETE_WINDOW, self._enqueue_delete_flush, ch)
+        return True
+
+    def _enqueue_delete_flush(self, channel):
+        self._del_armed.discard(channel.id)
+        self.enqueue(PRIO_DELETE, ("delete", channel.id), ("channel", channel.id),
+                     lambda: self._flush_deletes(channel))
+
+    def log(self, guild: discord.Guild, embed: discord.Embed, send):
+        # send(guild, [embeds]) : coroutine d'envoi effectif
+        if self._shadowed(PRIO_LOG, "log"):
+            return
+        self._log_buf[guild.id].append(embed)
+        self._enqueue_log_flush(guild, send)
+
+    def _enqueue_log_flush(self, guild, send):
+        self.enqueue(PRIO_LOG, ("log", guild.id), ("log", guild.id), lambda: self._flush_logs(guild, send))
+
+    # ---- Flush batchés ----
+    async def _flush_logs(self, guild, send):
+        buf = self._log_buf[guild.id]
+        batch, buf[:] = buf[:LOG_BATCH], buf[LOG_BATCH:]
+        if buf:
+            self._enqueue_log_flush(guild, send)
+        else:
+            self._log_buf.pop(guild.id, None)
+        if batch:
+            try:
+                await send(guild, batch)
+            except (discord.RateLimited, discord.HTTPException) as e:
+                # rejoué après retry_after, avant les embeds arrivés entre-temps
+                if isinstance(e, discord.RateLimited) or e.status == 429:
+                    self._log_buf[guild.id][:0] = batch
+                raise
+
+    async def _flush_bans(self, gid):
+        # les users ne quittent le buffer qu'une fois bannis (rejouable sur 429) ;
+        # un appel = une seule raison (blacklist, anti-nuke… peuvent partager le buffer)
+        buf = self._ban_buf.get(gid)
+        while buf:
+            guild, _, reason = next(iter(buf.values()))
+            chunk = list(itertools.islice((it for it in buf.values() if it[2] == reason), BAN_BATCH))
+            try:
+                if len(chunk) == 1:
+                    await guild.ban(chunk[0][1], reason=reason)
+                    banned = {chunk[0][1].id}
+                else:
+                    res = await guild.bulk_ban([it[1] for it in chunk], reason=reason)
+                    banned = {u.id for u in res.banned}
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    for it in chunk:
+                        buf.pop(it[1].id, None)
+                raise
+            for it in chunk:
+                buf.pop(it[1].id, None)
+                if it[1].id in banned:
+                    self._done(gid, "ban", it[1].id, it[2])
+        self._ban_buf.pop(gid, None)
+
+    async def _flush_deletes(self, channel):
+        buf = self._del_buf.get(channel.id)
+        while buf:
+            chunk = list(buf.values())[:DELETE_BATCH]
+            msgs = [m for m, _ in chunk]
+            deleted = set()
+            try:
+                if len(msgs) == 1:
+                    await msgs[0].delete()
+                else:
+                    await channel.delete_messages(msgs, reason="Protection auto")
+                    self.stats["bulk_deleted"] += len(msgs)
+                deleted = {m.id for m in msgs}
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    raise
+                # bulk refusé (message > 14j, déjà supprimé...) → suppression unitaire
+                for m in msgs:
+                    try:
+                        await m.delete()
+                        deleted.add(m.id)
+                    except discord.HTTPException as e2:
+                        if e2.status == 429:
+                            raise
+            for m, reason in chunk:
+                buf.pop(m.id, None)
+                if m.id in deleted:
+                    self._done(channel.guild.id, "delete", m.author.id, reason)
+        self._del_buf.pop(channel.id, None)
+
+    # ---- Ordonnancement ----
+    def _next(self):
+        now = time.monotonic()
+        skipped = []
+        found = None
+        while self._heap:
+            act = heapq.heappop(self._heap)
+            if act.cancelled:
+                continue
+            until = self._blocked.get(act.bucket)
+            if act.bucket in self._busy or (until and until > now):
+                skipped.append(act)
+                continue
+            found = act
+            break
+        for act in skipped:
+            heapq.heappush(self._heap, act)
+        if found and found.key is not None and self._pending.get(found.key) is found:
+            del self._pending[found.key]
+        return found
+
+    def _requeue(self, act):
+        if act.key is not None:
+            if act.key in self._pending:
+                return
+            self._pending[act.key] = act
+        act.seq = next(self._seq)
+        heapq.heappush(self._heap, act)
+        self.stats["retried"] += 1
+
+    def _next_unblock_delay(self):
+        now = time.monotonic()
+        delays = [u - now for u in self._blocked.values() if u > now]
+        return min(delays) if delays else None
+
+    async def _worker(self):
+        while True:
+            act = self._next()
+            if act is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._next_unblock_delay())
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._busy.add(act.bucket)
+            try:
+                await act.run()
+                self.stats["done"] += 1
+            except (discord.RateLimited, discord.HTTPException) as e:
+                retry = getattr(e, "retry_after", None)
+                if retry or getattr(e, "status", None) == 429:
+                    # bucket épuisé : on le gèle et on rejoue l'action après
+                    self._blocked[act.bucket] = time.monotonic() + float(retry or 1.0)
+                    self._requeue(act)
+                else:
+                    self.stats["failed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats["failed"] += 1
+            finally:
+                self._busy.discard(act.bucket)
+                self._blocked = {b: u for b, u in self._blocked.items() if u > time.monotonic()}
+                self._wakeup.set()
+
@@ -0,0 +1,78 @@
+# ============================================================
+#  BOT PROTECT - httpclient.py
+#  Client HTTP partagé : pool de connexions, timeouts, téléchargements plafonnés
+# ============================================================
+
+import aiohttp
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+CHUNK = 64 * 1024
+USER_AGENT = "ProtectBot (+https://discord.com)"
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+class HttpClient:
+    # Une seule ClientSession pour tout le bot (créée au 1er usage, dans la loop)
+    def __init__(self, limit: int = 64, limit_per_host: int = 8, timeout: float = 10.0,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=5)
+        self.max_bytes = max_bytes
+        self._session = None
+        self.requests = 0
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                                  headers={"User-Agent": USER_AGENT})
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def fetch_bytes(self, url: str, max_bytes: int = None):
+        # renvoie (status, bytes) ; ResponseTooLarge dès que le plafond est franchi
+        cap = max_bytes or self.max_bytes
+        self.requests += 1
+        async with self.session.get(url) as resp:
+            if resp.status != 200:
+                return resp.status, b""
+            if resp.content_length and resp.content_length > cap:
+                raise ResponseTooLarge(resp.content_length)
+            buf = bytearray()
+            async for chunk in resp.content.iter_chunked(CHUNK):
+                buf += chunk
+                if len(buf) > cap:
+                    raise ResponseTooLarge(len(buf))
+            return resp.status, bytes(buf)
+
+    async def iter_chunks(self, url: str, max_bytes: int = None):
+        # générateur de morceaux (hash en flux sans tout garder en mémoire)
+        cap = max_bytes or self.max_bytes
+        self.requests += 1
+        async with self.session.get(url) as resp:
+            resp.raise_for_status()
+            if resp.content_length and resp.content_length > cap:
+                raise ResponseTooLarge(resp.content_length)
+            seen = 0
+            async for chunk in resp.content.iter_chunked(CHUNK):
+                seen += len(chunk)
+                if seen > cap:
+                    raise ResponseTooLarge(seen)
+                yield chunk
+
+    async def redirect_target(self, url: str):
+        # UN saut de redirection sans lire le corps : Location ou None
+        self.requests += 1
+        async with self.session.get(url, allow_redirects=False) as resp:
+            if resp.status in (301, 302, 303, 307, 308):
+                return resp.headers.get("Location")
+            return None
@@ -0,0 +1,186 @@
+# ============================================================
+#  BOT PROTECT - impersonation.py
+#  Anti-usurpation du staff : index par guild des squelettes de noms du staff,
+#  correspondance exacte + quasi-exacte (suppressions symétriques, façon SymSpell)
+# ============================================================
+
+from itertools import combinations
+
+from textnorm import name_skeleton
+
+# En dessous, un nom est trop court pour être comparé (exact / approché)
+MIN_EXACT = 3
+MIN_NEAR = 5
+# Nom d'utilisateur du staff : indexé seulement au-delà (les "alex", "max" sont trop courants
+# pour qu'un arrivant qui le porte aussi soit un usurpateur ; pseudo / nom global restent à MIN_EXACT)
+MIN_USERNAME = 6
+
+
+def deletions(s: str, d: int):
+    # toutes les variantes de s privées de 0..d caractères
+    out = {s}
+    for k in range(1, min(d, len(s)) + 1):
+        for idx in combinations(range(len(s)), k):
+            out.add("".join(c for i, c in enumerate(s) if i not in idx))
+    return out
+
+
+def edit_distance(a: str, b: str, limit: int):
+    # distance de Damerau-Levenshtein (transpositions adjacentes), limit + 1 si au-delà
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class NameIndex:
+    # squelette -> ids du staff qui le portent ; variante (≤ max_distance suppressions)
+    # -> squelettes. Une requête génère les variantes du nom testé : son coût dépend
+    # de la longueur du nom, pas du nombre de membres du staff.
+    def __init__(self, max_distance: int = 1):
+        self.max_distance = max_distance
+        self._owners = {}    # squelette -> set(uid)
+        self._variants = {}  # variante -> set(squelette)
+        self._members = {}   # uid -> frozenset(squelettes)
+
+    def __len__(self):
+        return len(self._members)
+
+    def __contains__(self, uid):
+        return uid in self._members
+
+    def _add(self, sk, uid):
+        owners = self._owners.get(sk)
+        if owners is None:
+            owners = self._owners[sk] = set()
+            if len(sk) >= MIN_NEAR:
+                for v in deletions(sk, self.max_distance):
+                    self._variants.setdefault(v, set()).add(sk)
+        owners.add(uid)
+
+    def _remove(self, sk, uid):
+        owners = self._owners.get(sk)
+        if owners is None:
+            return
+        owners.discard(uid)
+        if owners:
+            return
+        del self._owners[sk]
+        if len(sk) >= MIN_NEAR:
+            for v in deletions(sk, self.max_distance):
+                sks = self._variants.get(v)
+                if sks is not None:
+                    sks.discard(sk)
+                    if not sks:
+                        del self._variants[v]
+
+    def set(self, uid, names):
+        # (re)déclare les noms d'un membre du staff ; no-op si inchangés
+        new = frozenset(sk for sk in map(name_skeleton, names) if len(sk) >= MIN_EXACT)
+        old = self._members.get(uid, frozenset())
+        if new == old and uid in self._members:
+            return
+        for sk in old - new:
+            self._remove(sk, uid)
+        for sk in new - old:
+            self._add(sk, uid)
+        self._members[uid] = new
+
+    def discard(self, uid):
+        for sk in self._members.pop(uid, ()):
+            self._remove(sk, uid)
+
+    def match(self, name: str, exclude=None):
+        # (uid du staff imité, squelette, distance) ou None
+        sk = name_skeleton(name)
+        if len(sk) < MIN_EXACT:
+            return None
+        for uid in self._owners.get(sk, ()):
+            if uid != exclude:
+                return uid, sk, 0
+        if len(sk) < MIN_NEAR or not self.max_distance:
+            return None
+        best = None
+        for v in deletions(sk, self.max_distance):
+            for cand in self._variants.get(v, ()):
+                if cand == sk:
+                    continue
+                dist = edit_distance(sk, cand, self.max_distance)
+                if dist > self.max_distance or (best and best[2] <= dist):
+                    continue
+                uid = next((u for u in self._owners[cand] if u != exclude), None)
+                if uid is not None:
+                    best = (uid, cand, dist)
+        return best
+
+
+def member_names(member):
+    # tout ce qu'un autre membre peut voir : pseudo serveur, nom global, nom d'utilisateur
+    return [n for n in (member.nick, member.global_name, member.name) if n]
+
+
+def staff_names(member):
+    # noms indexés pour un membre du staff (cf. MIN_USERNAME)
+    names = [n for n in (member.nick, member.global_name) if n]
+    if member.name and len(name_skeleton(member.name)) >= MIN_USERNAME:
+        names.append(member.name)
+    return names
+
+
+class ImpersonationGuard:
+    # Index construit paresseusement à la 1re vérification d'une guild, puis tenu à
+    # jour membre par membre (rôles, pseudos, départs) ; invalidé si les rôles changent.
+    def __init__(self, is_staff):
+        self.is_staff = is_staff
+        self._guilds = {}   # gid -> NameIndex
+
+    def __len__(self):
+        return len(self._guilds)
+
+    def index(self, guild, max_distance: int = 1):
+        idx = self._guilds.get(guild.id)
+        if idx is None or idx.max_distance != max_distance:
+            idx = self._guilds[guild.id] = NameIndex(max_distance)
+            for m in guild.members:
+                if self.is_staff(m):
+                    idx.set(m.id, staff_names(m))
+        return idx
+
+    def update(self, member):
+        # rôles ou noms changés : O(noms du membre), rien si l'index n'existe pas encore
+        idx = self._guilds.get(member.guild.id)
+        if idx is None:
+            return
+        if self.is_staff(member):
+            idx.set(member.id, staff_names(member))
+        else:
+            idx.discard(member.id)
+
+    def remove(self, member):
+        idx = self._guilds.get(member.guild.id)
+        if idx is not None:
+            idx.discard(member.id)
+
+    def invalidate(self, gid):
+        self._guilds.pop(gid, None)
+
+    def check(self, member, max_distance: int = 1):
+        # (nom testé, uid du staff imité, distance) ou None ; le staff n'est pas vérifié
+        if self.is_staff(member):
+            return None
+        idx = self.index(member.guild, max_distance)
+        for name in member_names(member):
+            hit = idx.match(name, exclude=member.id)
+            if hit:
+                return name, hit[0], hit[2]
+        return None
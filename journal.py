@@ -0,0 +1,141 @@
+# ============================================================
+#  BOT PROTECT - journal.py
+#  Journal de modération local : segments JSONL gzip en append seul,
+#  rotation par taille/âge, index SQLite (guild, user, action, temps)
+# ============================================================
+
+import os
+import gzip
+import json
+import time
+import zlib
+import sqlite3
+import threading
+
+JOURNAL_DIR = "journal"
+SEGMENT_BYTES = 4 * 1024 * 1024     # taille (compressée) d'un segment avant rotation
+SEGMENT_AGE = 86400                 # un segment par jour au plus
+RETENTION = 180 * 86400             # segments plus vieux supprimés (avec leurs entrées d'index)
+
+
+class ModJournal:
+    # record() est O(1) et ne touche pas au disque ; flush() (hors event loop)
+    # écrit le buffer en UN membre gzip à la fin du segment courant, et indexe
+    # chaque ligne par (segment, offset du membre, rang dans le membre).
+    # Une requête ne décompresse que les membres qui contiennent ses résultats.
+    def __init__(self, path: str = JOURNAL_DIR, segment_bytes: int = SEGMENT_BYTES,
+                 segment_age: float = SEGMENT_AGE, retention: float = RETENTION):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.segment_age = segment_age
+        self.retention = retention
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()       # disque + index
+        self._buf_lock = threading.Lock()   # échange du buffer (jamais tenu pendant une E/S)
+        self._buf = []
+        self.db = sqlite3.connect(os.path.join(path, "index.db"), isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS segments (seg INTEGER PRIMARY KEY, created REAL NOT NULL)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS entries (t REAL, g INTEGER, u INTEGER, a TEXT, "
+                        "seg INTEGER, off INTEGER, n INTEGER)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_gut ON entries (g, u, t)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_gat ON entries (g, a, t)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_gt ON entries (g, t)")
+        row = self.db.execute("SELECT seg, created FROM segments ORDER BY seg DESC LIMIT 1").fetchone()
+        self.seg, self.seg_created = row if row else (0, 0.0)
+
+    def _seg_path(self, seg):
+        return os.path.join(self.path, f"seg-{seg:06d}.jsonl.gz")
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    # ---- Écriture ----
+    def record(self, gid, action: str, user_id=None, by=None, reason=None, **extra):
+        # by=None : action automatique du bot
+        rec = {"t": round(time.time(), 3), "g": gid, "u": user_id, "a": action, "by": by}
+        if reason:
+            rec["r"] = reason[:300]
+        if extra:
+            rec["x"] = extra
+        with self._buf_lock:
+            self._buf.append(rec)
+
+    def _rotate(self, now):
+        path = self._seg_path(self.seg)
+        size = os.path.getsize(path) if self.seg and os.path.exists(path) else 0
+        if self.seg and size < self.segment_bytes and now - self.seg_created < self.segment_age:
+            return
+        self.seg += 1
+        self.seg_created = now
+        self.db.execute("INSERT INTO segments (seg, created) VALUES (?, ?)", (self.seg, now))
+        old = [s for (s,) in self.db.execute("SELECT seg FROM segments WHERE created < ? AND seg != ?",
+                                              (now - self.retention, self.seg))]
+        for s in old:
+            self.db.execute("DELETE FROM entries WHERE seg = ?", (s,))
+            self.db.execute("DELETE FROM segments WHERE seg = ?", (s,))
+            try:
+                os.remove(self._seg_path(s))
+            except OSError:
+                pass
+
+    def flush(self):
+        with self._lock:
+            with self._buf_lock:
+                buf, self._buf = self._buf, []
+            if not buf:
+                return 0
+            self._rotate(time.time())
+            data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in buf).encode("utf-8")
+            with open(self._seg_path(self.seg), "ab") as f:
+                off = f.tell()
+                f.write(gzip.compress(data))
+            self.db.execute("BEGIN")
+            self.db.executemany("INSERT INTO entries (t, g, u, a, seg, off, n) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                [(r["t"], r["g"], r["u"], r["a"], self.seg, off, n) for n, r in enumerate(buf)])
+            self.db.execute("COMMIT")
+            return len(buf)
+
+    # ---- Lecture ----
+    def _read_member(self, seg, off):
+        # décompresse UN membre gzip (s'arrête à sa fin, pas au reste du segment)
+        d = zlib.decompressobj(wbits=31)
+        out = []
+        with open(self._seg_path(seg), "rb") as f:
+            f.seek(off)
+            while not d.eof:
+                chunk = f.read(64 * 1024)
+                if not chunk:
+                    break
+                out.append(d.decompress(chunk))
+        return b"".join(out).decode("utf-8").splitlines()
+
+    def query(self, gid, user_id=None, action=None, since=None, limit: int = 50):
+        # entrées les plus récentes d'abord ; flush préalable : le buffer est inclus
+        self.flush()
+        sql, args = "SELECT seg, off, n FROM entries WHERE g = ?", [gid]
+        if user_id is not None:
+            sql += " AND u = ?"
+            args.append(user_id)
+        if action:
+            sql += " AND a = ?"
+            args.append(action)
+        if since is not None:
+            sql += " AND t >= ?"
+            args.append(since)
+        sql += " ORDER BY t DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            hits = self.db.execute(sql, args).fetchall()
+            members = {}
+            out = []
+            for seg, off, n in hits:
+                lines = members.get((seg, off))
+                if lines is None:
+                    try:
+                        lines = members[(seg, off)] = self._read_member(seg, off)
+                    except (OSError, zlib.error):
+                        lines = members[(seg, off)] = []
+                if n < len(lines):
+                    out.append(json.loads(lines[n]))
+        return out
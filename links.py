@@ -0,0 +1,252 @@
+# ============================================================
+#  BOT PROTECT - links.py
+#  Extraction des liens / invitations + résolution d'invites et de liens courts (cache TTL/LRU)
+# ============================================================
+
+import os
+import re
+import time
+import asyncio
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from urllib.parse import urljoin
+
+# Liens avec schéma, ou invitations Discord même sans schéma (forme la plus spammée)
+URL_RE = re.compile(r"https?://[^\s<>]+", re.IGNORECASE)
+INVITE_RE = re.compile(r"(?:https?://)?(?:www\.)?(?:discord(?:app)?\.com/invite|discord\.gg)/([A-Za-z0-9-]{2,32})",
+                       re.IGNORECASE)
+
+
+def extract_urls(text: str):
+    return URL_RE.findall(text)
+
+
+def extract_invites(text: str):
+    # codes uniques, ordre conservé (les codes sont sensibles à la casse)
+    return list(dict.fromkeys(INVITE_RE.findall(text)))
+
+
+def url_host(url: str):
+    rest = url.split("://", 1)[-1]
+    host = re.split(r"[/?#]", rest, 1)[0]
+    host = host.rsplit("@", 1)[-1].split(":", 1)[0]
+    return host.strip(".").lower()
+
+
+def domain_allowed(url: str, host: str, whitelist):
+    # "exemple.com" couvre exemple.com et ses sous-domaines ; une entrée avec "/"
+    # (ex: "youtube.com/watch") garde l'ancien comportement (sous-chaîne de l'URL)
+    low = url.lower()
+    for d in whitelist:
+        if "/" in d:
+            if d in low:
+                return True
+        elif host == d or host.endswith("." + d):
+            return True
+    return False
+
+
+def domain_hash(domain: str):
+    # hash() de str (SipHash 64 bits) : très rapide, stable dans le process.
+    # Le tableau est toujours reconstruit en mémoire, jamais persisté.
+    return hash(domain) & 0xFFFFFFFFFFFFFFFF
+
+
+# hash triés par paquet lors du build (borne les objets Python temporaires)
+SORT_CHUNK = 1 << 18
+
+
+class DomainBlocklist:
+    # Liste bot-wide de domaines de phishing (millions de lignes) :
+    # tableau trié de hash 64 bits (8 octets/domaine, au lieu de ~80 pour un set de str),
+    # recherche par bisect (C). Collision 64 bits négligeable à cette échelle.
+    # reload() reconstruit hors event loop puis remplace le tableau d'un coup.
+    def __init__(self, path: str):
+        self.path = path
+        self._hashes = array("Q")
+        self.mtime = None
+        self.loaded_at = None
+
+    def __len__(self):
+        return len(self._hashes)
+
+    @staticmethod
+    def _parse(line):
+        # formats acceptés : "domaine", "0.0.0.0 domaine" (hosts), "*.domaine", commentaires #
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            return None
+        d = line.split()[-1].lower().strip(".")
+        if d.startswith("*."):
+            d = d[2:]
+        return d or None
+
+    def build(self):
+        # lecture en flux ; renvoie le nouveau tableau (ne touche pas l'instance).
+        # Tri par paquets de SORT_CHUNK (seuls ces ints Python existent à la fois), paquets
+        # stockés en tableaux typés, puis fusion + dédoublonnage linéaire : ~16 o/domaine au pic
+        runs, chunk = [], []
+        with open(self.path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                d = self._parse(line)
+                if d:
+                    chunk.append(domain_hash(d))
+                    if len(chunk) >= SORT_CHUNK:
+                        chunk.sort()
+                        runs.append(array("Q", chunk))
+                        chunk.clear()
+        if chunk:
+            chunk.sort()
+            runs.append(array("Q", chunk))
+        del chunk
+        out = array("Q")
+        last = None
+        for h in (runs[0] if len(runs) == 1 else heapq.merge(*runs)):
+            if h != last:
+                out.append(h)
+                last = h
+        return out
+
+    def reload(self, force: bool = False):
+        # renvoie True si la liste a été (re)chargée
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if not force and mtime == self.mtime:
+            return False
+        new = self.build()
+        self._hashes = new   # swap atomique : les lecteurs voient l'ancien ou le nouveau
+        self.mtime = mtime
+        self.loaded_at = time.time()
+        return True
+
+    def _contains(self, h):
+        arr = self._hashes
+        i = bisect_left(arr, h)
+        return i < len(arr) and arr[i] == h
+
+    def match(self, host: str):
+        # renvoie le domaine listé (host ou un parent), sinon None
+        if not self._hashes or not host:
+            return None
+        labels = host.lower().strip(".").split(".")
+        for i in range(len(labels) - 1):
+            d = ".".join(labels[i:])
+            if self._contains(domain_hash(d)):
+                return d
+        return None
+
+
+class CoalescingCache:
+    # cache LRU borné avec TTL par entrée ; requêtes concurrentes pour une même
+    # clé fusionnées en UN appel (les autres attendent le même Future)
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._cache = OrderedDict()   # clé -> (valeur, expires)
+        self._inflight = {}           # clé -> Future
+        self.hits = 0
+        self.fetches = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _store(self, key, value, ttl):
+        self._cache[key] = (value, time.monotonic() + ttl)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    async def _get(self, key, fetch, ttl_for, err_value, err_ttl):
+        hit = self._cache.get(key)
+        if hit and hit[1] > time.monotonic():
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return hit[0]
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.hits += 1
+            return await asyncio.shield(fut)
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        value = err_value
+        try:
+            self.fetches += 1
+            try:
+                value = await fetch(key)
+                self._store(key, value, ttl_for(value))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._store(key, err_value, err_ttl)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+            if not fut.done():
+                fut.set_result(value)
+
+
+# Résultat d'une résolution d'invite en échec transitoire (5xx, timeout) : ni valide ni
+# inexistante, l'appelant ne doit pas sanctionner dessus
+INVITE_ERROR = object()
+
+
+class InviteResolver(CoalescingCache):
+    # code d'invite → id de la guild cible ; les invites invalides sont aussi cachées (neg_ttl)
+    # fetch(code) -> guild_id | None (None = invite inexistante) ; exception = erreur transitoire,
+    # renvoyée comme INVITE_ERROR (cachée err_ttl)
+    def __init__(self, fetch, ttl: float = 3600, neg_ttl: float = 600, err_ttl: float = 30, maxsize: int = 10000):
+        super().__init__(maxsize)
+        self.fetch = fetch
+        self.ttl = ttl
+        self.neg_ttl = neg_ttl
+        self.err_ttl = err_ttl
+
+    async def resolve(self, code: str):
+        return await self._get(code, self.fetch, lambda gid: self.ttl if gid else self.neg_ttl,
+                               INVITE_ERROR, self.err_ttl)
+
+
+# Raccourcisseurs courants : seuls ces hôtes sont suivis (jamais la cible finale)
+SHORTENERS = frozenset({
+    "bit.ly", "bitly.com", "tinyurl.com", "t.co", "goo.gl", "ow.ly", "is.gd", "v.gd",
+    "buff.ly", "cutt.ly", "rebrand.ly", "shorturl.at", "rb.gy", "t.ly", "tiny.cc",
+    "s.id", "bl.ink", "lnkd.in", "soo.gd", "clck.ru", "shorturl.ee", "tinyurl.is",
+})
+
+
+class Unshortener(CoalescingCache):
+    # URL raccourcie → URL finale, en suivant au plus max_depth redirections
+    # tant que l'hôte courant est un raccourcisseur connu.
+    # hop(url) -> Location | None (un seul saut, corps non lu) ; exception = erreur transitoire
+    # En cas d'échec on renvoie l'URL d'origine : l'hôte reste celui du raccourcisseur.
+    def __init__(self, hop, hosts=SHORTENERS, max_depth: int = 5, ttl: float = 86400,
+                 err_ttl: float = 300, maxsize: int = 20000):
+        super().__init__(maxsize)
+        self.hop = hop
+        self.hosts = frozenset(hosts)
+        self.max_depth = max_depth
+        self.ttl = ttl
+        self.err_ttl = err_ttl
+
+    def is_short(self, url: str):
+        host = url_host(url)
+        return (host[4:] if host.startswith("www.") else host) in self.hosts
+
+    async def _follow(self, url):
+        for _ in range(self.max_depth):
+            if not self.is_short(url):
+                break
+            nxt = await self.hop(url)
+            if not nxt:
+                break
+            url = urljoin(url, nxt)
+        return url
+
+    async def resolve(self, url: str):
+        if not self.is_short(url):
+            return url
+        key = url.split("#", 1)[0]
+        return await self._get(key, self._follow, lambda _: self.ttl, key, self.err_ttl)
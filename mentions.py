@@ -0,0 +1,81 @@
+# ============================================================
+#  BOT PROTECT - mentions.py
+#  Anti-mention : coût par message + budget glissant (seau percé) par user et par guild
+# ============================================================
+
+from collections import OrderedDict
+
+# Poids d'une mention (un rôle / @everyone touche bien plus de monde)
+COST_USER = 1
+COST_ROLE = 2
+COST_EVERYONE = 5
+# Timeouts successifs (s) ; un palier retombe après STRIKE_DECAY sans récidive
+ESCALATION = [120, 600, 3600, 86400]
+STRIKE_DECAY = 3600
+# Au-delà, on purge les seaux vides, puis les moins récents (mémoire bornée)
+MAX_TRACKED = 20000
+
+
+def mention_cost(message):
+    # mentions distinctes issues des données parsées (pas de comptage de "@" dans le texte)
+    # (un "@everyone" tapé sans la permission ne notifie personne : mention_everyone reste False)
+    users = {m.id for m in message.mentions if m.id != message.author.id}
+    roles = {r.id for r in message.role_mentions}
+    return len(users) * COST_USER + len(roles) * COST_ROLE + (COST_EVERYONE if message.mention_everyone else 0)
+
+
+class MentionBudget:
+    # Seau percé : le niveau fuit à budget/window par seconde. Mémoire O(1) par user,
+    # un "raid" de 3 pings répartis sur 10 messages finit quand même par déborder.
+    def __init__(self):
+        self._users = OrderedDict()   # (gid, uid) -> [level, ts, strikes, last_strike], du moins récent au plus récent
+        self._guilds = {}  # gid -> [level, ts, flooding]
+
+    @staticmethod
+    def _leak(level, last, now, budget, window):
+        return max(0.0, level - (now - last) * budget / window)
+
+    def check(self, gid, uid, cost, conf, now):
+        # renvoie (palier de sanction 0..n, guild en flood, début de flood)
+        window = conf["window_sec"]
+
+        st = self._users.get((gid, uid))
+        if st is None:
+            if len(self._users) >= MAX_TRACKED:
+                self._prune(now, window)
+            st = self._users[(gid, uid)] = [0.0, now, 0, 0.0]
+        else:
+            self._users.move_to_end((gid, uid))
+        st[0] = self._leak(st[0], st[1], now, conf["budget"], window) + cost
+        st[1] = now
+        if st[2] and now - st[3] > STRIKE_DECAY:
+            st[2] = 0
+
+        strike = 0
+        if cost >= conf["max_mentions"] or st[0] > conf["budget"]:
+            st[0] = 0.0
+            st[2] += 1
+            st[3] = now
+            strike = st[2]
+
+        gs = self._guilds.get(gid)
+        if gs is None:
+            gs = self._guilds[gid] = [0.0, now, False]
+        gs[0] = self._leak(gs[0], gs[1], now, conf["guild_budget"], window) + cost
+        gs[1] = now
+        was = gs[2]
+        # hystérésis : flood tant que le seau n'est pas redescendu sous la moitié
+        gs[2] = gs[0] > conf["guild_budget"] or (was and gs[0] > conf["guild_budget"] / 2)
+        return strike, gs[2], gs[2] and not was
+
+    def _prune(self, now, window):
+        self._users = OrderedDict((k, st) for k, st in self._users.items()
+                                  if now - st[1] < window or (st[2] and now - st[3] < STRIKE_DECAY))
+        # encore trop de seaux actifs (raid de comptes) : les moins récents sont oubliés,
+        # avec de la marge pour ne pas repurger à chaque nouvel arrivant
+        while len(self._users) > MAX_TRACKED * 3 // 4:
+            self._users.popitem(last=False)
+
+
+def sanction_for(strike):
+    return ESCALATION[min(strike, len(ESCALATION)) - 1]
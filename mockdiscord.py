@@ -0,0 +1,289 @@
+# ============================================================
+#  BOT PROTECT - mockdiscord.py
+#  Faux serveur REST Discord (aiohttp) pour mesurer le coût en appels API :
+#  routes utilisées par le bot, en-têtes X-RateLimit-* et 429 réalistes
+#  + un faux web (liens courts, téléchargements) pour le client HTTP partagé
+# ============================================================
+
+import json
+import time
+import itertools
+import datetime
+from collections import Counter
+
+from aiohttp import web
+
+API_PREFIX = "/api/v10"
+
+# (limite, période en s) par route ; ordres de grandeur observés sur l'API réelle.
+# Le bucket est partagé par paramètre majeur (salon / guild), comme chez Discord.
+ROUTE_LIMITS = {
+    "PUT /channels/{channel_id}/permissions/{overwrite_id}": (5, 5.0),
+    "DELETE /channels/{channel_id}/permissions/{overwrite_id}": (5, 5.0),
+    "DELETE /channels/{channel_id}/messages/{message_id}": (5, 1.0),
+    "POST /channels/{channel_id}/messages/bulk-delete": (1, 1.0),
+    "POST /channels/{channel_id}/messages": (5, 5.0),
+    "PATCH /channels/{channel_id}": (2, 10.0),
+    "DELETE /channels/{channel_id}": (5, 5.0),
+    "PATCH /guilds/{guild_id}/members/{user_id}": (10, 10.0),
+    "PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}": (10, 10.0),
+    "DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}": (10, 10.0),
+    "PUT /guilds/{guild_id}/bans/{user_id}": (5, 5.0),
+    "POST /guilds/{guild_id}/bulk-ban": (1, 10.0),
+    "POST /guilds/{guild_id}/roles": (10, 10.0),
+    "PATCH /guilds/{guild_id}/roles": (5, 10.0),
+    "POST /guilds/{guild_id}/channels": (5, 10.0),
+    "PATCH /guilds/{guild_id}/channels": (5, 10.0),
+}
+DEFAULT_LIMIT = (20, 1.0)
+GLOBAL_LIMIT = (50, 1.0)
+MAJOR_PARAMS = ("channel_id", "guild_id", "webhook_id")
+
+_ids = itertools.count(1_300_000_000_000_000_000)
+
+
+def snowflake():
+    return next(_ids)
+
+
+def _iso(ts=None):
+    return datetime.datetime.fromtimestamp(ts or time.time(), datetime.timezone.utc).isoformat()
+
+
+# ============================================================
+#  [PAYLOADS] Objets au format de l'API
+# ============================================================
+def user_payload(uid, name=None, bot=False):
+    return {"id": str(uid), "username": name or f"user{uid % 100000}", "discriminator": "0",
+            "global_name": None, "avatar": None, "bot": bot, "public_flags": 0}
+
+
+def member_payload(uid, name=None, roles=(), bot=False):
+    return {"user": user_payload(uid, name, bot), "roles": [str(r) for r in roles], "joined_at": _iso(),
+            "deaf": False, "mute": False, "flags": 0, "nick": None, "communication_disabled_until": None}
+
+
+def role_payload(rid, name, position=0, permissions=0):
+    return {"id": str(rid), "name": name, "permissions": str(permissions), "position": position, "color": 0,
+            "hoist": False, "managed": False, "mentionable": False, "flags": 0}
+
+
+def channel_payload(cid, gid, name, position=0, kind=0, overwrites=()):
+    return {"id": str(cid), "type": kind, "guild_id": str(gid), "name": name, "position": position,
+            "permission_overwrites": list(overwrites), "nsfw": False, "parent_id": None,
+            "rate_limit_per_user": 0, "topic": None}
+
+
+def message_payload(mid, cid, gid, author, content, mentions=()):
+    return {"id": str(mid), "channel_id": str(cid), "guild_id": str(gid), "author": author["user"],
+            "member": {k: v for k, v in author.items() if k != "user"}, "content": content,
+            "timestamp": _iso(), "edited_timestamp": None, "tts": False, "mention_everyone": False,
+            "mentions": list(mentions), "mention_roles": [], "attachments": [], "embeds": [],
+            "pinned": False, "type": 0, "flags": 0}
+
+
+def guild_payload(gid, owner_id, channels, roles, members):
+    return {"id": str(gid), "name": f"mock-{gid}", "owner_id": str(owner_id), "roles": roles, "channels": channels,
+            "members": members, "member_count": len(members), "features": [], "emojis": [], "stickers": [],
+            "premium_tier": 0, "preferred_locale": "fr", "afk_timeout": 300, "mfa_level": 0,
+            "verification_level": 0, "explicit_content_filter": 0, "default_message_notifications": 0,
+            "nsfw_level": 0, "system_channel_flags": 0, "vanity_url_code": None, "description": None,
+            "banner": None, "icon": None, "splash": None, "discovery_splash": None, "unavailable": False}
+
+
+def _json(data, status=200, headers=None):
+    # discord.py exige un Content-Type exactement "application/json" (sans charset),
+    # et prend un 429 sans en-tête Via pour un ban Cloudflare (pas de retry)
+    h = {"Content-Type": "application/json", "Via": "1.1 google"}
+    h.update(headers or {})
+    return web.Response(body=json.dumps(data).encode("utf-8"), status=status, headers=h)
+
+
+# ============================================================
+#  [RATE LIMIT] Buckets à fenêtre fixe, comme l'API
+# ============================================================
+class _Bucket:
+    __slots__ = ("limit", "per", "remaining", "reset_at", "name")
+
+    def __init__(self, name, limit, per):
+        self.name = name
+        self.limit = limit
+        self.per = per
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def take(self, now):
+        # renvoie 0 si autorisé, sinon le retry_after
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.per
+        if self.remaining <= 0:
+            return self.reset_at - now
+        self.remaining -= 1
+        return 0.0
+
+    def headers(self, now):
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(0, self.remaining)),
+            "X-RateLimit-Reset": f"{time.time() + (self.reset_at - now):.3f}",
+            "X-RateLimit-Reset-After": f"{max(0.0, self.reset_at - now):.3f}",
+            "X-RateLimit-Bucket": self.name,
+        }
+
+
+# ============================================================
+#  [SERVEUR]
+# ============================================================
+class MockDiscord:
+    # calls : Counter par route (2xx + 429) ; limited : Counter des 429 ; log : [(t, route)]
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.calls = Counter()
+        self.limited = Counter()
+        self.log = []
+        self._buckets = {}
+        self._global = _Bucket("global", *GLOBAL_LIMIT)
+        self._runner = None
+        self.bot_user = user_payload(snowflake(), "ProtectBot", bot=True)
+        self.app = web.Application(middlewares=[self._ratelimit])
+        self._routes()
+
+    @property
+    def base(self):
+        return f"http://{self.host}:{self.port}{API_PREFIX}"
+
+    def reset(self):
+        self.calls.clear()
+        self.limited.clear()
+        self.log.clear()
+
+    def total(self):
+        return sum(self.calls.values())
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    # ---- Rate limit ----
+    @web.middleware
+    async def _ratelimit(self, request, handler):
+        info = request.match_info
+        path = info.route.resource.canonical if info.route.resource else "?"
+        route = f"{request.method} {path[len(API_PREFIX):] if path.startswith(API_PREFIX) else path}"
+        major = next((info[p] for p in MAJOR_PARAMS if p in info), "")
+        now = time.monotonic()
+        self.calls[route] += 1
+        self.log.append((now, route))
+        b = self._buckets.get((route, major))
+        if b is None:
+            limit, per = ROUTE_LIMITS.get(route, DEFAULT_LIMIT)
+            b = self._buckets[(route, major)] = _Bucket(f"{abs(hash(route)):x}", limit, per)
+        retry = self._global.take(now)
+        scope = "global"
+        if not retry:
+            retry = b.take(now)
+            scope = "user"
+        if retry:
+            self.limited[route] += 1
+            headers = b.headers(now) if scope == "user" else {"X-RateLimit-Global": "true"}
+            headers.update({"Retry-After": f"{retry:.3f}", "X-RateLimit-Scope": scope})
+            return _json({"message": "You are being rate limited.", "retry_after": round(retry, 3),
+                                      "global": scope == "global"}, status=429, headers=headers)
+        resp = await handler(request)
+        resp.headers.update(b.headers(now))
+        return resp
+
+    # ---- Routes ----
+    def _routes(self):
+        r = self.app.router
+        p = API_PREFIX
+        r.add_get(p + "/users/@me", lambda req: _json(self.bot_user))
+        r.add_put(p + "/channels/{channel_id}/permissions/{overwrite_id}", self._no_content)
+        r.add_delete(p + "/channels/{channel_id}/permissions/{overwrite_id}", self._no_content)
+        r.add_delete(p + "/channels/{channel_id}/messages/{message_id}", self._no_content)
+        r.add_post(p + "/channels/{channel_id}/messages/bulk-delete", self._no_content)
+        r.add_post(p + "/channels/{channel_id}/messages", self._send_message)
+        r.add_patch(p + "/channels/{channel_id}", self._edit_channel)
+        r.add_delete(p + "/channels/{channel_id}", self._delete_channel)
+        r.add_patch(p + "/guilds/{guild_id}/members/{user_id}", self._edit_member)
+        r.add_put(p + "/guilds/{guild_id}/members/{user_id}/roles/{role_id}", self._no_content)
+        r.add_delete(p + "/guilds/{guild_id}/members/{user_id}/roles/{role_id}", self._no_content)
+        r.add_put(p + "/guilds/{guild_id}/bans/{user_id}", self._no_content)
+        r.add_post(p + "/guilds/{guild_id}/bulk-ban", self._bulk_ban)
+        r.add_post(p + "/guilds/{guild_id}/roles", self._create_role)
+        r.add_patch(p + "/guilds/{guild_id}/roles", lambda req: _json([]))
+        r.add_post(p + "/guilds/{guild_id}/channels", self._create_channel)
+        r.add_patch(p + "/guilds/{guild_id}/channels", self._no_content)
+        # ---- Faux web (hors API) ----
+        r.add_get("/r/{hops}", self._redirect)
+        r.add_get("/blob/{size}", self._blob)
+        r.add_get("/land", self._no_content)
+
+    async def _no_content(self, request):
+        return web.Response(status=204)
+
+    async def _redirect(self, request):
+        # lien court : /r/N → /r/N-1 (même hôte) → … → http://localhost/land (autre hôte)
+        hops = int(request.match_info["hops"])
+        loc = f"/r/{hops - 1}" if hops > 1 else f"http://localhost:{self.port}/land"
+        return web.Response(status=302, headers={"Location": loc})
+
+    async def _blob(self, request):
+        return web.Response(body=b"\0" * int(request.match_info["size"]), content_type="application/octet-stream")
+
+    async def _body(self, request):
+        if request.content_type == "application/json":
+            return await request.json()
+        if request.content_type.startswith("multipart/"):
+            form = await request.post()
+            return json.loads(form.get("payload_json", "{}"))
+        return {}
+
+    async def _send_message(self, request):
+        body = await self._body(request)
+        cid = request.match_info["channel_id"]
+        data = {"id": str(snowflake()), "channel_id": cid, "author": self.bot_user,
+                "content": body.get("content") or "", "timestamp": _iso(), "edited_timestamp": None,
+                "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+                "attachments": [], "embeds": body.get("embeds") or [], "pinned": False, "type": 0, "flags": 0}
+        return _json(data)
+
+    async def _edit_channel(self, request):
+        body = await self._body(request)
+        cid = request.match_info["channel_id"]
+        return _json(channel_payload(cid, body.get("guild_id", 0), body.get("name", "edited"),
+                                                  body.get("position", 0)))
+
+    async def _delete_channel(self, request):
+        return _json(channel_payload(request.match_info["channel_id"], 0, "deleted"))
+
+    async def _edit_member(self, request):
+        body = await self._body(request)
+        m = member_payload(int(request.match_info["user_id"]), roles=body.get("roles") or ())
+        m["communication_disabled_until"] = body.get("communication_disabled_until")
+        return _json(m)
+
+    async def _bulk_ban(self, request):
+        body = await self._body(request)
+        return _json({"banned_users": body.get("user_ids", []), "failed_users": []})
+
+    async def _create_role(self, request):
+        body = await self._body(request)
+        return _json(role_payload(snowflake(), body.get("name", "role"), 1,
+                                              int(body.get("permissions", 0))))
+
+    async def _create_channel(self, request):
+        body = await self._body(request)
+        return _json(channel_payload(snowflake(), request.match_info["guild_id"],
+                                                 body.get("name", "channel"), body.get("position", 0),
+                                                 body.get("type", 0), body.get("permission_overwrites") or ()))
@@ -0,0 +1,293 @@
+# ============================================================
+#  BOT PROTECT - recording.py
+#  Enregistrement anonymisé des événements gateway (JSONL gzip)
+#  + rejeu accéléré en mode "shadow" (les protections évaluent sans agir)
+# ============================================================
+
+import os
+import re
+import gzip
+import json
+import time
+import asyncio
+import hashlib
+import datetime
+from collections import Counter
+
+URL_DOMAIN = re.compile(r"https?://([^/\s]+)", re.IGNORECASE)
+CUSTOM_EMOJI = re.compile(r"<a?:\w+:\d+>")
+
+
+# ============================================================
+#  [RECORD] Événements → métadonnées anonymisées
+# ============================================================
+class EventRecorder:
+    # Aucun contenu de message n'est stocké : seulement des compteurs et les
+    # domaines des liens. Les ids users/salons sont hachés avec un sel aléatoire
+    # jamais écrit sur disque (non réversible, stable pendant l'enregistrement).
+    # L'id de guild reste en clair : le rejeu évalue chaque guild avec SA config
+    # (config.db, indexée par cet id) ; c'est un serveur, pas une personne.
+    def __init__(self, path: str):
+        self.path = path
+        self._salt = os.urandom(16)
+        self._buf = []
+        self.count_emojis = None   # callable(text) -> int, fourni par le bot
+
+    def _anon(self, i):
+        if i is None:
+            return None
+        return int.from_bytes(hashlib.blake2b(str(i).encode(), key=self._salt, digest_size=6).digest(), "big")
+
+    def _push(self, rec):
+        # écriture différée : flush() est appelé périodiquement hors event loop
+        self._buf.append(rec)
+
+    def message(self, message):
+        content = message.content or ""
+        self._push({
+            "t": round(time.time(), 3), "k": "msg",
+            "g": message.guild.id, "c": self._anon(message.channel.id), "u": self._anon(message.author.id),
+            "len": len(content),
+            "at": content.count("@"),
+            "mu": len(message.mentions),
+            "mr": len(message.role_mentions),
+            "me": bool(message.mention_everyone),
+            "em": self.count_emojis(content) if self.count_emojis else len(CUSTOM_EMOJI.findall(content)),
+            "urls": [d.lower() for d in URL_DOMAIN.findall(content)][:10],
+            "att": len(message.attachments),
+        })
+
+    def join(self, member):
+        self._push({
+            "t": round(time.time(), 3), "k": "join",
+            "g": member.guild.id, "u": self._anon(member.id),
+            "age": int(time.time() - member.created_at.timestamp()),
+            "av": member.avatar is not None,
+        })
+
+    def webhook(self, channel):
+        self._push({"t": round(time.time(), 3), "k": "webhook", "g": channel.guild.id, "c": self._anon(channel.id)})
+
+    def flush(self):
+        if not self._buf:
+            return
+        buf, self._buf = self._buf, []
+        # un membre gzip par flush : l'append reste lisible d'un seul bloc
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            for rec in buf:
+                f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+
+
+def read_events(path: str):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# ============================================================
+#  [REPLAY] Objets factices : toute action directe est comptée, jamais exécutée
+# ============================================================
+class _Sink:
+    def __init__(self, report: Counter):
+        self.report = report
+
+    def _hit(self, name):
+        self.report[f"direct:{name}"] += 1
+
+
+class FakeRole:
+    def __init__(self, rid):
+        self.id = rid
+        self.name = "@everyone"
+        self.managed = False
+
+    def is_default(self):
+        return True
+
+
+class FakePermissions:
+    value = 0
+
+
+class FakeGuild(_Sink):
+    def __init__(self, gid, report):
+        super().__init__(report)
+        self.id = gid
+        self.name = f"guild-{gid}"
+        self.default_role = FakeRole(gid)
+        self.roles = [self.default_role]
+        self.text_channels = []
+        self.channels = []
+        self.members = []
+        self.member_count = 0
+        self.owner_id = 0
+
+    def get_role(self, rid):
+        return None
+
+    def get_channel(self, cid):
+        return None
+
+    def get_member(self, uid):
+        return None
+
+    async def fetch_channel(self, cid):
+        raise LookupError(cid)
+
+    async def ban(self, *a, **kw):
+        self._hit("ban")
+
+
+class FakeChannel(_Sink):
+    def __init__(self, cid, guild, report):
+        super().__init__(report)
+        self.id = cid
+        self.guild = guild
+        self.name = f"ch-{cid}"
+        self.mention = f"<#{cid}>"
+        self.slowmode_delay = 0
+
+    async def send(self, *a, **kw):
+        self._hit("send")
+
+    async def edit(self, *a, **kw):
+        self._hit("channel_edit")
+
+    async def delete_messages(self, *a, **kw):
+        self._hit("bulk_delete")
+
+
+class FakeMember(_Sink):
+    def __init__(self, uid, guild, report, created_at=None, avatar=None):
+        super().__init__(report)
+        self.id = uid
+        self.guild = guild
+        self.bot = False
+        self.name = f"user-{uid}"
+        self.global_name = None
+        self.display_name = self.name
+        self.nick = None
+        self.guild_permissions = FakePermissions()
+        self.mention = f"<@{uid}>"
+        self.roles = [guild.default_role]
+        self.created_at = created_at
+        self.avatar = avatar
+
+    def __str__(self):
+        return self.name
+
+    async def edit(self, *a, **kw):
+        self._hit("member_edit")
+
+    async def ban(self, *a, **kw):
+        self._hit("ban")
+
+    async def kick(self, *a, **kw):
+        self._hit("kick")
+
+    async def add_roles(self, *a, **kw):
+        self._hit("add_roles")
+
+    async def remove_roles(self, *a, **kw):
+        self._hit("remove_roles")
+
+
+class FakeMessage(_Sink):
+    def __init__(self, mid, guild, channel, author, content, mentions, role_mentions, everyone, report):
+        super().__init__(report)
+        self.id = mid
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.mentions = mentions
+        self.role_mentions = role_mentions
+        self.mention_everyone = everyone
+        self.attachments = []
+        self.embeds = []
+
+    async def delete(self, *a, **kw):
+        self._hit("delete")
+
+
+def synth_content(ev):
+    # reconstitue un contenu ayant les mêmes caractéristiques que l'original
+    parts = [f"https://{d}/x" for d in ev.get("urls", [])]
+    parts += [f"<@{i}>" for i in range(ev.get("mu", 0))]
+    parts += [f"<@&{i}>" for i in range(ev.get("mr", 0))]
+    if ev.get("me"):
+        parts.append("@everyone")
+    used_at = ev.get("mu", 0) + ev.get("mr", 0) + (1 if ev.get("me") else 0)
+    parts += ["@"] * max(0, ev.get("at", 0) - used_at)
+    parts += ["<:e:1>"] * ev.get("em", 0)
+    text = " ".join(parts)
+    pad = ev.get("len", 0) - len(text)
+    if pad > 0:
+        text += " " + "x" * (pad - 1)
+    return text
+
+
+async def replay_events(events, on_message=None, on_member_join=None, on_webhooks_update=None,
+                        set_time=None, prepare_guild=None, speed: float = 0.0):
+    # speed=0 : aussi vite que possible ; sinon facteur d'accélération (ex: 50x)
+    # set_time(ts) : horloge virtuelle du bot ; prepare_guild(gid) : 1er passage d'une guild
+    report = Counter()
+    guilds, channels, members = {}, {}, {}
+    n, first_t, t0 = 0, None, time.perf_counter()
+
+    def guild(gid):
+        g = guilds.get(gid)
+        if g is None:
+            g = guilds[gid] = FakeGuild(gid, report)
+            if prepare_guild:
+                prepare_guild(gid)
+        return g
+
+    def member(g, uid, ev=None):
+        m = members.get((g.id, uid))
+        if m is None:
+            created = None
+            if ev and "age" in ev:
+                created = datetime.datetime.fromtimestamp(ev["t"] - ev["age"], datetime.timezone.utc)
+            m = members[(g.id, uid)] = FakeMember(uid, g, report, created_at=created,
+                                                   avatar=True if ev and ev.get("av") else None)
+        return m
+
+    def channel(g, cid):
+        c = channels.get(cid)
+        if c is None:
+            c = channels[cid] = FakeChannel(cid, g, report)
+        return c
+
+    for ev in events:
+        if first_t is None:
+            first_t = ev["t"]
+        if speed:
+            delay = (ev["t"] - first_t) / speed - (time.perf_counter() - t0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if set_time:
+            set_time(ev["t"])
+        g = guild(ev["g"])
+        k = ev["k"]
+        if k == "msg" and on_message:
+            ch = channel(g, ev["c"])
+            author = member(g, ev["u"])
+            mentions = [member(g, -i - 1) for i in range(ev.get("mu", 0))]
+            msg = FakeMessage(n, g, ch, author, synth_content(ev), mentions,
+                              [FakeRole(-i - 1) for i in range(ev.get("mr", 0))],
+                              ev.get("me", False), report)
+            await on_message(msg)
+        elif k == "join" and on_member_join:
+            await on_member_join(member(g, ev["u"], ev))
+        elif k == "webhook" and on_webhooks_update:
+            await on_webhooks_update(channel(g, ev["c"]))
+        report[f"event:{k}"] += 1
+        n += 1
+        if n % 500 == 0:
+            await asyncio.sleep(0)
+
+    elapsed = time.perf_counter() - t0
+    return {"events": n, "elapsed": elapsed, "rate": n / elapsed if elapsed else 0.0,
+            "span": (ev["t"] - first_t) if n else 0.0, "counts": report}
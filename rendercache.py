@@ -0,0 +1,79 @@
+# ============================================================
+#  BOT PROTECT - rendercache.py
+#  Rendus précalculés (help, serverinfo, roleinfo) invalidés par version
+#  + totaux bot-wide (guilds / membres) tenus à jour au fil des events
+# ============================================================
+
+from collections import OrderedDict
+
+CACHE_SIZE = 2048
+
+
+class RenderCache:
+    # (guild, portée, clé) -> (version, valeur). Une version par (guild, portée),
+    # incrémentée par les events qui changent ce qui est rendu : l'entrée périmée est
+    # reconstruite au prochain get, jamais recalculée tant que rien n'a bougé.
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._versions = {}            # (gid, portée) -> int
+        self._cache = OrderedDict()    # (gid, portée, clé) -> (version, valeur)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def version(self, gid, scope: str):
+        return self._versions.get((gid, scope), 0)
+
+    def bump(self, gid, scope: str):
+        self._versions[(gid, scope)] = self.version(gid, scope) + 1
+
+    def get(self, gid, scope: str, key, build):
+        k = (gid, scope, key)
+        version = self.version(gid, scope)
+        hit = self._cache.get(k)
+        if hit is not None and hit[0] == version:
+            self._cache.move_to_end(k)
+            self.hits += 1
+            return hit[1]
+        self.misses += 1
+        value = build()
+        self._cache[k] = (version, value)
+        self._cache.move_to_end(k)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return value
+
+    def forget(self, gid):
+        # guild quittée : ses versions repartent de 0, ses rendus ne doivent pas survivre
+        for k in [k for k in self._cache if k[0] == gid]:
+            del self._cache[k]
+        for k in [k for k in self._versions if k[0] == gid]:
+            del self._versions[k]
+
+    def clear(self):
+        # code de rendu rechargé : tout est reconstruit
+        self._cache.clear()
+
+
+class BotTotals:
+    # guilds / membres bot-wide : +1 / -1 par event, recalcul complet seulement au READY
+    def __init__(self):
+        self.guilds = 0
+        self.members = 0
+
+    def reset(self, guilds):
+        self.guilds = len(guilds)
+        self.members = sum(g.member_count or 0 for g in guilds)
+
+    def add_guild(self, guild):
+        self.guilds += 1
+        self.members += guild.member_count or 0
+
+    def remove_guild(self, guild):
+        self.guilds -= 1
+        self.members -= guild.member_count or 0
+
+    def member(self, delta: int):
+        self.members += delta
@@ -0,0 +1,356 @@
+# ============================================================
+#  BOT PROTECT - runtime.py
+#  État du bot qui survit au rechargement des extensions (cogs/) :
+#  bot, config, dispatcher, compteurs anti-spam/raid, caches, scheduler…
+#  Importé une seule fois ; les extensions y prennent leurs objets partagés.
+# ============================================================
+
+import os
+import asyncio
+import tempfile
+import datetime
+import itertools
+from collections import deque, defaultdict
+from dispatcher import ActionDispatcher
+from accounting import ResourceUsage, metered, REST, ACTIONS
+from slowmode import SlowmodeController
+from antinuke import AntiNuke, AuditLogResolver
+from configstore import GuildConfigStore, DB_PATH, LEGACY_PATH, copy_db
+from httpclient import HttpClient
+from attachments import AttachmentScanner, BadHashFile
+from links import DomainBlocklist, InviteResolver, Unshortener
+from mentions import MentionBudget
+from journal import ModJournal
+from impersonation import ImpersonationGuard
+from scheduler import ExpiryScheduler
+from recording import EventRecorder
+from snapshot import SnapshotStore
+from rendercache import RenderCache, BotTotals
+
+import discord
+from discord.ext import commands
+from dotenv import load_dotenv
+
+load_dotenv()
+# PROTECT_RECORD=fichier.jsonl.gz : enregistre les événements (anonymisés)
+RECORD_PATH = os.getenv("PROTECT_RECORD")
+
+# Extensions rechargeables à chaud (commande reload) : aucune n'a d'état propre
+EXTENSIONS = ("cogs.protection", "cogs.moderation", "cogs.utility")
+
+OWNER_SUPREME_ID = 1349614622386163752  # <-- Remplace par ton ID Discord
+OWNER_ROLE_NAME = "Owner"
+
+# ============================================================
+#  [CORE] Intents / Bot / Prefix dynamique par serveur
+# ============================================================
+_config_lock = asyncio.Lock()
+
+# Config servie guild par guild (LRU + SQLite), migrée depuis config.json au 1er lancement.
+# Rejeu (PROTECT_REPLAY, voir start.py) : copie jetable de la base, la vraie n'est jamais ouverte en écriture
+_db_path = DB_PATH
+if os.getenv("PROTECT_REPLAY"):
+    _db_path = copy_db(DB_PATH, os.path.join(tempfile.mkdtemp(prefix="protect-replay-"), "config.db"))
+config = GuildConfigStore(_db_path, capacity=512)
+_migrated = config.import_legacy(LEGACY_PATH)
+if _migrated:
+    print(f"[config] {_migrated} guilds migrées depuis {LEGACY_PATH}")
+
+def ensure_guild_conf(gid: int):
+    # charge (ou crée avec les défauts) le record de la guild
+    return config[str(gid)]
+
+async def get_prefix(bot, message):
+    if not message.guild:
+        return "+"
+    gid = str(message.guild.id)
+    ensure_guild_conf(message.guild.id)
+    return config[gid].get("prefix", "+")
+
+class ProtectBot(commands.Bot):
+    async def setup_hook(self):
+        for name in EXTENSIONS:
+            await self.load_extension(name)
+
+    async def close(self):
+        # arrêt normal : le pool HTTP partagé (liens courts, feeds, pièces jointes) est fermé aussi
+        await http.close()
+        await super().close()
+
+intents = discord.Intents.all()
+bot = ProtectBot(command_prefix=get_prefix, intents=intents, help_command=None)
+
+# ============================================================
+#  [STATE] Mémoire runtime (anti-spam / anti-raid / cache)
+# ============================================================
+# Anti-spam: messages récents par (guild, user)
+recent_msgs = defaultdict(lambda: defaultdict(lambda: deque(maxlen=50)))
+# Anti-raid: (timestamp, id membre) de join par guild
+recent_joins = defaultdict(lambda: deque(maxlen=200))
+# Anti-mention: budgets glissants par user / guild
+mention_budget = MentionBudget()
+# Cooldown antiraid (évite lock répétés)
+antiraid_cooldown_until = defaultdict(lambda: datetime.datetime.utcfromtimestamp(0))
+# Raid en mode quarantaine : fin de la fenêtre (arrivants mis en quarantaine jusque-là)
+quarantine_until = defaultdict(lambda: datetime.datetime.utcfromtimestamp(0))
+# File d'actions de modération (raid > sanctions > deletes > logs)
+actions = ActionDispatcher()
+# Slowmode adaptatif (débit par salon)
+slowmode_ctl = SlowmodeController(tick_sec=10)
+# Snapshots de structure (rôles / salons / overwrites) par guild
+snapshots = SnapshotStore()
+# Enregistreur d'événements (optionnel)
+recorder = EventRecorder(RECORD_PATH) if RECORD_PATH else None
+# Coût par guild (CPU des handlers, événements, REST, actions), décroissant
+usage = ResourceUsage(half_life=3600)
+# Journal de modération local (append seul, indexé) : protections + commandes
+journal = ModJournal()
+# Warn system (simple en mémoire + logs) : guild -> user -> [ {id, reason, by, date} ]
+warnings_db = defaultdict(lambda: defaultdict(list))
+warn_ids = itertools.count(1)
+# Rendus précalculés (help / serverinfo / roleinfo) + totaux bot-wide incrémentaux (botinfo)
+renders = RenderCache()
+totals = BotTotals()
+# Anti-usurpation : squelettes des noms du staff (perms de modération ou rôle Owner), par guild
+STAFF_PERMS = discord.Permissions(administrator=True, manage_guild=True, manage_roles=True, ban_members=True,
+                                  kick_members=True, moderate_members=True, manage_messages=True)
+
+def is_staff(member):
+    if member.guild_permissions.value & STAFF_PERMS.value or member.id == member.guild.owner_id:
+        return True
+    return any(r.name == OWNER_ROLE_NAME for r in member.roles)
+
+impersonation = ImpersonationGuard(is_staff)
+
+def _on_action(gid, kind, target, reason):
+    usage.add(gid, ACTIONS)
+
+def _on_done(gid, kind, target, reason):
+    # journalisé une fois exécuté : une sanction dédupliquée ou refusée n'apparaît pas dans le modlog
+    journal.record(gid, kind, target, None, reason)
+
+actions.on_action = _on_action
+actions.on_done = _on_done
+# Horloge virtuelle (rejeu) ; None = horloge réelle
+clock = None
+# Uptime
+started_at = datetime.datetime.utcnow()
+
+def _guild_of(obj):
+    # 1er argument d'un event → id de guild (message, membre, salon, rôle, entrée d'audit, guild)
+    if isinstance(obj, discord.Guild):
+        return obj.id
+    g = getattr(obj, "guild", None)
+    return g.id if g is not None else None
+
+track = metered(usage, _guild_of)
+
+# Chaque appel REST est attribué à la guild de sa route (ou du salon visé)
+_http_request = bot.http.request
+
+async def _counted_request(route, **kwargs):
+    gid = route.guild_id
+    if gid is None and route.channel_id is not None:
+        gid = _guild_of(bot.get_channel(int(route.channel_id)))
+    usage.add(int(gid) if gid is not None else None, REST)
+    return await _http_request(route, **kwargs)
+
+bot.http.request = _counted_request
+
+# ---- Points d'accroche des extensions (remplis par leur setup, vidés au teardown) ----
+# Filtres de messages : coroutine(message) -> True si le message est traité (pas de commande)
+message_filters = []
+# Fin des sanctions temporaires : kind -> coroutine(guild, expiry) -> True si quelque chose a été levé
+expiry_handlers = {}
+
+# ============================================================
+#  [UTILS] Logs / Embeds / Save config / Checks
+# ============================================================
+async def save_config(gid):
+    async with _config_lock:
+        config.save(gid)
+
+def now_utc():
+    return clock() if clock else datetime.datetime.utcnow()
+
+def human_tdelta(td: datetime.timedelta):
+    secs = int(td.total_seconds())
+    m, s = divmod(secs, 60)
+    h, m = divmod(m, 60)
+    d, h = divmod(h, 24)
+    parts = []
+    if d: parts.append(f"{d}j")
+    if h: parts.append(f"{h}h")
+    if m: parts.append(f"{m}m")
+    if s or not parts: parts.append(f"{s}s")
+    return " ".join(parts)
+
+def is_whitelisted(gid, uid):
+    return uid in config.compiled(gid).whitelist
+
+def is_blacklisted(gid, uid):
+    return uid in config.compiled(gid).blacklist
+
+async def send_log(guild: discord.Guild, embed: discord.Embed):
+    # non bloquant : les logs sont batchés (10 embeds/message) par le dispatcher
+    ensure_guild_conf(guild.id)
+    if not config[str(guild.id)].get("log_channel"): return
+    actions.log(guild, embed, _deliver_logs)
+
+async def _deliver_logs(guild: discord.Guild, embeds):
+    ch_id = config[str(guild.id)].get("log_channel")
+    if not ch_id: return
+    ch = guild.get_channel(ch_id)
+    if not ch:
+        # essayer fetch
+        try:
+            ch = await guild.fetch_channel(ch_id)
+        except:
+            return
+    await ch.send(embeds=embeds)
+
+def parse_duration(text: str):
+    # "30s" / "10m" / "2h" / "7d" → secondes (sans unité : minutes)
+    mult = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    text = text.strip().lower()
+    if text.isdigit():
+        return int(text) * 60
+    if len(text) < 2 or text[-1] not in mult or not text[:-1].isdigit():
+        raise ValueError(f"durée invalide: {text}")
+    return int(text[:-1]) * mult[text[-1]]
+
+def base_embed(title=None, desc=None, color=discord.Color.blurple()):
+    e = discord.Embed(color=color, timestamp=datetime.datetime.utcnow())
+    if title: e.title = title
+    if desc: e.description = desc
+    return e
+
+# Vérifie si un membre est Owner
+def is_owner(member: discord.Member):
+    role = discord.utils.get(member.roles, name=OWNER_ROLE_NAME)
+    return role is not None or member.id == OWNER_SUPREME_ID
+
+# Décorateur pour protéger une commande avec le rôle Owner
+def owner_only():
+    async def predicate(ctx):
+        if not is_owner(ctx.author):
+            raise commands.MissingPermissions(["administrator"])
+        return True
+    return commands.check(predicate)
+
+# ============================================================
+#  [STATE] Sanctions temporaires (persistées, rejouées au redémarrage)
+# ============================================================
+async def _on_expiry(e):
+    guild = bot.get_guild(e.guild)
+    if guild is None:
+        return   # bot retiré de la guild : rien à lever
+    handler = expiry_handlers.get(e.kind)
+    if handler is None:
+        # extension en cours de rechargement : échec transitoire, réessayé plus tard
+        raise LookupError(f"aucun handler pour {e.kind}")
+    if await handler(guild, e):
+        journal.record(e.guild, e.kind, e.target or None, None, "échéance")
+
+sanctions = ExpiryScheduler(_on_expiry)
+
+# ============================================================
+#  [STATE] Liens / médias / invitations (caches bot-wide)
+# ============================================================
+# Domaines de phishing connus (bot-wide, rechargeable à chaud)
+BLOCKLIST_PATH = os.getenv("PROTECT_BLOCKLIST", "phishing_domains.txt")
+blocklist = DomainBlocklist(BLOCKLIST_PATH)
+
+# Client HTTP unique (pool de connexions) + suivi des liens courts (bit.ly, t.co…)
+http = HttpClient()
+unshortener = Unshortener(http.redirect_target)
+
+# Médias connus (raids d'images) : hash bot-wide rechargeables + liste par guild
+BADHASH_PATH = os.getenv("PROTECT_BADHASHES", "bad_hashes.txt")
+bad_hashes = BadHashFile(BADHASH_PATH)
+scanner = AttachmentScanner(http)
+scan_tasks = set()
+
+async def _fetch_invite_guild(code: str):
+    try:
+        inv = await bot.fetch_invite(code, with_counts=False, with_expiration=False)
+    except discord.NotFound:
+        return None
+    return inv.guild.id if inv.guild else None
+
+# Invitations Discord → guild cible (1 appel max par code unique, cache TTL)
+invites = InviteResolver(_fetch_invite_guild)
+
+# ============================================================
+#  [STATE] Anti-nuke : fenêtres par acteur + corrélation audit log
+# ============================================================
+def antinuke_conf(gid: int):
+    ensure_guild_conf(gid)
+    return config[str(gid)]["protect"]["antinuke"]
+
+def _antinuke_exempt(guild: discord.Guild, uid: int):
+    return uid == OWNER_SUPREME_ID or uid == bot.user.id or is_whitelisted(guild.id, uid)
+
+def _no_punish(guild, uid, kind, count):
+    print(f"[antinuke] {guild.id}: {kind} x{count} par {uid} sans extension de protection chargée")
+
+# la sanction (retrait des rôles…) est fournie par cogs.protection
+antinuke = AntiNuke(antinuke_conf, _antinuke_exempt, _no_punish)
+audit_resolver = AuditLogResolver(antinuke.on_entry)
+
+# ============================================================
+#  [CORE] Extensions : commandes / listeners / boucles d'un module rechargeable
+# ============================================================
+class Extension:
+    # Remplace @bot.command / @bot.event dans un module de cogs/ : tout est ajouté au
+    # setup et retiré au déchargement (discord.py retire commandes et listeners du module,
+    # les boucles sont arrêtées ici). Aucun état ici : il vit dans runtime.
+    def __init__(self):
+        self.commands = []
+        self.listeners = []
+        self.loops = []
+
+    def command(self, *args, **kwargs):
+        def deco(func):
+            cmd = commands.command(*args, **kwargs)(func)
+            self.commands.append(cmd)
+            return cmd
+        return deco
+
+    def alias(self, cmd, name):
+        # commande supplémentaire sur le même callback (ex: purge → clear)
+        alias = commands.Command(cmd.callback, name=name)
+        self.commands.append(alias)
+        return alias
+
+    def event(self, func):
+        self.listeners.append(func)
+        return func
+
+    def loop(self, loop):
+        # démarrée quand le bot est prêt (ou tout de suite en cas de rechargement)
+        self.loops.append(loop)
+        return loop
+
+    def _start_loops(self):
+        for loop in self.loops:
+            if not loop.is_running():
+                loop.start()
+
+    async def setup(self, bot):
+        for cmd in self.commands:
+            bot.add_command(cmd)
+        for func in self.listeners:
+            bot.add_listener(func)
+        if self.loops:
+            bot.add_listener(self._on_ready, "on_ready")
+            if bot.is_ready():
+                self._start_loops()
+
+    async def teardown(self, bot):
+        for loop in self.loops:
+            loop.cancel()
+        bot.remove_listener(self._on_ready, "on_ready")
+
+    async def _on_ready(self):
+        self._start_loops()
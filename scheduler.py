@@ -0,0 +1,150 @@
+# ============================================================
+#  BOT PROTECT - scheduler.py
+#  Échéances des sanctions temporaires (mute rôle, ban temporaire, lock minuté) :
+#  tas binaire en mémoire + SQLite sur disque, UNE tâche qui dort jusqu'à la prochaine
+# ============================================================
+
+import json
+import time
+import heapq
+import asyncio
+import sqlite3
+
+DB_PATH = "sanctions.db"
+# Les échéances à moins de BATCH_WINDOW s de la première partent dans le même lot
+BATCH_WINDOW = 1.0
+# Échec transitoire : nouvel essai après RETRY_DELAY s, abandon après MAX_ATTEMPTS
+RETRY_DELAY = 60
+MAX_ATTEMPTS = 5
+
+
+class Expiry:
+    __slots__ = ("id", "due", "guild", "kind", "target", "data")
+
+    def __init__(self, id, due, guild, kind, target, data):
+        self.id = id
+        self.due = due
+        self.guild = guild
+        self.kind = kind
+        self.target = target
+        self.data = data
+
+    def __repr__(self):
+        return f"<Expiry {self.kind} g={self.guild} t={self.target} due={self.due:.0f}>"
+
+
+class ExpiryScheduler:
+    # Une seule échéance par (guild, kind, cible) : reprogrammer remplace l'ancienne.
+    # on_expire(expiry) : coroutine ; une exception = échec transitoire (réessayé).
+    # Au démarrage, tout ce qui est échu pendant l'arrêt part au premier réveil.
+    def __init__(self, on_expire, path: str = DB_PATH):
+        self.on_expire = on_expire
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS expiries (id INTEGER PRIMARY KEY, due REAL NOT NULL, "
+                        "guild INTEGER NOT NULL, kind TEXT NOT NULL, target INTEGER NOT NULL, data TEXT NOT NULL, "
+                        "UNIQUE (guild, kind, target))")
+        self._heap = []     # (due, id) ; entrées annulées/remplacées ignorées au pop
+        self._live = {}     # id -> Expiry
+        self._keys = {}     # (guild, kind, target) -> id
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.fired = 0
+        for row in self.db.execute("SELECT id, due, guild, kind, target, data FROM expiries"):
+            self._add(Expiry(row[0], row[1], row[2], row[3], row[4], json.loads(row[5])))
+
+    def __len__(self):
+        return len(self._live)
+
+    def _add(self, e):
+        self._live[e.id] = e
+        self._keys[(e.guild, e.kind, e.target)] = e.id
+        heapq.heappush(self._heap, (e.due, e.id))
+
+    def _drop(self, e):
+        self._live.pop(e.id, None)
+        if self._keys.get((e.guild, e.kind, e.target)) == e.id:
+            del self._keys[(e.guild, e.kind, e.target)]
+        self.db.execute("DELETE FROM expiries WHERE id = ?", (e.id,))
+
+    # ---- API ----
+    def schedule(self, guild: int, kind: str, target: int, due: float, **data):
+        old = self._keys.get((guild, kind, target))
+        if old is not None:
+            self._live.pop(old, None)
+        cur = self.db.execute("INSERT OR REPLACE INTO expiries (due, guild, kind, target, data) VALUES (?, ?, ?, ?, ?)",
+                              (due, guild, kind, target, json.dumps(data)))
+        e = Expiry(cur.lastrowid, due, guild, kind, target, data)
+        self._add(e)
+        if self._heap[0][1] == e.id:
+            self._wakeup.set()   # nouvelle échéance la plus proche
+        return e
+
+    def cancel(self, guild: int, kind: str, target: int):
+        eid = self._keys.get((guild, kind, target))
+        e = self._live.get(eid) if eid is not None else None
+        if e is None:
+            return False
+        self._drop(e)
+        return True
+
+    def pending(self, guild: int = None):
+        return sorted((e for e in self._live.values() if guild is None or e.guild == guild), key=lambda e: e.due)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    # ---- Boucle ----
+    def _pop_due(self, now):
+        batch = []
+        limit = None
+        while self._heap:
+            due, eid = self._heap[0]
+            e = self._live.get(eid)
+            if e is None or e.due != due:
+                heapq.heappop(self._heap)   # annulée / remplacée
+                continue
+            if limit is None:
+                if due > now:
+                    break
+                limit = due + BATCH_WINDOW
+            if due > max(now, limit):
+                break
+            heapq.heappop(self._heap)
+            batch.append(e)
+        return batch
+
+    async def _fire(self, e):
+        try:
+            await self.on_expire(e)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            attempts = e.data.get("attempts", 0) + 1
+            if attempts < MAX_ATTEMPTS:
+                data = dict(e.data, attempts=attempts)
+                self.schedule(e.guild, e.kind, e.target, time.time() + RETRY_DELAY, **data)
+                return
+            print(f"[scheduler] {e!r} abandonnée: {ex}")
+        if self._live.get(e.id) is e:
+            self._drop(e)
+        self.fired += 1
+
+    async def _run(self):
+        while True:
+            batch = self._pop_due(time.time())
+            if batch:
+                await asyncio.gather(*(self._fire(e) for e in batch))
+                continue
+            self._wakeup.clear()
+            delay = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
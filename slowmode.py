@@ -0,0 +1,99 @@
+# ============================================================
+#  BOT PROTECT - slowmode.py
+#  Slowmode adaptatif par salon (débit + auteurs distincts, hystérésis)
+# ============================================================
+
+# Paliers possibles de slowmode_delay (secondes)
+LADDER = [0, 2, 5, 10, 15, 30, 60, 120]
+# Nombre de ticks calmes consécutifs avant de redescendre d'un palier
+CALM_TICKS = 3
+# Seuil bas = target * CALM_RATIO (hystérésis)
+CALM_RATIO = 0.5
+# Au-delà, on ne compte plus les auteurs (mémoire bornée)
+MAX_AUTHORS = 64
+# Délai mini entre deux edits d'un même salon (rate-limit channel edit)
+MIN_EDIT_INTERVAL = 30
+
+
+class _ChannelState:
+    __slots__ = ("count", "authors", "rate", "calm", "base", "delay", "last_edit")
+
+    def __init__(self, delay):
+        self.count = 0
+        self.authors = set()
+        self.rate = 0.0          # msgs/min lissé (EWMA)
+        self.calm = 0
+        self.base = delay        # slowmode avant prise en main
+        self.delay = delay       # slowmode appliqué par le contrôleur
+        self.last_edit = float("-inf")
+
+
+class SlowmodeController:
+    def __init__(self, tick_sec: int = 10):
+        self.tick_sec = tick_sec
+        self._chans = {}          # channel_id -> _ChannelState
+        self._managed = set()     # salons dont le slowmode a été levé par nous
+
+    def observe(self, channel, author_id):
+        st = self._chans.get(channel.id)
+        if st is None:
+            st = self._chans[channel.id] = _ChannelState(getattr(channel, "slowmode_delay", 0) or 0)
+        st.count += 1
+        if len(st.authors) < MAX_AUTHORS:
+            st.authors.add(author_id)
+
+    def forget(self, channel_id):
+        # réglage manuel par un modérateur → on lâche le salon
+        self._chans.pop(channel_id, None)
+        self._managed.discard(channel_id)
+
+    def tick(self, now, conf_for):
+        # conf_for(channel_id) -> dict autoslowmode (ou None si salon inconnu)
+        # renvoie [(channel_id, new_delay)] à appliquer
+        changes = []
+        for cid, st in list(self._chans.items()):
+            conf = conf_for(cid)
+            if not conf or not conf.get("enabled"):
+                self.forget(cid)
+                continue
+            cur = st.count * 60.0 / self.tick_sec
+            st.rate = cur if st.rate == 0 else 0.5 * st.rate + 0.5 * cur
+            busy = st.rate > conf["target_per_min"] and len(st.authors) >= conf["min_authors"]
+            st.count = 0
+            st.authors.clear()
+
+            new = st.delay
+            if busy:
+                st.calm = 0
+                new = _step(st.delay, +1, conf["max_delay"])
+            elif cid in self._managed and st.rate < conf["target_per_min"] * CALM_RATIO:
+                st.calm += 1
+                if st.calm >= CALM_TICKS:
+                    st.calm = 0
+                    new = max(st.base, _step(st.delay, -1, conf["max_delay"]))
+            else:
+                st.calm = 0
+
+            if new != st.delay and now - st.last_edit >= MIN_EDIT_INTERVAL:
+                st.delay = new
+                st.last_edit = now
+                changes.append((cid, new))
+                if new > st.base:
+                    self._managed.add(cid)
+                else:
+                    self._managed.discard(cid)
+
+            # salon inactif et rendu à son état initial → libère la mémoire
+            if cid not in self._managed and st.rate < 1:
+                del self._chans[cid]
+        return changes
+
+
+def _step(delay, direction, max_delay):
+    ladder = [d for d in LADDER if d <= max_delay]
+    idx = 0
+    for i, d in enumerate(ladder):
+        if d <= delay:
+            idx = i
+    idx = max(0, min(len(ladder) - 1, idx + direction))
+    return ladder[idx]
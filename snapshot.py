@@ -0,0 +1,326 @@
+# ============================================================
+#  BOT PROTECT - snapshot.py
+#  Snapshot de la structure d'une guild (rôles / salons / overwrites)
+#  + restauration concurrente bornée
+# ============================================================
+
+import os
+import gzip
+import json
+import asyncio
+import hashlib
+import threading
+from collections import defaultdict
+
+import discord
+
+SNAPSHOT_DIR = "snapshots"
+# Au-delà de N diffs, on réécrit un snapshot complet (compaction)
+MAX_DIFFS = 50
+
+SECTIONS = ("roles", "channels")
+
+CH_TEXT = discord.ChannelType.text.value
+CH_VOICE = discord.ChannelType.voice.value
+CH_CATEGORY = discord.ChannelType.category.value
+CH_NEWS = discord.ChannelType.news.value
+CH_STAGE = discord.ChannelType.stage_voice.value
+CH_FORUM = discord.ChannelType.forum.value
+
+
+# ============================================================
+#  [SERIALISATION] Guild → dict compact
+# ============================================================
+def serialize_guild(guild: discord.Guild):
+    roles = {}
+    for r in guild.roles:
+        if r.managed:
+            continue
+        # [name, permissions, colour, hoist, mentionable, position]
+        roles[str(r.id)] = [r.name, r.permissions.value, r.colour.value, r.hoist, r.mentionable, r.position]
+    channels = {}
+    for ch in guild.channels:
+        ow = []
+        for target, o in ch.overwrites.items():
+            allow, deny = o.pair()
+            # [target_id, 0=role/1=member, allow, deny]
+            # cible hors cache : discord.Object typé (type=Role pour un rôle)
+            is_role = isinstance(target, discord.Role) or getattr(target, "type", None) is discord.Role
+            ow.append([target.id, 0 if is_role else 1, allow.value, deny.value])
+        c = {"type": ch.type.value, "name": ch.name, "pos": ch.position, "parent": ch.category_id, "ow": ow}
+        for attr, key in (("topic", "topic"), ("nsfw", "nsfw"), ("slowmode_delay", "slow"),
+                          ("bitrate", "bitrate"), ("user_limit", "limit")):
+            v = getattr(ch, attr, None)
+            if v:
+                c[key] = v
+        channels[str(ch.id)] = c
+    return {"id": guild.id, "roles": roles, "channels": channels}
+
+
+def snapshot_hash(snap):
+    return hashlib.sha1(json.dumps(snap, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def diff_snapshots(old, new):
+    d = {}
+    for s in SECTIONS:
+        up = {k: v for k, v in new[s].items() if old[s].get(k) != v}
+        rm = [k for k in old[s] if k not in new[s]]
+        if up or rm:
+            d[s] = {"up": up, "rm": rm}
+    return d
+
+
+def apply_diff(snap, d):
+    for s, part in d.items():
+        snap[s].update(part.get("up", {}))
+        for k in part.get("rm", []):
+            snap[s].pop(k, None)
+    return snap
+
+
+# ============================================================
+#  [STOCKAGE] <dir>/<guild_id>.jsonl.gz : 1 ligne full + N lignes diff
+# ============================================================
+class SnapshotStore:
+    def __init__(self, path: str = SNAPSHOT_DIR):
+        self.path = path
+        self._hash = {}    # guild_id -> hash du dernier snapshot écrit
+        self._ndiff = {}   # guild_id -> nb de diffs depuis le dernier full
+        # snapshot_loop et la commande écrivent depuis des threads : une écriture à la fois par guild
+        self._locks = defaultdict(threading.Lock)
+
+    def _file(self, gid):
+        return os.path.join(self.path, f"{gid}.jsonl.gz")
+
+    def load(self, gid):
+        fn = self._file(gid)
+        if not os.path.exists(fn):
+            return None
+        snap, ndiff = None, 0
+        with gzip.open(fn, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                if "full" in rec:
+                    snap, ndiff = rec["full"], 0
+                elif snap is not None:
+                    apply_diff(snap, rec["diff"])
+                    ndiff += 1
+        self._ndiff[gid] = ndiff
+        return snap
+
+    def save(self, gid, snap, ts: float):
+        # renvoie "full", "diff" ou None (rien n'a changé → aucune écriture)
+        with self._locks[gid]:
+            return self._save(gid, snap, ts)
+
+    def _save(self, gid, snap, ts: float):
+        h = snapshot_hash(snap)
+        if self._hash.get(gid) == h:
+            return None
+        old = self.load(gid)
+        if old is not None and snapshot_hash(old) == h:
+            self._hash[gid] = h
+            return None
+        os.makedirs(self.path, exist_ok=True)
+        if old is None or self._ndiff.get(gid, 0) >= MAX_DIFFS:
+            tmp = self._file(gid) + ".tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                f.write(json.dumps({"t": ts, "full": snap}, separators=(",", ":")) + "\n")
+            os.replace(tmp, self._file(gid))
+            self._ndiff[gid] = 0
+            kind = "full"
+        else:
+            # gzip multi-membres : l'append d'un membre reste lisible d'un bloc
+            with gzip.open(self._file(gid), "at", encoding="utf-8") as f:
+                f.write(json.dumps({"t": ts, "diff": diff_snapshots(old, snap)}, separators=(",", ":")) + "\n")
+            self._ndiff[gid] = self._ndiff.get(gid, 0) + 1
+            kind = "diff"
+        self._hash[gid] = h
+        return kind
+
+
+# ============================================================
+#  [RESTORE] Recrée rôles → catégories → salons (ordre de dépendance)
+# ============================================================
+class DiscordRest:
+    # Couche REST réelle; un stub avec les mêmes méthodes suffit pour tester
+    def __init__(self, guild: discord.Guild, reason: str = "Restore snapshot"):
+        self.guild = guild
+        self.reason = reason
+        # rôles recréés : absents du cache tant que la gateway n'a pas livré GUILD_ROLE_CREATE
+        self._created = {}
+
+    def _role(self, rid):
+        return self.guild.get_role(rid) or self._created.get(rid)
+
+    async def create_role(self, name, permissions, colour, hoist, mentionable):
+        r = await self.guild.create_role(name=name, permissions=discord.Permissions(permissions),
+                                         colour=discord.Colour(colour), hoist=hoist,
+                                         mentionable=mentionable, reason=self.reason)
+        self._created[r.id] = r
+        return r.id
+
+    async def move_roles(self, positions):
+        roles = {self._role(rid): pos for rid, pos in positions.items()}
+        roles = {r: p for r, p in roles.items() if r is not None}
+        if roles:
+            await self.guild.edit_role_positions(positions=roles, reason=self.reason)
+
+    def _overwrites(self, ow):
+        out = {}
+        for tid, kind, allow, deny in ow:
+            target = self._role(tid) if kind == 0 else self.guild.get_member(tid)
+            if target is not None:
+                out[target] = discord.PermissionOverwrite.from_pair(discord.Permissions(allow), discord.Permissions(deny))
+        return out
+
+    async def create_channel(self, c, parent_id, ow):
+        g = self.guild
+        kw = {"overwrites": self._overwrites(ow), "position": c["pos"], "reason": self.reason}
+        if c["type"] == CH_CATEGORY:
+            return (await g.create_category(c["name"], **kw)).id
+        parent = g.get_channel(parent_id) if parent_id else None
+        if parent is not None:
+            kw["category"] = parent
+        t = c["type"]
+        if t in (CH_TEXT, CH_NEWS):
+            ch = await g.create_text_channel(c["name"], news=(t == CH_NEWS), topic=c.get("topic") or discord.utils.MISSING,
+                                             nsfw=c.get("nsfw", False), slowmode_delay=c.get("slow", 0), **kw)
+        elif t == CH_VOICE:
+            ch = await g.create_voice_channel(c["name"], bitrate=c.get("bitrate", 64000),
+                                              user_limit=c.get("limit", 0), **kw)
+        elif t == CH_STAGE:
+            ch = await g.create_stage_channel(c["name"], **kw)
+        elif t == CH_FORUM:
+            ch = await g.create_forum(c["name"], topic=c.get("topic") or discord.utils.MISSING, **kw)
+        else:
+            return None
+        return ch.id
+
+    async def set_overwrite(self, channel_id, role_id, allow, deny):
+        ch = self.guild.get_channel(channel_id)
+        role = self._role(role_id)
+        if ch is None or role is None:
+            raise LookupError(f"salon {channel_id} / rôle {role_id} introuvable")
+        await ch.set_permissions(role, overwrite=discord.PermissionOverwrite.from_pair(
+            discord.Permissions(allow), discord.Permissions(deny)), reason=self.reason)
+
+
+class GuildRestorer:
+    # rest : DiscordRest ou stub ; progress(stage, done, total) : coroutine optionnelle
+    def __init__(self, rest, concurrency: int = 3, progress=None):
+        self.rest = rest
+        self.sem = asyncio.Semaphore(concurrency)
+        self.progress = progress
+
+    async def restore(self, snap, current):
+        report = {"roles": 0, "categories": 0, "channels": 0, "overwrites": 0, "failed": 0}
+        gid = str(snap["id"])
+
+        # ---- Rôles : id identique, sinon même nom, sinon à recréer ----
+        role_map = {gid: int(gid)}
+        cur_roles_by_name = {v[0]: int(k) for k, v in current["roles"].items()}
+        missing_roles = []
+        for rid, r in snap["roles"].items():
+            if rid in role_map:
+                continue
+            if rid in current["roles"]:
+                role_map[rid] = int(rid)
+            elif r[0] in cur_roles_by_name:
+                role_map[rid] = cur_roles_by_name[r[0]]
+            else:
+                missing_roles.append(rid)
+
+        async def mk_role(rid):
+            name, perms, colour, hoist, mention, _ = snap["roles"][rid]
+            role_map[rid] = await self.rest.create_role(name, perms, colour, hoist, mention)
+            report["roles"] += 1
+
+        await self._run("roles", [lambda rid=rid: mk_role(rid) for rid in missing_roles], report)
+        created = {role_map[rid]: snap["roles"][rid][5] for rid in missing_roles if rid in role_map}
+        if created:
+            try:
+                await self.rest.move_roles(created)
+            except Exception:
+                report["failed"] += 1
+
+        def map_ow(ow):
+            out = []
+            for tid, kind, allow, deny in ow:
+                if kind == 0:
+                    nid = role_map.get(str(tid))
+                    if nid is None:
+                        continue
+                    out.append([nid, 0, allow, deny])
+                else:
+                    out.append([tid, 1, allow, deny])
+            return out
+
+        # ---- Salons : catégories d'abord (parents), puis le reste ----
+        ch_map = {}
+        cur_by_key = {(c["type"], c["name"]): int(k) for k, c in current["channels"].items()}
+        missing_cats, missing_chs = [], []
+        for cid, c in snap["channels"].items():
+            if cid in current["channels"]:
+                ch_map[cid] = int(cid)
+            elif (c["type"], c["name"]) in cur_by_key:
+                ch_map[cid] = cur_by_key[(c["type"], c["name"])]
+            elif c["type"] == CH_CATEGORY:
+                missing_cats.append(cid)
+            else:
+                missing_chs.append(cid)
+
+        async def mk_channel(cid, stage):
+            c = snap["channels"][cid]
+            parent = ch_map.get(str(c["parent"])) if c.get("parent") else None
+            nid = await self.rest.create_channel(c, parent, map_ow(c["ow"]))
+            if nid is not None:
+                ch_map[cid] = nid
+                report[stage] += 1
+
+        by_pos = lambda cid: snap["channels"][cid]["pos"]
+        await self._run("categories", [lambda cid=cid: mk_channel(cid, "categories")
+                                       for cid in sorted(missing_cats, key=by_pos)], report)
+        await self._run("channels", [lambda cid=cid: mk_channel(cid, "channels")
+                                     for cid in sorted(missing_chs, key=by_pos)], report)
+
+        # ---- Overwrites des rôles remappés sur les salons existants (les salons recréés les ont déjà) ----
+        remapped = {int(rid): nid for rid, nid in role_map.items() if nid != int(rid)}
+        recreated = set(missing_cats) | set(missing_chs)
+        missing_ow = []
+        for cid, c in snap["channels"].items():
+            if cid in recreated or cid not in ch_map:
+                continue
+            cur = current["channels"].get(str(ch_map[cid]), {})
+            have = {tid for tid, kind, _, _ in cur.get("ow", ()) if kind == 0}
+            for tid, kind, allow, deny in c["ow"]:
+                if kind == 0 and tid in remapped and remapped[tid] not in have:
+                    missing_ow.append((ch_map[cid], remapped[tid], allow, deny))
+
+        async def set_ow(chid, rid, allow, deny):
+            await self.rest.set_overwrite(chid, rid, allow, deny)
+            report["overwrites"] += 1
+
+        await self._run("overwrites", [lambda a=a: set_ow(*a) for a in missing_ow], report)
+        return report
+
+    async def _run(self, stage, jobs, report):
+        total = len(jobs)
+        done = 0
+
+        async def one(job):
+            nonlocal done
+            async with self.sem:
+                try:
+                    await job()
+                except Exception:
+                    report["failed"] += 1
+            done += 1
+            if self.progress:
+                await self.progress(stage, done, total)
+
+        if jobs:
+            await asyncio.gather(*(one(j) for j in jobs))
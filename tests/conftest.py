@@ -0,0 +1,5 @@
+# les modules du bot sont à la racine du dépôt (pas de package installé)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
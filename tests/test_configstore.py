@@ -0,0 +1,43 @@
+# ============================================================
+#  Régressions du schéma de config : un record importé ne doit jamais
+#  faire planter CompiledConf (donc chaque message de la guild)
+# ============================================================
+
+from configstore import GuildConfigStore, validate_guild_conf
+from wordfilter import compile_terms
+
+
+def test_link_whitelist_non_strings_dropped():
+    rec, errors = validate_guild_conf({"schema_version": 1, "protect": {"link_whitelist": [123, None, " Example.COM "]}})
+    assert rec["protect"]["link_whitelist"] == ["example.com"]
+    assert any("link_whitelist" in e for e in errors)
+
+
+def test_imported_record_compiles():
+    store = GuildConfigStore(":memory:")
+    rec, _ = validate_guild_conf({"schema_version": 1, "protect": {"link_whitelist": [123, None]}})
+    store["1"] = rec
+    assert store.compiled("1").link_whitelist == ()
+
+
+def test_uncombinable_regex_terms_rejected():
+    rec, errors = validate_guild_conf({"schema_version": 1, "protect": {"wordfilter": {
+        "words": ["re:(?i)free nitro", r"re:(a)\1", "re:(a+)+$", "re:fr[e3]{2} n[i1]tro", "spam"]}}})
+    assert rec["protect"]["wordfilter"]["words"] == ["re:fr[e3]{2} n[i1]tro", "spam"]
+    assert errors
+
+
+def test_stored_bad_regex_does_not_break_compiled():
+    store = GuildConfigStore(":memory:")
+    rec, _ = validate_guild_conf({"schema_version": 1})
+    rec["protect"]["wordfilter"]["words"] = ["re:(?i)free nitro", r"re:(a)\1", "re:fr[e3]{2} n[i1]tro", "spam"]
+    store["1"] = rec
+    wf = store.compiled("1").word_filter
+    assert wf.match("FREE NITRO ici") == "re:fr[e3]{2} n[i1]tro"
+    assert wf.match("du spam") == "spam"
+
+
+def test_regex_terms_ignore_case():
+    wf = compile_terms(["re:Steam", "re:GIFT [0-9]+"])
+    assert wf.match("Steam gift") == "re:Steam"
+    assert wf.match("free gift 100") == "re:GIFT [0-9]+"
@@ -0,0 +1,75 @@
+# ============================================================
+#  BOT PROTECT - textnorm.py
+#  Normalisation de texte contre l'évasion : homoglyphes, caractères
+#  invisibles, accents, casse (squelette façon UTS #39, simplifié),
+#  leetspeak et lettres espacées pour le filtre de mots
+# ============================================================
+
+import re
+import unicodedata
+
+# Homoglyphes courants que NFKD ne ramène pas au latin (cyrillique, grec, symboles)
+HOMOGLYPHS = str.maketrans({
+    "а": "a", "в": "b", "е": "e", "к": "k", "м": "m", "н": "h", "о": "o", "р": "p", "с": "c",
+    "т": "t", "у": "y", "х": "x", "ѕ": "s", "і": "i", "ј": "j", "ԁ": "d", "ӏ": "l", "ɡ": "g",
+    "А": "A", "В": "B", "Е": "E", "К": "K", "М": "M", "Н": "H", "О": "O", "Р": "P", "С": "C",
+    "Т": "T", "У": "Y", "Х": "X", "Ѕ": "S", "І": "I", "Ј": "J",
+    "α": "a", "β": "b", "ε": "e", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p", "τ": "t",
+    "υ": "u", "χ": "x", "Α": "A", "Β": "B", "Ε": "E", "Ζ": "Z", "Η": "H", "Ι": "I", "Κ": "K",
+    "Μ": "M", "Ν": "N", "Ο": "O", "Ρ": "P", "Τ": "T", "Υ": "Y", "Χ": "X",
+    "ı": "i", "ł": "l", "ø": "o", "đ": "d", "ß": "ss", "æ": "ae", "œ": "oe",
+})
+# Squelette des noms, après casefold : ce qui se confond visuellement (I/l/1/| ≈ i)
+NAME_SKELETON = str.maketrans({"l": "i", "1": "i", "|": "i", "!": "i", "0": "o", "5": "s", "$": "s", "@": "a"})
+NAME_SYMBOLS = "|!$@"   # symboles du squelette, gardés jusqu'à la traduction
+# Séquences qui se lisent comme une seule lettre (appliquées AVANT le squelette, qui change l en i)
+NAME_DIGRAPHS = (("rn", "m"), ("vv", "w"), ("cl", "d"))
+# Leetspeak (dans un mot seulement : "2024" ou "salut !" restent intacts)
+LEET = str.maketrans({"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b", "9": "g",
+                      "@": "a", "$": "s", "!": "i", "|": "i", "+": "t", "€": "e"})
+LEET_SYMBOLS = "@$!|+€"
+TOKEN_RE = re.compile(r"[^\W_]+(?:[@$!|+€]+[^\W_]*)*|[@$!|+€]+[^\W_]+", re.UNICODE)
+REPEAT_RE = re.compile(r"(.)\1{2,}")
+
+
+def strip_marks(text: str):
+    # NFKD (pleine chasse, lettres mathématiques, ligatures…) puis on retire
+    # accents (Mn/Me) et caractères de format invisibles (Cf : zero-width, bidi)
+    out = []
+    for c in unicodedata.normalize("NFKD", text):
+        cat = unicodedata.category(c)
+        if cat in ("Mn", "Me", "Cf"):
+            continue
+        out.append(c)
+    return "".join(out).translate(HOMOGLYPHS)
+
+
+def name_skeleton(name: str):
+    # "Аdmіn Bob" (cyrillique) / "ADMIN_B0B" / "adrnin.bob" → "adminbob" ; "" si rien de lisible
+    s = strip_marks(name or "").casefold()
+    s = "".join(c for c in s if c.isalnum() or c in NAME_SYMBOLS)
+    for a, b in NAME_DIGRAPHS:
+        s = s.replace(a, b)
+    return s.translate(NAME_SKELETON)
+
+
+def fold_text(text: str):
+    # " mot mot … " : mots séparés par UN espace (bords compris, pour les mots entiers),
+    # leetspeak décodé, lettres isolées recollées ("f u c k", "f.u.c.k" → "fuck"),
+    # 3+ lettres identiques ramenées à une ("fuuuck" → "fuck", "ass" reste "ass")
+    out, run = [], []
+    for tok in TOKEN_RE.findall(strip_marks(text or "").casefold()):
+        tok = tok.rstrip(LEET_SYMBOLS).lstrip("@!|+€")   # "$hit" oui, "@pseudo" / "!cmd" non
+        if not tok.isdigit():
+            tok = tok.translate(LEET)
+        tok = REPEAT_RE.sub(r"\1", tok)
+        if len(tok) == 1:
+            run.append(tok)
+            continue
+        if run:
+            out.append("".join(run))
+            run = []
+        out.append(tok)
+    if run:
+        out.append("".join(run))
+    return " " + " ".join(out) + " "
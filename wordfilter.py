@@ -0,0 +1,196 @@
+# ============================================================
+#  BOT PROTECT - wordfilter.py
+#  Filtre de mots par guild : un automate Aho-Corasick pour tous les termes
+#  + UNE regex combinée pour les vrais motifs, sur le texte normalisé
+# ============================================================
+
+import re
+from collections import OrderedDict
+
+try:
+    from re import _parser as sre_parse
+except ImportError:   # python < 3.11
+    import sre_parse
+
+from textnorm import fold_text, strip_marks
+
+MAX_TERMS = 5000
+MAX_TERM_LEN = 200
+REGEX_PREFIX = "re:"
+# Filtres compilés partagés par liste de termes identique (recompilés seulement si elle change)
+CACHE_SIZE = 256
+# Les regex d'admin tournent sur la boucle à chaque message (sre garde le GIL, un thread
+# ne protège pas la boucle) : texte scanné borné et au plus 2 quantificateurs non bornés,
+# soit ~50 ms dans le pire cas. Les termes littéraux couvrent tout le message.
+MAX_REGEX_INPUT = 500
+MAX_UNBOUNDED = 2
+
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+_GROUPREFS = tuple(getattr(sre_parse, n) for n in ("GROUPREF", "GROUPREF_IGNORE", "GROUPREF_EXISTS",
+                                                    "GROUPREF_LOC_IGNORE", "GROUPREF_UNI_IGNORE")
+                   if hasattr(sre_parse, n))
+
+
+def _children(av):
+    if isinstance(av, sre_parse.SubPattern):
+        yield av
+    elif isinstance(av, (tuple, list)):
+        for x in av:
+            yield from _children(x)
+
+
+def _check_tree(sub, stars, in_repeat=False):
+    # références numérotées : décalées une fois le motif emballé dans la regex combinée ;
+    # quantificateur non borné dans un autre ((a+)+, (\w+\s?)*) : backtracking exponentiel ;
+    # chaque non borné de plus multiplie le pire cas par la longueur du texte
+    for op, av in sub:
+        if op in _GROUPREFS:
+            return "références de groupe interdites"
+        if op in _REPEATS:
+            unbounded = av[1] == sre_parse.MAXREPEAT
+            if unbounded and in_repeat:
+                return "quantificateurs imbriqués interdits"
+            if unbounded:
+                stars.append(op)
+            if len(stars) > MAX_UNBOUNDED:
+                return f"plus de {MAX_UNBOUNDED} quantificateurs non bornés (*, +, {{n,}})"
+            err = _check_tree(av[2], stars, in_repeat or unbounded)
+            if err:
+                return err
+            continue
+        for child in _children(av):
+            err = _check_tree(child, stars, in_repeat)
+            if err:
+                return err
+    return None
+
+
+def regex_error(pattern: str):
+    # None si le motif peut entrer dans la regex combinée, sinon la raison
+    if "(?P" in pattern:
+        return "groupes nommés réservés"   # réservés à la regex combinée
+    try:
+        tree = sre_parse.parse(pattern)
+        # validé sous sa forme combinée : un (?i) en tête n'y est plus en tête
+        re.compile(f"(?P<t0>{pattern})", re.IGNORECASE)
+    except re.error as e:
+        return str(e)
+    if tree.state.flags & ~re.UNICODE:
+        return "drapeaux globaux interdits, utiliser (?i:...)"
+    return _check_tree(tree, [])
+
+
+def parse_term(term: str):
+    # syntaxe AutoMod : "mot" = mot entier, "mot*" = préfixe, "*mot" = suffixe,
+    # "*mot*" = n'importe où ; "re:motif" = regex (texte sans homoglyphes/invisibles/accents,
+    # casse ignorée, ponctuation conservée).
+    # → ("re", motif) / ("lit", aiguille) ; None si invalide
+    if not isinstance(term, str) or not term.strip() or len(term) > MAX_TERM_LEN:
+        return None
+    term = term.strip()
+    if term.startswith(REGEX_PREFIX):
+        pattern = term[len(REGEX_PREFIX):]
+        return ("re", pattern) if pattern and regex_error(pattern) is None else None
+    body = fold_text(term.strip("*")).strip()
+    if not body:
+        return None
+    left = "" if term.startswith("*") else " "
+    right = "" if term.endswith("*") else " "
+    return "lit", left + body + right
+
+
+class WordFilter:
+    # Aho-Corasick : transitions en dicts, liens d'échec, sorties fusionnées le long
+    # des liens. Un scan = un passage sur le texte, coût indépendant du nombre de termes.
+    __slots__ = ("terms", "_goto", "_fail", "_out", "_regex", "_groups")
+
+    def __init__(self, terms=()):
+        self.terms = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [None]
+        patterns = []
+        for term in terms:
+            parsed = parse_term(term)
+            if parsed is None:
+                if isinstance(term, str) and term.strip().startswith(REGEX_PREFIX):
+                    print(f"[wordfilter] motif ignoré {term!r} : {regex_error(term.strip()[len(REGEX_PREFIX):])}")
+                continue
+            self.terms.append(term)
+            kind, value = parsed
+            if kind == "re":
+                patterns.append((value, term))
+            else:
+                self._insert(value, term)
+        self._link()
+        self._groups = {f"t{i}": term for i, (_, term) in enumerate(patterns)}
+        try:
+            # texte casefold : sans IGNORECASE un motif saisi avec des majuscules ne matcherait jamais
+            self._regex = re.compile("|".join(f"(?P<t{i}>{p})" for i, (p, _) in enumerate(patterns)),
+                                     re.IGNORECASE) if patterns else None
+        except re.error as e:
+            # filet de sécurité : les termes littéraux restent actifs, la guild ne plante pas
+            print(f"[wordfilter] regex combinée ignorée ({len(patterns)} motifs) : {e}")
+            self.terms = [t for t in self.terms if t not in self._groups.values()]
+            self._groups, self._regex = {}, None
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _insert(self, needle, term):
+        node = 0
+        for c in needle:
+            nxt = self._goto[node].get(c)
+            if nxt is None:
+                nxt = self._goto[node][c] = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+            node = nxt
+        if self._out[node] is None:
+            self._out[node] = term
+
+    def _link(self):
+        # parcours en largeur : échec = plus long suffixe présent dans le trie
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for c, nxt in self._goto[node].items():
+                f = self._fail[node]
+                while f and c not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(c, 0)
+                if self._out[nxt] is None:
+                    self._out[nxt] = self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def match(self, text: str):
+        # 1er terme trouvé (tel que saisi) ou None
+        norm = fold_text(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for c in norm:
+            while node and c not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(c, 0)
+            if out[node] is not None:
+                return out[node]
+        if self._regex is not None:
+            m = self._regex.search(strip_marks((text or "")[:MAX_REGEX_INPUT]).casefold())
+            if m:
+                return self._groups[m.lastgroup]
+        return None
+
+
+_cache = OrderedDict()
+
+
+def compile_terms(terms):
+    key = tuple(terms)
+    wf = _cache.get(key)
+    if wf is None:
+        wf = _cache[key] = WordFilter(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return wf